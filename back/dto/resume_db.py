@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class ResumeDb(BaseModel):
     title: str
@@ -9,6 +9,14 @@ class ResumeDb(BaseModel):
     file_name: str
     hh_url: str
     hh_id: str
+    content_hash: Optional[str] = None
+    category: Optional[str] = None
+    experience_months: Optional[int] = None
+    education_level: Optional[int] = None
+    salary_from: Optional[int] = None
+    salary_to: Optional[int] = None
+    work_format: Optional[str] = None
+    area_id: Optional[int] = None
 
     class Config:
          from_attributes = True
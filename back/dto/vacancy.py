@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 
@@ -21,6 +21,11 @@ class Vacancy(BaseModel):
          
 class VacancyResponse(Vacancy):
     id: int
+    experience_months: Optional[int] = None
+    education_level: Optional[int] = None
+    area_id: Optional[int] = None
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
     
     class Config:
         orm_mode = True
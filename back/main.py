@@ -1,11 +1,22 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from routers import resume as ResumeRouter, vacancy as VacancyRouter, resume_storage as ResumeStorageRouter
-from database import SessionLocal, engine, Base
+from database import SessionLocal, engine, Base, migrate
+from services import model_registry, resume_index, fulltext, hh_client, file_storage, ingestion, normalization, store_lock
+from services.embedding_store import EMBEDDINGS_DIRECTORY
 import os
+import threading
+import logging
 from fastapi.middleware.cors import CORSMiddleware
 
 Base.metadata.create_all(bind=engine)
+migrate(engine)
+fulltext.init_fulltext(engine)
+
+with SessionLocal() as db:
+    file_storage.backfill_hashes(db)
+    normalization.backfill_normalized(db)
 
 
 app = FastAPI()
@@ -25,9 +36,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def lock_indexes():
+    # Хранилища эмбеддингов и индексы допускают одного писателя: второй воркер
+    # с тем же каталогом останавливается при старте, а не портит файлы
+    store_lock.acquire_writer_lock(EMBEDDINGS_DIRECTORY)
+
+@app.on_event("startup")
+def preload_models():
+    # PRELOAD_MODELS=1 загружает все модели при старте воркера, иначе при первом запросе;
+    # без обученного кросс-энкодера и классификатора воркер стартует, они логируются как недоступные
+    if os.environ.get("PRELOAD_MODELS", "0") == "1":
+        model_registry.registry.preload()
+
+        db = SessionLocal()
+        try:
+            resume_index.backfill_embeddings(db)
+            resume_index.backfill_skills(db)
+        finally:
+            db.close()
+
+@app.on_event("startup")
+def warm_up_classifier():
+    # PRELOAD_CLASSIFIER=1 (по умолчанию) загружает и прогревает классификатор в фоне при старте;
+    # загрузки из очереди, пришедшие раньше, ждут его в реестре, а не грузят заново
+    if os.environ.get("PRELOAD_CLASSIFIER", "1") != "1" or model_registry.registry.is_loaded("resume_classifier"):
+        return
+
+    def load():
+        try:
+            model_registry.get_resume_classifier()
+        except Exception as e:
+            logging.getLogger('uvicorn.error').warning(f"Классификатор не загружен: {str(e)}")
+
+    threading.Thread(target=load, name="classifier-warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+def save_indexes():
+    # ANN-индекс сохраняется пачками, несохранённый хвост пишем при остановке
+    if model_registry.registry.is_loaded("ann_index"):
+        model_registry.get_ann_index().save()
+
+@app.on_event("shutdown")
+async def close_clients():
+    await hh_client.close_hh_client()
+    ingestion.shutdown_ingestion_queue()
+
+@app.exception_handler(hh_client.HHConfigurationError)
+async def hh_not_configured(request: Request, exc: hh_client.HHConfigurationError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 app.include_router(ResumeRouter.router, prefix="/resume")
 app.include_router(VacancyRouter.router, prefix="/vacancies")
 app.include_router(ResumeStorageRouter.router, prefix="/resume-storage")
 
 if __name__ == '__main__':  
-    uvicorn.run("main:app", host="0.0.0.0",port=8080, reload=True, workers=3)
+    # Один воркер: индексы в embeddings/ пишет единственный процесс (services/store_lock.py)
+    uvicorn.run("main:app", host="0.0.0.0",port=8080, reload=True, workers=1)
@@ -0,0 +1,72 @@
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+
+
+class LengthBucketSampler(Sampler):
+    """Батчи из примеров близкой длины для DataLoader(batch_sampler=...)
+
+    Индексы перемешиваются, режутся на корзины по batch_size * bucket_batches
+    примеров, внутри корзины сортируются по длине и делятся на батчи; порядок
+    батчей снова перемешивается. Паддинг до самого длинного в батче тогда
+    почти ничего не добавляет, а случайность для обучения сохраняется.
+    Без shuffle все примеры просто сортируются по длине (оценка, инференс).
+    """
+
+    def __init__(self, lengths: list, batch_size: int, shuffle: bool = True, bucket_batches: int = 50,
+                 seed: int = None):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_batches = bucket_batches
+        self.rng = np.random.RandomState(seed)
+
+    def __iter__(self):
+        if not self.shuffle:
+            yield from length_batches(self.lengths, self.batch_size)
+            return
+
+        order = self.rng.permutation(len(self.lengths))
+        bucket_size = self.batch_size * self.bucket_batches
+        batches = []
+        for start in range(0, len(order), bucket_size):
+            bucket = order[start:start + bucket_size]
+            bucket = bucket[np.argsort(self.lengths[bucket], kind='stable')]
+            batches.extend(bucket[i:i + self.batch_size].tolist() for i in range(0, len(bucket), self.batch_size))
+        self.rng.shuffle(batches)
+        yield from batches
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def length_batches(lengths, batch_size: int) -> list:
+    """Индексы, отсортированные по длине и нарезанные на батчи"""
+    order = np.argsort(np.asarray(lengths), kind='stable')
+    return [order[i:i + batch_size].tolist() for i in range(0, len(order), batch_size)]
+
+
+class PadCollator:
+    """Паддинг батча до самой длинной последовательности в нём, а не до max_length"""
+
+    def __init__(self, tokenizer, pad_to_multiple_of: int = 8):
+        self.pad_token_id = tokenizer.pad_token_id
+        # Длины, кратные 8, лучше ложатся на матричные ядра CPU/GPU
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features: list) -> dict:
+        longest = max(len(feature['input_ids']) for feature in features)
+        if self.pad_to_multiple_of:
+            longest = -(-longest // self.pad_to_multiple_of) * self.pad_to_multiple_of
+
+        batch = {}
+        for name, pad_value in (('input_ids', self.pad_token_id), ('attention_mask', 0), ('token_type_ids', 0)):
+            if name not in features[0]:
+                continue
+            batch[name] = torch.tensor(
+                [list(feature[name]) + [pad_value] * (longest - len(feature[name])) for feature in features],
+                dtype=torch.long
+            )
+        if 'labels' in features[0]:
+            batch['labels'] = torch.tensor([int(feature['labels']) for feature in features], dtype=torch.long)
+        return batch
@@ -0,0 +1,104 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
+
+import argparse
+import time
+import torch
+from torch.utils.data import DataLoader
+from model.scripts.train_resume_matcher import ResumeMatcherTrainer
+from model.scripts.resume_bert_matcher import ResumeVacancyDataset
+from model.scripts.batching import LengthBucketSampler, PadCollator
+
+
+class StaticPadCollator(PadCollator):
+    """Паддинг каждого батча ровно до max_len: длина не больше max_len, округление вверх даёт max_len"""
+
+    def __init__(self, tokenizer, max_len: int):
+        super().__init__(tokenizer, pad_to_multiple_of=max_len)
+
+
+def static_loader(dataset: ResumeVacancyDataset, batch_size: int, max_len: int) -> DataLoader:
+    """Как было: батчи по порядку, паддинг каждой пары до max_len"""
+    return DataLoader(dataset, batch_size=batch_size, shuffle=False,
+                      collate_fn=StaticPadCollator(dataset.tokenizer, max_len))
+
+
+def bucketed_loader(dataset: ResumeVacancyDataset, batch_size: int) -> DataLoader:
+    return DataLoader(dataset, batch_sampler=LengthBucketSampler(dataset.lengths, batch_size, shuffle=True, seed=0),
+                      collate_fn=PadCollator(dataset.tokenizer))
+
+
+def run(model, loader, device, train: bool) -> dict:
+    """Проход по загрузчику: реальные токены, токены с паддингом и время"""
+    real_tokens = padded_tokens = 0
+    optimizer = torch.optim.AdamW(model.parameters(), lr=2e-5) if train else None
+    model.train(train)
+
+    started = time.perf_counter()
+    for batch in loader:
+        labels = batch.pop('labels').to(device)
+        inputs = {k: v.to(device) for k, v in batch.items()}
+        real_tokens += int(inputs['attention_mask'].sum())
+        padded_tokens += inputs['input_ids'].numel()
+
+        if train:
+            optimizer.zero_grad()
+            model(**inputs, labels=labels).loss.backward()
+            optimizer.step()
+        else:
+            with torch.inference_mode():
+                model(**inputs)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'seconds': elapsed,
+        'real_tokens_per_second': real_tokens / elapsed,
+        'padded_tokens_per_second': padded_tokens / elapsed,
+        'padding_share': 1 - real_tokens / padded_tokens
+    }
+
+
+def main():
+    # Запуск из папки back: python -m model.scripts.benchmark_batching --dataset ../UpdatedResumeDataSet.csv
+    parser = argparse.ArgumentParser(description="Токены/с кросс-энкодера: паддинг до max_length против корзин по длине")
+    parser.add_argument('--dataset', default=None, help="UpdatedResumeDataSet.csv")
+    parser.add_argument('--pairs', type=int, default=256)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--max-len', type=int, nargs='+', default=[256, 512],
+                        help="256 - как в ResumeMatcherTrainer, 512 - как в ResumeMatcher")
+    parser.add_argument('--train', action='store_true', help="Шаг обучения вместо инференса")
+    args = parser.parse_args()
+
+    trainer = ResumeMatcherTrainer(args.dataset, seed=0)
+    _, pairs = trainer.prepare_data()
+    pairs = pairs[:args.pairs]
+    model, device = trainer.matcher.model, trainer.device
+    mode = "обучение" if args.train else "инференс"
+
+    print(f"Пар: {len(pairs)}, batch_size={args.batch_size}, режим: {mode}")
+    print(f"{'max_len':<9}{'загрузчик':<12}{'время, с':>10}{'реальных ток/с':>16}{'всего ток/с':>13}{'паддинг':>9}")
+    for max_len in args.max_len:
+        dataset = ResumeVacancyDataset(
+            [pair['resume_text'] for pair in pairs],
+            [pair['vacancy_text'] for pair in pairs],
+            [pair['label'] for pair in pairs],
+            trainer.matcher.tokenizer,
+            max_len
+        )
+        # Прогрев на паре батчей, чтобы первый замер не платил за инициализацию
+        run(model, DataLoader(torch.utils.data.Subset(dataset, range(min(len(dataset), 2 * args.batch_size))),
+                              batch_size=args.batch_size, collate_fn=PadCollator(dataset.tokenizer)),
+            device, train=False)
+
+        results = {}
+        for name, loader in (('static', static_loader(dataset, args.batch_size, max_len)),
+                             ('bucketed', bucketed_loader(dataset, args.batch_size))):
+            results[name] = run(model, loader, device, args.train)
+            r = results[name]
+            print(f"{max_len:<9}{name:<12}{r['seconds']:>10.2f}{r['real_tokens_per_second']:>16.0f}"
+                  f"{r['padded_tokens_per_second']:>13.0f}{r['padding_share']:>9.1%}")
+        speedup = results['bucketed']['real_tokens_per_second'] / results['static']['real_tokens_per_second']
+        print(f"{'':<9}ускорение по реальным токенам: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
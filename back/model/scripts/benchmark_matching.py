@@ -0,0 +1,79 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from model.scripts.resume_matching_system import ResumeMatchingSystem
+from model.scripts.resume_bert_matcher import ResumeMatcher
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'UpdatedResumeDataSet.csv')
+
+def load_resume_texts(limit: int) -> list:
+    """Тексты резюме из UpdatedResumeDataSet.csv"""
+    df = pd.read_csv(DATASET_PATH)
+    return df['Resume'].astype(str).str[:1000].head(limit).tolist()
+
+def percentile_ms(samples: list, q: float) -> float:
+    return float(np.percentile(samples, q) * 1000)
+
+def benchmark_backend(backend: str, args, resume_texts: list):
+    matching_system = ResumeMatchingSystem(backend=backend)
+
+    # Прогрев, чтобы первая конфигурация не платила за инициализацию
+    matching_system.score_many(args.vacancy, resume_texts[:4])
+
+    # Задержка одного запроса: эмбеддинг названия вакансии в /matching
+    latencies = []
+    for text in resume_texts[:args.latency_runs]:
+        started = time.perf_counter()
+        matching_system.encode_texts([text[:200]])
+        latencies.append(time.perf_counter() - started)
+    print(f"[{backend}] один текст: p50 {percentile_ms(latencies, 50):.1f} мс, p95 {percentile_ms(latencies, 95):.1f} мс")
+
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        matching_system.score_many(args.vacancy, resume_texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"[{backend}] batch_size={batch_size:<4} {elapsed:8.2f} с  {len(resume_texts) / elapsed:8.1f} резюме/с")
+
+    if args.cross_encoder:
+        matcher = ResumeMatcher(backend=backend)
+        matcher.predict(resume_texts[0], args.vacancy)
+        latencies = []
+        for text in resume_texts[:args.latency_runs]:
+            started = time.perf_counter()
+            matcher.predict(text, args.vacancy)
+            latencies.append(time.perf_counter() - started)
+        print(f"[{backend}] кросс-энкодер, пара: p50 {percentile_ms(latencies, 50):.1f} мс, "
+              f"p95 {percentile_ms(latencies, 95):.1f} мс")
+
+        # Пересортировка всего списка кандидатов микро-батчами
+        for batch_size in args.batch_sizes:
+            started = time.perf_counter()
+            matcher.rerank(args.vacancy, resume_texts, top_k=10, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            print(f"[{backend}] rerank batch_size={batch_size:<4} {elapsed:8.2f} с  "
+                  f"{len(resume_texts) / elapsed:8.1f} пар/с")
+
+def main():
+    # Запуск из папки back: python -m model.scripts.benchmark_matching --backends torch onnx
+    parser = argparse.ArgumentParser(description="Пропускная способность ResumeMatchingSystem.score_many")
+    parser.add_argument('--resumes', type=int, default=128)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    parser.add_argument('--vacancy', default="Python разработчик")
+    parser.add_argument('--backends', nargs='+', choices=['torch', 'onnx'], default=['torch'])
+    parser.add_argument('--latency-runs', type=int, default=50)
+    parser.add_argument('--cross-encoder', action='store_true', help="Также задержка ResumeMatcher.predict и скорость rerank")
+    args = parser.parse_args()
+
+    resume_texts = load_resume_texts(args.resumes)
+
+    print(f"Резюме: {len(resume_texts)}")
+    for backend in args.backends:
+        print("-" * 50)
+        benchmark_backend(backend, args, resume_texts)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+import signal
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import PyPDF2
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _on_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def extract_pdf(pdf_path, text_path, timeout=60):
+    """Извлечение текста одного PDF в text_path; выполняется в процессе пула"""
+    # signal.alarm есть только на POSIX; на Windows таймаут на файл не действует
+    use_alarm = hasattr(signal, "SIGALRM") and timeout
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.alarm(int(timeout))
+
+    try:
+        with open(pdf_path, "rb") as file:
+            reader = PyPDF2.PdfReader(file)
+            pages = [page.extract_text() or "" for page in reader.pages]
+        text = "".join(pages)
+
+        tmp_path = f"{text_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as text_file:
+            text_file.write(text)
+        os.replace(tmp_path, text_path)
+
+        return {"status": "ok", "pages": len(pages), "chars": len(text)}
+    except ExtractionTimeout:
+        return {"status": "timeout", "error": f"Превышен таймаут {timeout} с"}
+    except Exception as e:
+        return {"status": "failed", "error": str(e)}
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+
+def _extract_task(pdf_path, text_path, timeout):
+    started = time.perf_counter()
+    result = extract_pdf(pdf_path, text_path, timeout)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def load_manifest(text_folder):
+    path = os.path.join(text_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(text_folder, manifest):
+    path = os.path.join(text_folder, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def extract_folder(pdf_folder, text_folder, pdf_files=None, workers=None, timeout=60, force=False):
+    """Параллельное извлечение текста из PDF папки с пропуском неизменённых файлов
+
+    Генератор: отдаёт запись по каждому файлу по мере готовности. В text_folder
+    ведётся manifest.json (размер, mtime, sha256), поэтому повторный запуск
+    обрабатывает только новые и изменённые файлы.
+    """
+    if not os.path.exists(text_folder):
+        os.makedirs(text_folder)
+
+    if pdf_files is None:
+        pdf_files = [f for f in os.listdir(pdf_folder) if f.lower().endswith('.pdf')]
+
+    manifest = {} if force else load_manifest(text_folder)
+    pending = []
+
+    for pdf_file in pdf_files:
+        pdf_path = os.path.join(pdf_folder, pdf_file)
+        text_file = os.path.splitext(pdf_file)[0] + ".txt"
+        text_path = os.path.join(text_folder, text_file)
+        stat = os.stat(pdf_path)
+        entry = manifest.get(pdf_file)
+
+        record = {"path": pdf_file, "text_file": text_file, "size": stat.st_size, "mtime": stat.st_mtime}
+        text_exists = os.path.exists(text_path)
+
+        # Размер и mtime совпали - файл не трогаем даже для хэширования
+        if entry and text_exists and entry.get("status") == "ok" \
+                and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            yield {**entry, "status": "skipped"}
+            continue
+
+        record["sha256"] = file_sha256(pdf_path)
+        if entry and text_exists and entry.get("status") == "ok" and entry.get("sha256") == record["sha256"]:
+            manifest[pdf_file] = {**entry, **record}
+            yield {**manifest[pdf_file], "status": "skipped"}
+            continue
+
+        pending.append((record, pdf_path, text_path))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = {
+                executor.submit(_extract_task, pdf_path, text_path, timeout): record
+                for record, pdf_path, text_path in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    record = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"status": "failed", "error": str(e)}
+
+                    manifest[record["path"]] = {**record, **result}
+                    yield manifest[record["path"]]
+            finally:
+                save_manifest(text_folder, manifest)
+    else:
+        save_manifest(text_folder, manifest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Параллельное извлечение текста из PDF резюме")
+    parser.add_argument("pdf_folder")
+    parser.add_argument("text_folder")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов, по умолчанию по числу ядер")
+    parser.add_argument("--timeout", type=int, default=60, help="Таймаут на один файл, с")
+    parser.add_argument("--jsonl", default="-", help="Куда писать результаты в JSONL, '-' - stdout")
+    parser.add_argument("--force", action="store_true", help="Игнорировать манифест и обработать все файлы")
+    args = parser.parse_args()
+
+    output = sys.stdout if args.jsonl == "-" else open(args.jsonl, "w", encoding="utf-8")
+    counts = {}
+    started = time.perf_counter()
+    try:
+        for record in extract_folder(args.pdf_folder, args.text_folder, workers=args.workers,
+                                     timeout=args.timeout, force=args.force):
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Готово за {time.perf_counter() - started:.1f} с: {counts}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
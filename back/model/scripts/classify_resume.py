@@ -1,39 +1,55 @@
-from pdf_to_text import pdf_to_text
+from parse_cache import ParseCache, get_parse_cache
+from resume_parser import ResumeParser
 from resume_classifier import ResumeClassifier
 import os
+import time
 
-def classify_resumes_from_folder(pdf_folder):
-    # Создаем временную папку для txt файлов
-    temp_txt_folder = "temp_txt"
-    if not os.path.exists(temp_txt_folder):
-        os.makedirs(temp_txt_folder)
+def classify_resumes_from_folder(pdf_folder, cache_directory=None):
+    # Текст берётся из кэша парсинга: PDF, уже разобранные при загрузке или прошлом запуске, не читаются заново
+    cache = ParseCache(cache_directory) if cache_directory else get_parse_cache()
+    parser = ResumeParser()
     
     # Получаем список всех PDF файлов в папке
     pdf_files = [f for f in os.listdir(pdf_folder) if f.lower().endswith('.pdf')]
     results = {}
     
-    # Конвертируем все PDF в текст
-    pdf_to_text(pdf_folder, temp_txt_folder, pdf_files)
-    
     # Классифицируем каждое резюме
-    classifier = ResumeClassifier()
+    classifier = ResumeClassifier.load()
     
-    for pdf_file in pdf_files:
-        txt_filename = pdf_file.replace('.pdf', '.txt')
-        txt_path = os.path.join(temp_txt_folder, txt_filename)
-        
-        if os.path.exists(txt_path):
-            try:
-                category = classifier.predict_category(txt_path)
-                results[pdf_file] = category
-            except Exception as e:
-                print(f"Ошибка при обработке {pdf_file}: {str(e)}")
+    # Разбираем только PDF, которых ещё нет в кэше
+    parsed_files = cache.get_or_parse_many(parser, [os.path.join(pdf_folder, f) for f in pdf_files])
     
-    # Очищаем временные файлы
-    for file in os.listdir(temp_txt_folder):
-        os.remove(os.path.join(temp_txt_folder, file))
-    os.rmdir(temp_txt_folder)
+    parsed_pdfs = [f for f in pdf_files if parsed_files.get(os.path.join(pdf_folder, f)) is not None]
+    texts = [parsed_files[os.path.join(pdf_folder, f)]["text"] for f in parsed_pdfs]
+
+    # Резюме классифицируются батчами; близкие по длине тексты попадают в один батч
+    started = time.perf_counter()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    for start in range(0, len(order), classifier.BATCH_SIZE):
+        batch = order[start:start + classifier.BATCH_SIZE]
+        results.update(classify_batch(classifier, [parsed_pdfs[i] for i in batch], [texts[i] for i in batch]))
+    elapsed = time.perf_counter() - started
+    if texts:
+        print(f"Классифицировано {len(results)} из {len(texts)} резюме за {elapsed:.2f} с ({len(texts) / elapsed:.1f} резюме/с)")
     
+    # В порядке файлов в папке, а не в порядке батчей
+    return {pdf_file: results[pdf_file] for pdf_file in parsed_pdfs if pdf_file in results}
+
+def classify_batch(classifier, pdf_files, texts):
+    """Категории для батча; если батч упал, каждый текст классифицируется отдельно"""
+    try:
+        categories, _ = classifier.predict_categories(texts)
+        return dict(zip(pdf_files, categories))
+    except Exception as e:
+        print(f"Ошибка при классификации батча из {len(texts)} резюме, повтор по одному: {str(e)}")
+
+    results = {}
+    for pdf_file, text in zip(pdf_files, texts):
+        try:
+            categories, _ = classifier.predict_categories([text])
+            results[pdf_file] = categories[0]
+        except Exception as e:
+            print(f"Ошибка при классификации {pdf_file}: {str(e)}")
     return results
 
 # Пример использования
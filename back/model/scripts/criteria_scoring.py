@@ -0,0 +1,267 @@
+import numpy as np
+try:
+    from model.scripts import field_normalization
+except ImportError:
+    # Скрипты из model/scripts запускаются без пакета model
+    import field_normalization
+
+EXPERIENCE_MONTHS = field_normalization.EXPERIENCE_MONTHS
+
+# Шкалы критериев; их же используют скалярные match_* ниже
+EXPERIENCE_LEVELS = {
+    'no_experience': 0,
+    '1-3': 1,
+    '3-5': 2,
+    '5+': 3
+}
+
+EDUCATION_LEVELS = {
+    'secondary': 0,
+    'higher': 1,
+    'bachelor': 1,
+    'master': 2,
+    'phd': 3
+}
+
+# Нижние границы уровней EXPERIENCE_LEVELS в месяцах: 12, 36, 60
+EXPERIENCE_LEVEL_MONTHS = np.asarray([EXPERIENCE_MONTHS[level] for level in ('1-3', '3-5', '5+')])
+
+SALARY_TOLERANCE = 50000
+
+DEFAULT_WEIGHTS = {
+    'experience': 0.25,
+    'education': 0.15,
+    'work_format': 0.15,
+    'location': 0.2,
+    'salary': 0.15,
+    'experience_months': 0.0
+}
+
+
+def experience_level(months):
+    """Уровень EXPERIENCE_LEVELS по опыту в месяцах: '1-3' -> 1, '5+' -> 3"""
+    return np.searchsorted(EXPERIENCE_LEVEL_MONTHS, months, side='right')
+
+
+def location_key(area_id, area):
+    """Город для сравнения: id hh.ru, если город известен, иначе название в нижнем регистре"""
+    if area_id is not None:
+        return int(area_id)
+    return area.strip().lower() if area else None
+
+
+# Скалярные критерии для одной пары резюме-вакансия. Входы - строки полей, они
+# проходят через те же нормализаторы, что и колонки CriteriaTable, поэтому
+# CriteriaScorer совпадает с этими функциями значение в значение
+
+def match_experience(resume_exp, vacancy_exp) -> float:
+    """Сопоставление уровней опыта: не ниже - 1.0, на уровень ниже - 0.7"""
+    resume_level = experience_level(field_normalization.experience_months(resume_exp) or 0)
+    vacancy_level = experience_level(field_normalization.experience_months(vacancy_exp) or 0)
+
+    if resume_level >= vacancy_level:
+        return 1.0
+    elif resume_level + 1 == vacancy_level:
+        return 0.7
+    return 0.3
+
+
+def match_education(resume_edu, vacancy_edu) -> float:
+    resume_level = field_normalization.education_level(resume_edu) or 0
+    vacancy_level = field_normalization.education_level(vacancy_edu) or 0
+    return 1.0 if resume_level >= vacancy_level else 0.5
+
+
+def match_work_format(resume_format, vacancy_format) -> float:
+    if resume_format == vacancy_format:
+        return 1.0
+    elif vacancy_format == 'hybrid':
+        return 0.8
+    elif resume_format == 'office' and vacancy_format == 'remote':
+        return 0.7
+    return 0.5
+
+
+def match_location(resume_area, vacancy_area, relocation: bool = False) -> float:
+    resume_key = location_key(field_normalization.area_id(resume_area), resume_area)
+    vacancy_key = location_key(field_normalization.area_id(vacancy_area), vacancy_area)
+    if resume_key == vacancy_key:
+        return 1.0
+    elif relocation:
+        return 0.8
+    return 0.3
+
+
+def match_salary(resume_from, resume_to, vacancy_from, vacancy_to) -> float:
+    """Сопоставление зарплатных вилок; границы без значения ни с чем не совпадают"""
+    def within(a, b, check):
+        return a is not None and b is not None and check(a, b)
+
+    if within(resume_from, vacancy_to, lambda a, b: a <= b) and within(resume_to, vacancy_from, lambda a, b: a >= b):
+        return 1.0
+    elif within(resume_from, vacancy_to, lambda a, b: abs(a - b) <= SALARY_TOLERANCE) or \
+            within(resume_to, vacancy_from, lambda a, b: abs(a - b) <= SALARY_TOLERANCE):
+        return 0.7
+    return 0.3
+
+
+def match_experience_months(resume_exp, vacancy_exp) -> float:
+    """Доля требуемого опыта в месяцах; 0.0, если опыт резюме или вакансии не разобран"""
+    resume_months = field_normalization.experience_months(resume_exp)
+    required_months = field_normalization.experience_months(vacancy_exp)
+    if resume_months is None or required_months is None:
+        return 0.0
+
+    if required_months == 0:
+        return 1.0  # Если опыт не требуется, любой опыт подходит
+    if resume_months >= required_months:
+        return 1.0
+    return resume_months / required_months
+
+
+class CriteriaTable:
+    """Структурированные поля резюме в виде столбцов NumPy
+
+    Строки кодируются один раз из нормализованных колонок Resume
+    (services/normalization.py): опыт - месяцами, образование - уровнем,
+    формат работы и город - номерами в словаре значений. Вакансия затем
+    оценивается против всей таблицы.
+    """
+
+    # Столбцы, которые extend и drop переносят в новую таблицу
+    COLUMNS = ('ids', 'experience_empty', 'experience_months', 'experience_level', 'education_level',
+               'work_format', 'area', 'salary_from', 'salary_to')
+
+    def __init__(self, records: list, values: dict = None):
+        self.ids = np.asarray([record.get('id') for record in records], dtype=np.int64)
+        self.size = len(records)
+
+        months = [record.get('experience_months') for record in records]
+        # Неразобранный опыт резюме даёт 0.0 в experience_months, как в match_experience_months
+        self.experience_empty = np.asarray([value is None for value in months], dtype=bool)
+        self.experience_months = np.asarray([value or 0 for value in months], dtype=np.float64)
+        self.experience_level = experience_level(self.experience_months)
+        self.education_level = np.asarray(
+            [record.get('education_level') or 0 for record in records], dtype=np.int64)
+
+        self.values = values if values is not None else {}
+        self.work_format = self._encode([record.get('work_format') for record in records])
+        self.area = self._encode([location_key(record.get('area_id'), record.get('area')) for record in records])
+
+        # Зарплата без значения даёт NaN: все сравнения ложны, оценка 0.3
+        self.salary_from = np.asarray(
+            [np.nan if record.get('salary_from') is None else record['salary_from'] for record in records],
+            dtype=np.float64)
+        self.salary_to = np.asarray(
+            [np.nan if record.get('salary_to') is None else record['salary_to'] for record in records],
+            dtype=np.float64)
+
+    def code(self, value) -> int:
+        """Номер значения в словаре таблицы; -1, если в таблице такого нет"""
+        return self.values.get(value, -1)
+
+    def extend(self, records: list) -> 'CriteriaTable':
+        """Новая таблица с добавленными строками; текущая не меняется и может читаться параллельно"""
+        # Копия словаря: коды уже закодированных строк остаются прежними
+        added = CriteriaTable(records, values=dict(self.values))
+        return self._with_columns(added.values, {
+            name: np.concatenate([getattr(self, name), getattr(added, name)]) for name in self.COLUMNS
+        })
+
+    def drop(self, ids) -> 'CriteriaTable':
+        """Новая таблица без строк с указанными id"""
+        keep = ~np.isin(self.ids, np.asarray(list(ids), dtype=np.int64))
+        return self._with_columns(self.values, {name: getattr(self, name)[keep] for name in self.COLUMNS})
+
+    @classmethod
+    def _with_columns(cls, values: dict, columns: dict) -> 'CriteriaTable':
+        table = cls([], values=values)
+        for name, column in columns.items():
+            setattr(table, name, column)
+        table.size = len(table.ids)
+        return table
+
+    def _encode(self, column: list) -> np.ndarray:
+        # Ключи dict совпадают ровно тогда, когда значения равны через ==, как в скалярных функциях
+        return np.asarray([self.values.setdefault(value, len(self.values)) for value in column], dtype=np.int64)
+
+
+class CriteriaScorer:
+    """Оценка вакансии по всем критериям против всей таблицы резюме сразу
+
+    Каждый критерий совпадает значение в значение со скалярной match_*
+    этого модуля, применённой к исходным строкам полей: колонки таблицы
+    получены теми же нормализаторами. Возраста и готовности к переезду в
+    Resume нет, поэтому match_age не оценивается, а город - только
+    совпадение. total - взвешенное среднее критериев с ненулевым весом.
+    """
+
+    def __init__(self, weights: dict = None):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        unknown = set(self.weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Неизвестные критерии: {', '.join(sorted(unknown))}")
+
+    def score(self, table: CriteriaTable, vacancy: dict) -> dict:
+        scores = {
+            'experience': self.experience(table, vacancy.get('experience_months')),
+            'education': self.education(table, vacancy.get('education_level')),
+            'work_format': self.work_format(table, vacancy.get('work_format')),
+            'location': self.location(table, location_key(vacancy.get('area_id'), vacancy.get('area'))),
+            'salary': self.salary(table, vacancy.get('salary_from'), vacancy.get('salary_to')),
+            'experience_months': self.experience_months(table, vacancy.get('experience_months'))
+        }
+
+        total = np.zeros(table.size, dtype=np.float64)
+        weight_sum = 0.0
+        for name, weight in self.weights.items():
+            if weight:
+                total += weight * scores[name]
+                weight_sum += weight
+        scores['total'] = total / weight_sum if weight_sum else total
+        return scores
+
+    @staticmethod
+    def experience(table: CriteriaTable, vacancy_months) -> np.ndarray:
+        vacancy_level = experience_level(vacancy_months or 0)
+        return np.where(table.experience_level >= vacancy_level, 1.0,
+                        np.where(table.experience_level + 1 == vacancy_level, 0.7, 0.3))
+
+    @staticmethod
+    def education(table: CriteriaTable, vacancy_level) -> np.ndarray:
+        vacancy_level = vacancy_level or 0
+        return np.where(table.education_level >= vacancy_level, 1.0, 0.5)
+
+    @staticmethod
+    def work_format(table: CriteriaTable, vacancy_format) -> np.ndarray:
+        same = table.work_format == table.code(vacancy_format)
+        if vacancy_format == 'hybrid':
+            return np.where(same, 1.0, 0.8)
+        if vacancy_format == 'remote':
+            return np.where(same, 1.0, np.where(table.work_format == table.code('office'), 0.7, 0.5))
+        return np.where(same, 1.0, 0.5)
+
+    @staticmethod
+    def location(table: CriteriaTable, vacancy_location) -> np.ndarray:
+        return np.where(table.area == table.code(vacancy_location), 1.0, 0.3)
+
+    @staticmethod
+    def salary(table: CriteriaTable, vacancy_from, vacancy_to) -> np.ndarray:
+        vacancy_from = np.nan if vacancy_from is None else float(vacancy_from)
+        vacancy_to = np.nan if vacancy_to is None else float(vacancy_to)
+        with np.errstate(invalid='ignore'):
+            overlap = (table.salary_from <= vacancy_to) & (table.salary_to >= vacancy_from)
+            close = (np.abs(table.salary_from - vacancy_to) <= SALARY_TOLERANCE) | \
+                    (np.abs(table.salary_to - vacancy_from) <= SALARY_TOLERANCE)
+        return np.where(overlap, 1.0, np.where(close, 0.7, 0.3))
+
+    @staticmethod
+    def experience_months(table: CriteriaTable, required) -> np.ndarray:
+        if required is None:
+            return np.zeros(table.size, dtype=np.float64)
+
+        if required == 0:
+            scores = np.ones(table.size, dtype=np.float64)
+        else:
+            scores = np.where(table.experience_months >= required, 1.0, table.experience_months / required)
+        return np.where(table.experience_empty, 0.0, scores)
@@ -0,0 +1,200 @@
+import re
+
+# Декларативная таблица правил. Порядок значений внутри поля - приоритет:
+# побеждает первое значение, встретившееся в тексте хотя бы раз, как и в
+# прежних extract_*. Шаблоны пишутся для текста в нижнем регистре.
+#   keyword - значение по ключевым словам, default, если ничего не найдено
+#   flag    - True, если встретился любой шаблон
+#   section - строка, следующая за первой строкой с заголовком раздела
+#   salary  - диапазон или нижняя граница зарплаты
+#   pattern - первая группа первого совпавшего шаблона
+FIELD_RULES = {
+    "area": {
+        "kind": "keyword",
+        "default": "Не указано",
+        "values": [
+            ("Алматы", [r"алматы"]),
+            ("Астана", [r"астана"]),
+            ("Караганда", [r"караганда"]),
+            ("Шымкент", [r"шымкент"]),
+        ],
+    },
+    "work_format": {
+        "kind": "keyword",
+        "default": "office",
+        "values": [
+            ("remote", [r"удаленн", r"remote", r"дистанционн"]),
+            ("hybrid", [r"гибрид", r"hybrid", r"смешанн"]),
+            ("office", [r"офис", r"office"]),
+        ],
+    },
+    "currency": {
+        "kind": "keyword",
+        "default": "KZT",
+        "values": [
+            ("KZT", [r"тенге", r"kzt", r"тг"]),
+        ],
+    },
+    "relocation": {
+        "kind": "flag",
+        "patterns": [r"готов к переезду", r"релокация", r"переезд"],
+    },
+    "experience": {
+        "kind": "section",
+        "default": "Без опыта",
+        "headers": [r"опыт работы"],
+    },
+    "education": {
+        "kind": "section",
+        "default": "Не указано",
+        "headers": [r"образование"],
+    },
+    "skills": {
+        "kind": "section",
+        "default": "Не указано",
+        "headers": [r"навыки", r"skills"],
+    },
+    "experience_total": {
+        "kind": "pattern",
+        "default": None,
+        # Итог опыта в резюме hh.ru: "Опыт работы — 2 года 6 месяцев"
+        "patterns": [r"опыт работы\s*[—–-]\s*([^\n]+)", r"work experience\s*[—–-]\s*([^\n]+)"],
+    },
+    "salary": {
+        "kind": "salary",
+        "default": (150000, 300000),
+        "range": [r"зарплата:?\s*(\d+)\s*-\s*(\d+)", r"salary:?\s*(\d+)\s*-\s*(\d+)"],
+        # Верхняя граница не указана - считается вдвое больше нижней
+        "from": [r"от\s*(\d+)", r"from\s*(\d+)"],
+    },
+}
+
+
+class FieldExtractor:
+    """Извлечение всех полей резюме по таблице правил за один проход по тексту
+
+    Текст приводится к нижнему регистру один раз. Все шаблоны таблицы
+    собраны в одно выражение-альтернативу с именованной группой на шаблон;
+    поглощается только первая буква, остаток проверяется просмотром
+    вперёд, поэтому finditer проходит текст один раз и совпадения разных
+    правил не поглощают друг друга. Правило определяется по
+    match.lastgroup. Из одной позиции альтернатива сообщает только первый
+    совпавший шаблон, поэтому шаблоны с той же первой буквой ("опыт
+    работы" и "опыт работы — 2 года") проверяются match от этой позиции.
+    """
+
+    def __init__(self, rules: dict = FIELD_RULES):
+        self.rules = rules
+        # (поле, значение, шаблон) в порядке таблицы; значение - город для keyword, вид границы для salary
+        self._alternatives = []
+
+        for field, rule in rules.items():
+            kind = rule["kind"]
+            if kind == "keyword":
+                entries = [(value, pattern) for value, patterns in rule["values"] for pattern in patterns]
+            elif kind == "flag":
+                entries = [(True, pattern) for pattern in rule["patterns"]]
+            elif kind == "section":
+                entries = [(None, pattern) for pattern in rule["headers"]]
+            elif kind == "pattern":
+                entries = [(None, pattern) for pattern in rule["patterns"]]
+            elif kind == "salary":
+                entries = [("range", pattern) for pattern in rule["range"]] + \
+                          [("from", pattern) for pattern in rule["from"]]
+            else:
+                raise ValueError(f"Неизвестный вид правила {kind} для поля {field}")
+            self._alternatives.extend((field, value, re.compile(pattern)) for value, pattern in entries)
+
+        first = [self._first_char(pattern.pattern) for _, _, pattern in self._alternatives]
+        self._scanner = re.compile(self._scanner_pattern(first))
+        # Шаблоны, которые могут начинаться в той же позиции, что и данный
+        self._same_start = [
+            [other for other in range(len(first))
+             if other != index and (first[index] is None or first[other] is None or first[index] == first[other])]
+            for index in range(len(first))
+        ]
+
+    def _scanner_pattern(self, first: list) -> str:
+        """Альтернатива всех шаблонов, сгруппированных по первой букве
+
+        Каждая ветка начинается с буквы: по первым буквам веток re пропускает
+        неподходящие позиции на C, а в позиции проверяет только шаблоны с этой
+        буквой. Остаток шаблона - просмотр вперёд, поглощается одна буква.
+        """
+        groups = {}
+        branches = []
+        for index, ((_, _, pattern), char) in enumerate(zip(self._alternatives, first)):
+            if char is None:
+                branches.append(f"(?=(?P<r{index}>{pattern.pattern}))")
+            else:
+                groups.setdefault(char, []).append(f"(?=(?P<r{index}>{pattern.pattern[1:]}))")
+        branches = [f"{re.escape(char)}(?:{'|'.join(rests)})" for char, rests in groups.items()] + branches
+        return "|".join(branches)
+
+    @staticmethod
+    def _first_char(pattern: str):
+        """Буква, с которой начинается любое совпадение шаблона; None, если её нельзя определить"""
+        if pattern[:1].isalnum() and pattern[1:2] not in ("?", "*", "{") and "|" not in pattern:
+            return pattern[0]
+        return None
+
+    def extract(self, text: str, defaults: bool = True) -> dict:
+        """Значения полей; с defaults=False ненайденные поля равны None вместо значения по умолчанию"""
+        first_line = text.split('\n', 1)[0].strip()
+        lower = text.lower()
+        hits = self._scan(lower)
+
+        result = {"position": first_line if first_line else "Неизвестная позиция"}
+        for field, rule in self.rules.items():
+            value = getattr(self, f"_{rule['kind']}")(rule, hits.get(field, []), lower)
+            result[field] = rule.get("default") if value is None and defaults else value
+        return result
+
+    def _scan(self, lower: str) -> dict:
+        """Поле -> [(значение альтернативы, совпадение)] в порядке позиций в тексте"""
+        hits = {}
+        for match in self._scanner.finditer(lower):
+            start = match.start()
+            index = int(match.lastgroup[1:])
+            matched = [index] + [other for other in self._same_start[index]
+                                 if self._alternatives[other][2].match(lower, start)]
+            # В одной позиции шаблоны идут в порядке таблицы, как приоритет при равных позициях
+            for other in sorted(matched):
+                field, value, pattern = self._alternatives[other]
+                hits.setdefault(field, []).append((value, pattern.match(lower, start)))
+        return hits
+
+    def _keyword(self, rule: dict, hits: list, lower: str):
+        found = {value for value, _ in hits}
+        for value, _ in rule["values"]:
+            if value in found:
+                return value
+        return None
+
+    def _flag(self, rule: dict, hits: list, lower: str) -> bool:
+        return bool(hits)
+
+    def _section(self, rule: dict, hits: list, lower: str):
+        # Первый заголовок, за строкой которого есть следующая строка: заголовок
+        # в последней строке значения не даёт, берётся следующее вхождение
+        for _, match in hits:
+            line_end = lower.find('\n', match.end())
+            if line_end == -1:
+                continue
+            next_end = lower.find('\n', line_end + 1)
+            return lower[line_end + 1:next_end if next_end != -1 else len(lower)].strip()
+        return None
+
+    def _pattern(self, rule: dict, hits: list, lower: str):
+        if not hits:
+            return None
+        return hits[0][1].group(1).strip()
+
+    def _salary(self, rule: dict, hits: list, lower: str):
+        # Диапазон важнее нижней границы, внутри вида - первое вхождение
+        for kind in ("range", "from"):
+            for value, match in hits:
+                if value == kind:
+                    numbers = [int(group) for group in match.groups()]
+                    return (numbers[0], numbers[1]) if kind == "range" else (numbers[0], numbers[0] * 2)
+        return None
@@ -0,0 +1,97 @@
+import re
+
+# Идентификаторы городов hh.ru; ключи - названия в нижнем регистре
+AREA_IDS = {
+    "алматы": 160,
+    "almaty": 160,
+    "астана": 159,
+    "astana": 159,
+    "нур-султан": 159,
+    "nur-sultan": 159,
+    "караганда": 177,
+    "karaganda": 177,
+    "шымкент": 205,
+    "shymkent": 205,
+}
+
+# Уровни образования в шкале EDUCATION_LEVELS из criteria_scoring: 0 - среднее,
+# 1 - высшее/бакалавр, 2 - магистр, 3 - учёная степень. Проверяются по порядку,
+# поэтому "неоконченное высшее" стоит раньше "высшее"
+EDUCATION_KEYWORDS = [
+    (3, ["кандидат наук", "доктор наук", "phd", "candidate of sciences", "doctor of sciences"]),
+    (2, ["магистр", "master"]),
+    (0, ["неоконченное высшее", "unfinished_higher", "incomplete higher", "среднее", "secondary", "high_school"]),
+    (1, ["бакалавр", "bachelor", "высшее", "higher", "специалист"]),
+]
+
+# Минимальный опыт в месяцах по идентификаторам опыта hh.ru и формы резюме.
+# Единственная такая таблица: её используют SQL-фильтры и критерии из criteria_scoring
+EXPERIENCE_MONTHS = {
+    "noExperience": 0,
+    "no_experience": 0,
+    "employment": 0,
+    "between1And3": 12,
+    "between3And6": 36,
+    "moreThan6": 72,
+    "1-3": 12,
+    "3-5": 36,
+    "5+": 60,
+}
+
+WORK_FORMATS = ("office", "remote", "hybrid")
+
+# Зарплата ниже этого - ложное срабатывание шаблона "от N" ("от 3 лет")
+MIN_SALARY = 10000
+
+YEARS_RE = re.compile(r"(\d+)\s*(?:год|года|лет|years?|г\.)")
+MONTHS_RE = re.compile(r"(\d+)\s*(?:мес|months?)")
+
+
+def experience_months(value):
+    """Опыт в месяцах из идентификатора hh.ru или строки вида "5 лет 2 месяца"; None, если не разобрать"""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if value in EXPERIENCE_MONTHS:
+        return EXPERIENCE_MONTHS[value]
+
+    text = value.lower()
+    years, months = YEARS_RE.search(text), MONTHS_RE.search(text)
+    if not years and not months:
+        return None
+    return (int(years.group(1)) * 12 if years else 0) + (int(months.group(1)) if months else 0)
+
+
+def education_level(value):
+    if not value:
+        return None
+    text = value.lower()
+    for level, keywords in EDUCATION_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return level
+    return None
+
+
+def area_id(value):
+    if not value:
+        return None
+    return AREA_IDS.get(value.strip().lower())
+
+
+def work_format(value):
+    return value if value in WORK_FORMATS else None
+
+
+def salary(value):
+    if value is None or value < MIN_SALARY:
+        return None
+    return int(value)
+
+
+def age(value):
+    """Возраст числом; None для пустых и нечисловых строк"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -1,5 +1,5 @@
 import pandas as pd
-from resume_classifier import ResumeClassifier
+from resume_classifier import ResumeClassifier, CLASSIFIER_DIRECTORY
 import os
 
 def prepare_training_data():
@@ -41,7 +41,7 @@ def prepare_training_data():
     
     return df
 
-def fine_tune_model(model_path='model/trained_models/resume_classifier'):
+def fine_tune_model(model_path=CLASSIFIER_DIRECTORY):
     """Дообучение модели на новых данных"""
     # Загружаем и подготавливаем данные
     print("Подготовка данных...")
@@ -53,12 +53,12 @@ def fine_tune_model(model_path='model/trained_models/resume_classifier'):
     
     # Инициализируем классификатор
     print("\nИнициализация классификатора...")
-    classifier = ResumeClassifier()
-    
-    # Если есть сохраненная модель, загружаем её
+    # Если есть сохраненная модель, загружаем сразу её, без базовых весов
     if os.path.exists(model_path):
         print("Загрузка существующей модели...")
-        classifier.load_model(model_path)
+        classifier = ResumeClassifier.load(model_path)
+    else:
+        classifier = ResumeClassifier()
     
     # Дообучаем модель
     print("\nНачинаем дообучение модели...")
@@ -1,14 +1,37 @@
 from resume_matching_system import ResumeMatchingSystem
+from resume_parser import ResumeParser
+from parse_cache import get_parse_cache
 import pandas as pd
 import json
 import os
+import sys
 
-def load_data():
+def load_resumes_from_pdfs(pdf_folder):
+    """Резюме из PDF через кэш парсинга: текст и поля уже разобранных файлов не извлекаются заново"""
+    pdf_paths = [os.path.join(pdf_folder, f) for f in os.listdir(pdf_folder) if f.lower().endswith('.pdf')]
+    parsed_files = get_parse_cache().get_or_parse_many(ResumeParser(), pdf_paths)
+
+    resumes = []
+    for pdf_path, parsed in parsed_files.items():
+        resumes.append({
+            'id': os.path.splitext(os.path.basename(pdf_path))[0],
+            'description': parsed['text'],
+            'desiredSalary': None,
+            'experience': parsed['fields'].get('experience'),
+            'education': parsed['fields'].get('education'),
+            'area': parsed['fields'].get('area')
+        })
+    return resumes
+
+def load_data(pdf_folder=None):
     """Загрузка данных резюме и вакансий"""
     # Загрузка вакансий
     with open('vacancies.json', 'r', encoding='utf-8') as f:
         vacancies = json.load(f)
     
+    if pdf_folder:
+        return load_resumes_from_pdfs(pdf_folder), vacancies
+    
     # Загрузка и обработка текстовых файлов резюме
     resumes = []
     text_folder = r"D:\Datathon\datathon\freedom_solution\cv_processing\txt"
@@ -30,12 +53,12 @@ def load_data():
     
     return resumes, vacancies
 
-def main():
+def main(pdf_folder=None):
     # Инициализация системы
     matching_system = ResumeMatchingSystem()
     
     # Загрузка данных
-    resumes, vacancies = load_data()
+    resumes, vacancies = load_data(pdf_folder)
     
     # Обработка каждого резюме
     all_matches = []
@@ -61,4 +84,5 @@ def main():
     print(f"Средний процент совпадений: {len(all_matches)/len(resumes)*100:.2f}%")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Папку с PDF можно передать аргументом, иначе читаются готовые txt
+    main(sys.argv[1] if len(sys.argv) > 1 else None) 
\ No newline at end of file
@@ -0,0 +1,164 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
+
+import argparse
+import json
+import torch
+from transformers import BertModel, BertTokenizer
+from model.scripts.resume_matching_system import ResumeMatchingSystem, mean_pool
+from model.scripts.resume_bert_matcher import ResumeMatcher
+from model.scripts.onnx_runtime import ONNX_DIRECTORY, model_paths
+
+INPUT_NAMES = ['input_ids', 'attention_mask', 'token_type_ids']
+OPSET = 14
+
+
+class PooledEncoder(torch.nn.Module):
+    """BertModel с mean pooling и нормировкой, как ResumeMatchingSystem.encode_texts"""
+
+    def __init__(self, bert: BertModel):
+        super().__init__()
+        self.bert = bert
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        hidden = self.bert(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        ).last_hidden_state
+        return mean_pool(hidden, attention_mask)
+
+
+class CrossEncoderLogits(torch.nn.Module):
+    """Логиты BertForSequenceClassification без словаря выходов transformers"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        ).logits
+
+
+def export_graph(module: torch.nn.Module, sample: dict, path: str, output_name: str, opset: int = OPSET):
+    """Выгрузка модуля в ONNX с динамическими размерами батча и длины последовательности"""
+    module.eval()
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in INPUT_NAMES}
+    dynamic_axes[output_name] = {0: 'batch'}
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            module,
+            tuple(sample[name] for name in INPUT_NAMES),
+            path,
+            input_names=INPUT_NAMES,
+            output_names=[output_name],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+
+
+def optimize_graph(source: str, target: str, config) -> dict:
+    """Слияние attention, LayerNorm, GELU и embedding в fused-операторы ONNX Runtime"""
+    from onnxruntime.transformers import optimizer
+
+    model = optimizer.optimize_model(
+        source,
+        model_type='bert',
+        num_heads=config.num_attention_heads,
+        hidden_size=config.hidden_size
+    )
+    model.save_model_to_file(target)
+    return {name: count for name, count in model.get_fused_operator_statistics().items() if count}
+
+
+def save(module: torch.nn.Module, config, sample: dict, name: str, output_name: str, directory: str,
+         manifest: dict, optimize: bool = True, opset: int = OPSET):
+    """Экспорт, оптимизация и манифест: <directory>/<name>.onnx и <name>.json"""
+    os.makedirs(directory, exist_ok=True)
+    path, manifest_path = model_paths(name, directory)
+    raw_path = path + '.raw'
+
+    export_graph(module, sample, raw_path, output_name, opset)
+    fused = {}
+    if optimize:
+        fused = optimize_graph(raw_path, path, config)
+        os.remove(raw_path)
+    else:
+        os.replace(raw_path, path)
+
+    manifest = {
+        **manifest,
+        'name': name,
+        'opset': opset,
+        'optimized': optimize,
+        'fused_operators': fused,
+        'torch_version': torch.__version__
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"{name}: {path} ({os.path.getsize(path) / 2**20:.1f} МБ)")
+    if fused:
+        print(f"  fused: {', '.join(f'{op}={count}' for op, count in fused.items())}")
+    return path
+
+
+def export_encoder(directory: str = ONNX_DIRECTORY, optimize: bool = True, opset: int = OPSET) -> str:
+    bert = BertModel.from_pretrained(ResumeMatchingSystem.MODEL_NAME)
+    tokenizer = BertTokenizer.from_pretrained(ResumeMatchingSystem.MODEL_NAME)
+
+    sample = tokenizer(['Python разработчик', 'Data Scientist, 3 года опыта'], padding='longest', return_tensors='pt')
+    return save(
+        PooledEncoder(bert), bert.config, sample, ResumeMatchingSystem.ARTIFACT_NAME, 'embeddings', directory,
+        {
+            'model_name': ResumeMatchingSystem.MODEL_NAME,
+            'embedding_version': ResumeMatchingSystem.EMBEDDING_VERSION,
+            'max_length': ResumeMatchingSystem.MAX_LENGTH,
+            'hidden_size': bert.config.hidden_size
+        },
+        optimize, opset
+    )
+
+
+def export_cross_encoder(directory: str = ONNX_DIRECTORY, weights: str = None, optimize: bool = True,
+                         opset: int = OPSET) -> str:
+    matcher = ResumeMatcher()
+    if weights:
+        matcher.load_model(weights)
+    matcher.model.to('cpu')
+
+    sample = matcher.tokenizer(['Python developer, Django, SQL'], ['Python разработчик'],
+                               padding='longest', return_tensors='pt')
+    return save(
+        CrossEncoderLogits(matcher.model), matcher.model.config, sample, ResumeMatcher.ARTIFACT_NAME,
+        'logits', directory,
+        {
+            'model_name': ResumeMatcher.MODEL_NAME,
+            'weights': os.path.abspath(weights) if weights else None,
+            'max_length': matcher.MAX_LEN,
+            'num_labels': matcher.model.config.num_labels
+        },
+        optimize, opset
+    )
+
+
+def main():
+    # Запуск из папки back: python -m model.scripts.onnx_export --matcher-weights model/trained_models/best_resume_matcher.pt
+    parser = argparse.ArgumentParser(description="Экспорт BERT-энкодера и кросс-энкодера в ONNX")
+    parser.add_argument('--output', default=ONNX_DIRECTORY)
+    names = [ResumeMatchingSystem.ARTIFACT_NAME, ResumeMatcher.ARTIFACT_NAME]
+    parser.add_argument('--models', nargs='+', choices=names, default=names)
+    parser.add_argument('--matcher-weights', default=None, help="state_dict ResumeMatcher после обучения")
+    parser.add_argument('--opset', type=int, default=OPSET)
+    parser.add_argument('--no-optimize', action='store_true', help="Без слияния операторов (для отладки)")
+    args = parser.parse_args()
+
+    if ResumeMatchingSystem.ARTIFACT_NAME in args.models:
+        export_encoder(args.output, optimize=not args.no_optimize, opset=args.opset)
+    if ResumeMatcher.ARTIFACT_NAME in args.models:
+        export_cross_encoder(args.output, args.matcher_weights, optimize=not args.no_optimize, opset=args.opset)
+
+if __name__ == "__main__":
+    main()
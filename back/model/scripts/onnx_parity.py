@@ -0,0 +1,82 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
+
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+from model.scripts.benchmark_matching import DATASET_PATH
+from model.scripts.resume_matching_system import ResumeMatchingSystem
+from model.scripts.resume_bert_matcher import ResumeMatcher
+from model.scripts.onnx_runtime import OnnxModel
+
+# Допуски: fused-операторы ORT считают в другом порядке, отличие - шум float32
+EMBEDDING_ATOL = 1e-3
+COSINE_MIN = 0.9999
+PROBABILITY_ATOL = 1e-3
+
+
+def load_samples(limit: int) -> pd.DataFrame:
+    """Резюме из UpdatedResumeDataSet.csv, по нескольку из каждой категории"""
+    df = pd.read_csv(DATASET_PATH)
+    df['Resume'] = df['Resume'].astype(str).str[:1000]
+    per_category = max(1, limit // df['Category'].nunique())
+    return df.groupby('Category', group_keys=False).head(per_category).head(limit).reset_index(drop=True)
+
+
+def check_encoder(texts: list) -> bool:
+    torch_embeddings = ResumeMatchingSystem(backend='torch').encode_texts(texts)
+    onnx_embeddings = ResumeMatchingSystem(backend='onnx').encode_texts(texts)
+
+    max_diff = float(np.abs(torch_embeddings - onnx_embeddings).max())
+    min_cosine = float((torch_embeddings * onnx_embeddings).sum(axis=1).min())
+    ok = max_diff <= EMBEDDING_ATOL and min_cosine >= COSINE_MIN
+    print(f"encoder:       {len(texts)} текстов, max |Δ| = {max_diff:.2e}, min cos = {min_cosine:.6f} "
+          f"{'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def check_cross_encoder(samples: pd.DataFrame) -> bool:
+    categories = samples['Category'].unique()
+    rng = np.random.default_rng(0)
+    pairs = []
+    # Как в ResumeMatcherTrainer.prepare_data: своя категория и случайная чужая
+    for resume, category in zip(samples['Resume'], samples['Category']):
+        pairs.append((resume, f"{category} position"))
+        pairs.append((resume, f"{rng.choice([c for c in categories if c != category])} position"))
+
+    # Те же веса, из которых выгружен граф
+    weights = OnnxModel(ResumeMatcher.ARTIFACT_NAME).manifest.get('weights')
+    torch_matcher = ResumeMatcher(backend='torch')
+    if weights:
+        torch_matcher.load_model(weights)
+    onnx_matcher = ResumeMatcher(backend='onnx')
+
+    resumes, vacancies = [resume for resume, _ in pairs], [vacancy for _, vacancy in pairs]
+    torch_probabilities = torch_matcher.predict_many(resumes, vacancies)
+    onnx_probabilities = onnx_matcher.predict_many(resumes, vacancies)
+
+    max_diff = float(np.abs(torch_probabilities - onnx_probabilities).max())
+    agreement = float(((torch_probabilities > 0.5) == (onnx_probabilities > 0.5)).mean())
+    ok = max_diff <= PROBABILITY_ATOL
+    print(f"cross_encoder: {len(pairs)} пар, max |Δp| = {max_diff:.2e}, совпадение решений {agreement:.1%} "
+          f"{'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    # Запуск из папки back после onnx_export: python -m model.scripts.onnx_parity
+    parser = argparse.ArgumentParser(description="Сверка ONNX-графов с PyTorch на резюме из UpdatedResumeDataSet.csv")
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--skip-cross-encoder', action='store_true')
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    ok = check_encoder(samples['Resume'].tolist())
+    if not args.skip_cross_encoder:
+        ok = check_cross_encoder(samples) and ok
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
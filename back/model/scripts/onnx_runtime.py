@@ -0,0 +1,50 @@
+import os
+import json
+import numpy as np
+import onnxruntime as ort
+
+# Экспортированные графы: python -m model.scripts.onnx_export
+ONNX_DIRECTORY = os.environ.get(
+    "ONNX_MODELS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trained_models", "onnx")
+)
+
+def model_paths(name: str, directory: str = None, variant: str = "fp32") -> tuple:
+    """Пути к графу <name>.onnx и его манифесту <name>.json; для int8 - <name>.int8.onnx"""
+    directory = directory or ONNX_DIRECTORY
+    stem = name if variant == "fp32" else f"{name}.{variant}"
+    return os.path.join(directory, f"{stem}.onnx"), os.path.join(directory, f"{stem}.json")
+
+
+class OnnxModel:
+    """Сессия ONNX Runtime на CPU для графа, выгруженного onnx_export
+
+    Манифест рядом с графом хранит параметры экспорта (имя модели,
+    max_length, размерность выхода), чтобы инференс токенизировал так же,
+    как при экспорте.
+    """
+
+    def __init__(self, name: str, directory: str = None, threads: int = None, variant: str = "fp32"):
+        self.path, manifest_path = model_paths(name, directory, variant)
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"Нет ONNX-графа {self.path}: выполните python -m model.scripts.onnx_export"
+                + ("" if variant == "fp32" else " и python -m model.scripts.quantize_models")
+            )
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        options = ort.SessionOptions()
+        # Граф уже оптимизирован при экспорте; остальные оптимизации ORT делает при загрузке
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.environ.get("ORT_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def run(self, inputs: dict) -> np.ndarray:
+        """Первый выход графа; лишние входы токенизатора (которых нет в графе) отбрасываются"""
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        return self.session.run(None, feed)[0]
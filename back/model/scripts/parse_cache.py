@@ -0,0 +1,140 @@
+import os
+import gzip
+import json
+import uuid
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+DEFAULT_DIRECTORY = os.environ.get(
+    "PARSE_CACHE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "parse_cache"))
+)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Дисковый кэш текста PDF и результата ResumeParser по sha256 файла и версии парсера
+
+    Записи - gzip JSON вида {"text", "fields", "stats", "parser_version"}.
+    Смена версии парсера или его бюджета даёт новый ключ, старые записи
+    просто перестают читаться.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, content_hash, parser_version):
+        return os.path.join(self.directory, content_hash[:2], f"{content_hash}-{parser_version}.json.gz")
+
+    def get(self, content_hash, parser_version):
+        """Запись кэша или None"""
+        path = self.path(content_hash, parser_version)
+        if not os.path.exists(path):
+            self._count("misses")
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Повреждённая запись кэша парсинга {path}: {e}")
+            self._count("errors")
+            return None
+
+        self._count("hits")
+        return entry
+
+    def put(self, content_hash, parser_version, entry):
+        path = self.path(content_hash, parser_version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Не удалось записать кэш парсинга: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_or_parse(self, parser, pdf_path, content_hash=None):
+        """Текст и поля резюме из кэша; при промахе PDF разбирается и запись сохраняется"""
+        content_hash = content_hash or file_sha256(pdf_path)
+        parser_version = parser.cache_version
+        entry = self.get(content_hash, parser_version)
+        if entry is not None:
+            return entry
+
+        text, stats = parser.extract_text_with_stats(pdf_path)
+        entry = {
+            "content_hash": content_hash,
+            "parser_version": parser_version,
+            "text": text,
+            "fields": parser.parse_text(text),
+            "stats": stats
+        }
+        self.put(content_hash, parser_version, entry)
+        return entry
+
+    def get_or_parse_many(self, parser, pdf_paths, workers=None):
+        """get_or_parse для списка файлов: промахи разбираются параллельно в пуле процессов"""
+        results = {}
+        pending = {}
+        for pdf_path in pdf_paths:
+            content_hash = file_sha256(pdf_path)
+            entry = self.get(content_hash, parser.cache_version)
+            if entry is not None:
+                results[pdf_path] = entry
+            else:
+                pending[pdf_path] = content_hash
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                futures = {
+                    executor.submit(_parse_task, self.directory, parser, pdf_path, content_hash): pdf_path
+                    for pdf_path, content_hash in pending.items()
+                }
+                for future in as_completed(futures):
+                    pdf_path = futures[future]
+                    try:
+                        results[pdf_path] = future.result()
+                    except Exception as e:
+                        print(f"Ошибка при разборе {pdf_path}: {e}")
+
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "directory": self.directory}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+def _parse_task(directory, parser, pdf_path, content_hash):
+    return ParseCache(directory).get_or_parse(parser, pdf_path, content_hash)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """Общий для процесса кэш в PARSE_CACHE_DIR (по умолчанию back/parse_cache)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseCache()
+    return _cache
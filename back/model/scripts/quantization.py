@@ -0,0 +1,49 @@
+import os
+import json
+import torch
+
+# Веса int8, выгруженные quantize_models; fp32 по-прежнему берутся из from_pretrained
+QUANTIZED_DIRECTORY = os.environ.get(
+    "QUANTIZED_MODELS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trained_models", "quantized")
+)
+
+VARIANTS = ("fp32", "int8")
+
+
+def quantize(model: torch.nn.Module) -> torch.nn.Module:
+    """Динамическая int8-квантизация: веса Linear в int8, активации квантуются на лету"""
+    model.to('cpu').eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def artifact_paths(name: str, directory: str = None) -> tuple:
+    """Пути к весам <name>.int8.pt и манифесту <name>.int8.json"""
+    directory = directory or QUANTIZED_DIRECTORY
+    return os.path.join(directory, f"{name}.int8.pt"), os.path.join(directory, f"{name}.int8.json")
+
+
+def save_quantized(model: torch.nn.Module, name: str, manifest: dict, directory: str = None) -> str:
+    directory = directory or QUANTIZED_DIRECTORY
+    os.makedirs(directory, exist_ok=True)
+    path, manifest_path = artifact_paths(name, directory)
+
+    torch.save(model.state_dict(), path)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({**manifest, 'name': name, 'variant': 'int8', 'torch_version': torch.__version__},
+                  f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_quantized(model_class, model_name: str, name: str, directory: str = None, **config_kwargs):
+    """int8-модель без загрузки fp32 весов: каркас по конфигу, квантизация, затем сохранённый state_dict"""
+    path, _ = artifact_paths(name, directory)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Нет квантованных весов {path}: выполните python -m model.scripts.quantize_models"
+        )
+
+    config = model_class.config_class.from_pretrained(model_name, **config_kwargs)
+    model = quantize(model_class(config))
+    model.load_state_dict(torch.load(path, map_location='cpu'))
+    return model.eval()
@@ -0,0 +1,200 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
+
+import argparse
+import io
+import json
+import time
+import numpy as np
+import torch
+from transformers import BertModel
+from model.scripts.resume_matching_system import ResumeMatchingSystem
+from model.scripts.resume_bert_matcher import ResumeMatcher
+from model.scripts.train_resume_matcher import ResumeMatcherTrainer
+from model.scripts.quantization import QUANTIZED_DIRECTORY, quantize, save_quantized
+
+REPORT_NAME = 'quantization_report.json'
+
+
+def quantize_torch(weights: str = None, directory: str = QUANTIZED_DIRECTORY):
+    """int8-веса энкодера и кросс-энкодера для бэкенда torch"""
+    encoder = BertModel.from_pretrained(ResumeMatchingSystem.MODEL_NAME)
+    path = save_quantized(quantize(encoder), ResumeMatchingSystem.ARTIFACT_NAME,
+                          {'model_name': ResumeMatchingSystem.MODEL_NAME}, directory)
+    print(f"torch int8: {path} ({os.path.getsize(path) / 2**20:.1f} МБ)")
+
+    matcher = ResumeMatcher()
+    if weights:
+        matcher.load_model(weights)
+    path = save_quantized(quantize(matcher.model), ResumeMatcher.ARTIFACT_NAME,
+                          {'model_name': ResumeMatcher.MODEL_NAME,
+                           'weights': os.path.abspath(weights) if weights else None}, directory)
+    print(f"torch int8: {path} ({os.path.getsize(path) / 2**20:.1f} МБ)")
+
+
+def quantize_onnx(directory: str = None):
+    """int8-варианты ONNX-графов из onnx_export: <name>.int8.onnx рядом с fp32"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from model.scripts.onnx_runtime import model_paths
+
+    for name in (ResumeMatchingSystem.ARTIFACT_NAME, ResumeMatcher.ARTIFACT_NAME):
+        source, source_manifest = model_paths(name, directory)
+        if not os.path.exists(source):
+            print(f"onnx int8: нет {source}, сначала python -m model.scripts.onnx_export")
+            continue
+
+        target, target_manifest = model_paths(name, directory, 'int8')
+        quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+
+        with open(source_manifest, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(target_manifest, 'w', encoding='utf-8') as f:
+            json.dump({**manifest, 'variant': 'int8', 'source': os.path.abspath(source)}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"onnx int8: {target} ({os.path.getsize(target) / 2**20:.1f} МБ)")
+
+
+def rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def weights_bytes(model, backend: str, variant: str, name: str) -> int:
+    """Размер весов: сериализованный state_dict для torch, файл графа для onnx"""
+    if backend == 'onnx':
+        from model.scripts.onnx_runtime import model_paths
+        return os.path.getsize(model_paths(name, variant=variant)[0])
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def load(factory):
+    """Экземпляр модели и прирост RSS процесса при его загрузке"""
+    before = rss_bytes()
+    instance = factory()
+    return instance, max(rss_bytes() - before, 0)
+
+
+def evaluate_cross_encoder(matcher: ResumeMatcher, test_pairs: list) -> dict:
+    """Точность и задержка на пару на отложенной выборке ResumeMatcherTrainer.prepare_data"""
+    latencies, correct = [], 0
+    for pair in test_pairs:
+        started = time.perf_counter()
+        probability = matcher.predict(pair['resume_text'], pair['vacancy_text'])
+        latencies.append(time.perf_counter() - started)
+        correct += int((probability > 0.5) == bool(pair['label']))
+    return {
+        'accuracy': correct / len(test_pairs),
+        'latency_ms_p50': float(np.percentile(latencies, 50) * 1000),
+        'latency_ms_mean': float(np.mean(latencies) * 1000)
+    }
+
+
+def evaluate_encoder(system: ResumeMatchingSystem, test_pairs: list, reference: np.ndarray = None) -> tuple:
+    """Точность выбора категории по близости резюме к "<Category> position" и задержка на пару текстов"""
+    positives = [pair for pair in test_pairs if pair['label'] == 1]
+    categories = sorted({pair['vacancy_text'] for pair in positives})
+
+    category_embeddings = system.encode_texts(categories)
+    latencies, embeddings = [], []
+    for pair in positives:
+        started = time.perf_counter()
+        embeddings.append(system.encode_texts([pair['resume_text']])[0])
+        latencies.append(time.perf_counter() - started)
+    embeddings = np.stack(embeddings)
+
+    predicted = (embeddings @ category_embeddings.T).argmax(axis=1)
+    expected = [categories.index(pair['vacancy_text']) for pair in positives]
+    result = {
+        'accuracy': float(np.mean(predicted == np.asarray(expected))),
+        'latency_ms_p50': float(np.percentile(latencies, 50) * 1000),
+        'latency_ms_mean': float(np.mean(latencies) * 1000)
+    }
+    if reference is not None:
+        result['cosine_to_fp32_min'] = float((embeddings * reference).sum(axis=1).min())
+    return result, embeddings
+
+
+def build_report(args) -> dict:
+    # Та же отложенная выборка, что при обучении кросс-энкодера, но воспроизводимая
+    _, test_pairs = ResumeMatcherTrainer(args.dataset, seed=args.seed).prepare_data()
+    test_pairs = test_pairs[:args.limit]
+    print(f"Отложенная выборка: {len(test_pairs)} пар (seed {args.seed})")
+
+    report = {'pairs': len(test_pairs), 'seed': args.seed, 'models': {}}
+    for backend in args.backends:
+        # Кросс-энкодер: fp32 - обученные веса, int8 - их квантованная копия
+        for variant in ('fp32', 'int8'):
+            matcher, rss = load(lambda: ResumeMatcher(backend=backend, variant=variant))
+            if backend == 'torch' and variant == 'fp32' and args.matcher_weights:
+                matcher.load_model(args.matcher_weights)
+            metrics = evaluate_cross_encoder(matcher, test_pairs)
+            metrics['weights_mb'] = weights_bytes(matcher.model, backend, variant,
+                                                  ResumeMatcher.ARTIFACT_NAME) / 2**20
+            metrics['rss_delta_mb'] = rss / 2**20
+            report['models'][f"cross_encoder/{backend}/{variant}"] = metrics
+            del matcher
+
+        reference = None
+        for variant in ('fp32', 'int8'):
+            system, rss = load(lambda: ResumeMatchingSystem(backend=backend, variant=variant))
+            metrics, embeddings = evaluate_encoder(system, test_pairs, reference)
+            reference = embeddings if reference is None else reference
+            metrics['weights_mb'] = weights_bytes(system.bert_matcher, backend, variant,
+                                                  ResumeMatchingSystem.ARTIFACT_NAME) / 2**20
+            metrics['rss_delta_mb'] = rss / 2**20
+            report['models'][f"encoder/{backend}/{variant}"] = metrics
+            del system
+
+    for key, metrics in report['models'].items():
+        model, backend, variant = key.split('/')
+        if variant == 'int8':
+            baseline = report['models'][f"{model}/{backend}/fp32"]
+            metrics['accuracy_delta'] = metrics['accuracy'] - baseline['accuracy']
+            metrics['speedup'] = baseline['latency_ms_mean'] / metrics['latency_ms_mean']
+    return report
+
+
+def print_report(report: dict):
+    print(f"{'модель':<28}{'точность':>10}{'Δ':>8}{'веса, МБ':>10}{'RSS, МБ':>9}{'p50, мс':>9}{'ускор.':>8}")
+    for key, m in report['models'].items():
+        delta = f"{m['accuracy_delta']:+.3f}" if 'accuracy_delta' in m else ''
+        speedup = f"{m['speedup']:.2f}x" if 'speedup' in m else ''
+        print(f"{key:<28}{m['accuracy']:>10.3f}{delta:>8}{m['weights_mb']:>10.1f}{m['rss_delta_mb']:>9.1f}"
+              f"{m['latency_ms_p50']:>9.1f}{speedup:>8}")
+
+
+def main():
+    # Запуск из папки back:
+    # python -m model.scripts.quantize_models --matcher-weights model/trained_models/best_resume_matcher.pt \
+    #     --dataset ../UpdatedResumeDataSet.csv --backends torch onnx
+    parser = argparse.ArgumentParser(description="int8 динамическая квантизация энкодера и кросс-энкодера с отчётом")
+    parser.add_argument('--matcher-weights', default=None, help="state_dict ResumeMatcher после обучения")
+    parser.add_argument('--dataset', default=None, help="UpdatedResumeDataSet.csv для отложенной выборки")
+    parser.add_argument('--backends', nargs='+', choices=['torch', 'onnx'], default=['torch'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--limit', type=int, default=400, help="Сколько пар отложенной выборки оценивать")
+    parser.add_argument('--skip-report', action='store_true')
+    args = parser.parse_args()
+
+    # Артефакты пишутся туда, откуда их загружает сервис (QUANTIZED_MODELS_DIR)
+    quantize_torch(args.matcher_weights)
+    if 'onnx' in args.backends:
+        quantize_onnx()
+
+    if args.skip_report:
+        return
+
+    report = build_report(args)
+    print_report(report)
+    report_path = os.path.join(QUANTIZED_DIRECTORY, REPORT_NAME)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Отчёт: {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,22 @@ import json
 import numpy as np
 from tqdm import tqdm
 import logging
+try:
+    from model.scripts.batching import LengthBucketSampler, PadCollator, length_batches
+except ImportError:
+    # Скрипты из model/scripts запускаются без пакета model
+    from batching import LengthBucketSampler, PadCollator, length_batches
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ResumeVacancyDataset(Dataset):
+    """Пары резюме/вакансия, токенизированные один раз и без паддинга
+
+    Паддинг делает PadCollator по самой длинной паре батча; lengths нужны
+    LengthBucketSampler, чтобы собирать батчи из пар близкой длины.
+    """
+
     def __init__(self, resume_texts, vacancy_texts, labels, tokenizer, max_len=512):
         self.resume_texts = resume_texts
         self.vacancy_texts = vacancy_texts
@@ -17,44 +28,71 @@ class ResumeVacancyDataset(Dataset):
         self.tokenizer = tokenizer
         self.max_len = max_len
 
-    def __len__(self):
-        return len(self.labels)
-
-    def __getitem__(self, idx):
-        resume_text = str(self.resume_texts[idx])
-        vacancy_text = str(self.vacancy_texts[idx])
-        label = self.labels[idx]
-
-        # Кодируем пару текстов как в AI-career-consultant
-        encoding = self.tokenizer.encode_plus(
-            resume_text,
-            vacancy_text,
+        # Кодируем пару текстов как в AI-career-consultant, один раз на все эпохи;
+        # паддинг до max_len не нужен, его делает коллатор по батчу
+        self.encodings = self.tokenizer(
+            [str(text) for text in resume_texts],
+            [str(text) for text in vacancy_texts],
             add_special_tokens=True,
             max_length=self.max_len,
-            padding='max_length',
             truncation=True,
             return_attention_mask=True,
-            return_token_type_ids=True,
-            return_tensors='pt'
+            return_token_type_ids=True
         )
+        self.lengths = [len(input_ids) for input_ids in self.encodings['input_ids']]
 
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
         return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'token_type_ids': encoding['token_type_ids'].flatten(),
-            'labels': torch.tensor(label, dtype=torch.long)
+            'input_ids': self.encodings['input_ids'][idx],
+            'attention_mask': self.encodings['attention_mask'][idx],
+            'token_type_ids': self.encodings['token_type_ids'][idx],
+            'labels': self.labels[idx]
         }
 
 class ResumeMatcher:
-    def __init__(self):
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        logger.info(f"Using device: {self.device}")
+    MODEL_NAME = 'bert-base-multilingual-cased'
+    # Имя ONNX-графа и квантованных весов кросс-энкодера
+    ARTIFACT_NAME = 'cross_encoder'
+    # Размер микро-батча при пакетной оценке пар
+    BATCH_SIZE = 16
+
+    def __init__(self, backend: str = 'torch', variant: str = 'fp32'):
+        # Динамически квантованные int8-модели работают только на CPU
+        self.device = torch.device('cuda' if torch.cuda.is_available() and variant == 'fp32' else 'cpu')
+        self.backend = backend
+        self.variant = variant
+        logger.info(f"Using device: {self.device}, backend: {backend}, variant: {variant}")
 
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-multilingual-cased')
-        self.model = BertForSequenceClassification.from_pretrained(
-            'bert-base-multilingual-cased',
-            num_labels=2
-        ).to(self.device)
+        self.tokenizer = BertTokenizer.from_pretrained(self.MODEL_NAME)
+        if backend == 'onnx':
+            # Только инференс: граф выгружен из обученных весов в onnx_export
+            try:
+                from model.scripts.onnx_runtime import OnnxModel
+            except ImportError:
+                # Скрипты из model/scripts запускаются без пакета model
+                from onnx_runtime import OnnxModel
+            self.model = None
+            self.session = OnnxModel(self.ARTIFACT_NAME, variant=variant)
+        elif backend == 'torch' and variant == 'int8':
+            # Только инференс: веса int8 выгружены quantize_models из обученной модели
+            try:
+                from model.scripts.quantization import load_quantized
+            except ImportError:
+                from quantization import load_quantized
+            self.model = load_quantized(BertForSequenceClassification, self.MODEL_NAME, self.ARTIFACT_NAME,
+                                        num_labels=2)
+        elif backend == 'torch':
+            self.model = BertForSequenceClassification.from_pretrained(
+                self.MODEL_NAME,
+                num_labels=2
+            ).to(self.device)
+        else:
+            raise ValueError(f"Unknown backend {backend}")
+        if self.model is not None:
+            self.model.eval()
 
         # Гиперпараметры из AI-career-consultant
         self.MAX_LEN = 512
@@ -95,10 +133,11 @@ class ResumeMatcher:
             self.MAX_LEN
         )
 
+        # Батчи из пар близкой длины с паддингом до самой длинной в батче
         train_dataloader = DataLoader(
             train_dataset,
-            batch_size=self.TRAIN_BATCH_SIZE,
-            shuffle=True
+            batch_sampler=LengthBucketSampler(train_dataset.lengths, self.TRAIN_BATCH_SIZE, shuffle=True),
+            collate_fn=PadCollator(self.tokenizer)
         )
 
         # Оптимизатор и планировщик
@@ -153,37 +192,75 @@ class ResumeMatcher:
             avg_train_loss = total_loss / len(train_dataloader)
             logger.info(f'Average training loss: {avg_train_loss}')
 
+        self.model.eval()
+
     def predict(self, resume_text, vacancy_text):
         """Предсказание соответствия резюме вакансии"""
-        self.model.eval()
-        
-        encoding = self.tokenizer.encode_plus(
-            resume_text,
-            vacancy_text,
+        return float(self.predict_many([resume_text], vacancy_text)[0])
+
+    def predict_many(self, resume_texts, vacancy_texts, batch_size=None):
+        """Вероятности соответствия для списка пар, посчитанные микро-батчами
+
+        vacancy_texts - список той же длины или одна строка для всех резюме.
+        Пары токенизируются один раз без паддинга, сортируются по длине и
+        дополняются только до самой длинной в своём батче.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        resume_texts = [str(text or '') for text in resume_texts]
+        if isinstance(vacancy_texts, str):
+            vacancy_texts = [vacancy_texts] * len(resume_texts)
+        vacancy_texts = [str(text or '') for text in vacancy_texts]
+        probabilities = np.zeros(len(resume_texts), dtype=np.float32)
+        if not resume_texts:
+            return probabilities
+
+        encodings = self.tokenizer(
+            resume_texts,
+            vacancy_texts,
             add_special_tokens=True,
             max_length=self.MAX_LEN,
-            padding='max_length',
             truncation=True,
             return_attention_mask=True,
-            return_token_type_ids=True,
-            return_tensors='pt'
+            return_token_type_ids=True
         )
+        collate = PadCollator(self.tokenizer)
+        features = [
+            {name: encodings[name][i] for name in ('input_ids', 'attention_mask', 'token_type_ids')}
+            for i in range(len(resume_texts))
+        ]
 
-        input_ids = encoding['input_ids'].to(self.device)
-        attention_mask = encoding['attention_mask'].to(self.device)
-        token_type_ids = encoding['token_type_ids'].to(self.device)
+        with torch.inference_mode():
+            for batch_idx in length_batches([len(f['input_ids']) for f in features], batch_size):
+                batch = collate([features[i] for i in batch_idx])
+                probabilities[batch_idx] = self._match_probabilities(batch)
 
-        with torch.no_grad():
-            outputs = self.model(
-                input_ids=input_ids,
-                attention_mask=attention_mask,
-                token_type_ids=token_type_ids
-            )
-            
-            probabilities = torch.softmax(outputs.logits, dim=1)
-            match_probability = probabilities[0][1].item()
+        return probabilities
+
+    def _match_probabilities(self, batch: dict) -> np.ndarray:
+        if self.backend == 'onnx':
+            logits = self.session.run({name: tensor.numpy() for name, tensor in batch.items()})
+            probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            return probabilities[:, 1]
+
+        logits = self.model(**{name: tensor.to(self.device) for name, tensor in batch.items()}).logits
+        return torch.softmax(logits, dim=1)[:, 1].float().cpu().numpy()
+
+    def rerank(self, vacancy_text, candidates, top_k=None, batch_size=None):
+        """Индексы кандидатов и вероятности, по убыванию вероятности; только top_k лучших
 
-        return match_probability
+        Полная сортировка не нужна: argpartition отбирает top_k за линейное время,
+        сортируются только они.
+        """
+        probabilities = self.predict_many(candidates, vacancy_text, batch_size=batch_size)
+        if top_k is None or top_k >= len(probabilities):
+            top = np.arange(len(probabilities))
+        elif top_k <= 0:
+            return []
+        else:
+            top = np.argpartition(-probabilities, top_k - 1)[:top_k]
+        top = top[np.argsort(-probabilities[top], kind='stable')]
+        return [(int(i), float(probabilities[i])) for i in top]
 
     def save_model(self, path):
         """Сохранение модели"""
@@ -192,5 +269,5 @@ class ResumeMatcher:
 
     def load_model(self, path):
         """Загрузка модели"""
-        self.model.load_state_dict(torch.load(path))
+        self.model.load_state_dict(torch.load(path, map_location=self.device))
         logger.info(f"Model loaded from {path}") 
\ No newline at end of file
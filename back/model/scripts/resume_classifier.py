@@ -4,30 +4,62 @@ import json
 import numpy as np
 from sklearn.model_selection import train_test_split
 import os
+import time
 from sklearn.utils.class_weight import compute_class_weight
 
+SCRIPTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+# Артефакты train_classifier: веса, токенизатор, model_config.json и categories.json
+CLASSIFIER_DIRECTORY = os.environ.get(
+    "RESUME_CLASSIFIER_DIR",
+    os.path.join(os.path.dirname(SCRIPTS_DIRECTORY), "trained_models", "resume_classifier")
+)
+BASE_MODEL_NAME = "distilbert-base-uncased"
+# Если model_config.json нет ни в артефактах, ни рядом со скриптом: длина как при обучении
+DEFAULT_CONFIG = {'architecture': {'max_length': 512}}
+
 class ResumeClassifier:
-    def __init__(self):
-        # Загружаем конфигурацию модели
-        with open("model/scripts/model_config.json", "r", encoding='utf-8') as config_file:
-            self.config = json.load(config_file)
-        
+    # Длины, до которых паддятся батчи: у tf.function и ядер TF конечный набор форм
+    PADDING_BUCKETS = (64, 128, 256, 512)
+    BATCH_SIZE = 16
+
+    def __init__(self, model_path=None):
+        """Без model_path - базовый DistilBERT для обучения, с ним - сразу обученная модель из артефактов"""
+        self.model_path = model_path
+
+        # Конфигурация и категории: сначала из артефактов модели, затем из model/scripts
+        self.config = read_json('model_config.json', model_path) or DEFAULT_CONFIG
         self.max_length = self.config['architecture']['max_length']
-        
-        # Загружаем категории из JSON файла
-        with open("model/scripts/categories.json", "r", encoding='utf-8') as file:
-            self.labels_dict = json.load(file)
-            
+
+        self.labels_dict = read_json('categories.json', model_path)
+        if self.labels_dict is None:
+            raise FileNotFoundError(f"categories.json не найден ни в {model_path}, ни в {SCRIPTS_DIRECTORY}")
+        self.set_labels(self.labels_dict)
+        
+        # Веса загружаются один раз: обученные из model_path или базовые для обучения
+        if model_path:
+            self.model = TFDistilBertForSequenceClassification.from_pretrained(model_path)
+        else:
+            self.model = TFDistilBertForSequenceClassification.from_pretrained(
+                BASE_MODEL_NAME,
+                num_labels=len(self.labels_dict)
+            )
+        # save_model кладёт токенизатор рядом с весами, у старых артефактов его может не быть
+        has_tokenizer = model_path and os.path.exists(os.path.join(model_path, 'tokenizer_config.json'))
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path if has_tokenizer else BASE_MODEL_NAME)
+        self._serving_fn = None
+
+    @classmethod
+    def load(cls, path=None):
+        """Обученный классификатор из CLASSIFIER_DIRECTORY (или path)"""
+        path = os.path.abspath(path or CLASSIFIER_DIRECTORY)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Обученный классификатор не найден: {path}, сначала запустите train_classifier")
+        return cls(path)
+
+    def set_labels(self, labels_dict):
         # Инвертируем словарь для получения числовых меток
-        self.label_to_id = {label: idx for label, idx in self.labels_dict.items()}
-        self.id_to_label = {idx: label for label, idx in self.labels_dict.items()}
-        
-        # Загружаем предобученную модель
-        self.model = TFDistilBertForSequenceClassification.from_pretrained(
-            "distilbert-base-uncased",
-            num_labels=len(self.labels_dict)
-        )
-        self.tokenizer = AutoTokenizer.from_pretrained("distilbert-base-uncased")
+        self.label_to_id = {label: int(idx) for label, idx in labels_dict.items()}
+        self.id_to_label = {int(idx): label for label, idx in labels_dict.items()}
         
     def initialize_labels(self, train_labels):
         unique_labels = sorted(set(train_labels))
@@ -99,34 +131,91 @@ class ResumeClassifier:
                 text = file.read()
         else:
             text = text_or_path
-        
-        # Токенизируем текст
-        inputs = self.tokenizer(
-            text,
-            truncation=True,
-            padding=True,
-            max_length=self.max_length,
-            return_tensors='tf'
-        )
-        
-        # Получаем предсказания
-        outputs = self.model(inputs)
-        predictions = tf.nn.softmax(outputs.logits, axis=-1)
-        predicted_label_id = tf.argmax(predictions, axis=-1).numpy()[0]
-        
-        # Конвертируем числовую метку обратно в категорию
-        return self.id_to_label[predicted_label_id]
+
+        labels, _ = self.predict_categories([text])
+        return labels[0]
+
+    def predict_categories(self, texts, batch_size=None):
+        """
+        Категории и вероятности по всем категориям для списка текстов
+
+        Тексты токенизируются один раз, сортируются по длине и идут батчами
+        через скомпилированную serving-функцию; батч паддится до ближайшей
+        длины из PADDING_BUCKETS, а не до max_length.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        texts = [str(text or '') for text in texts]
+        probabilities = np.zeros((len(texts), len(self.id_to_label)), dtype=np.float32)
+        if not texts:
+            return [], probabilities
+
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = np.array([len(input_ids) for input_ids in encodings['input_ids']])
+        order = np.argsort(lengths, kind='stable')
+        serve = self._serving()
+
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            padded_length = self._bucket_length(int(lengths[batch_idx].max()))
+            input_ids = np.full((len(batch_idx), padded_length), self.tokenizer.pad_token_id, dtype=np.int32)
+            attention_mask = np.zeros((len(batch_idx), padded_length), dtype=np.int32)
+            for row, i in enumerate(batch_idx):
+                input_ids[row, :lengths[i]] = encodings['input_ids'][i]
+                attention_mask[row, :lengths[i]] = 1
+            probabilities[batch_idx] = serve(tf.constant(input_ids), tf.constant(attention_mask)).numpy()
+
+        labels = [self.id_to_label[int(label_id)] for label_id in probabilities.argmax(axis=1)]
+        return labels, probabilities
+
+    def warm_up(self):
+        """Трассировка serving-функции и прогон каждой длины паддинга до первого запроса"""
+        started = time.perf_counter()
+        serve = self._serving()
+        for length in sorted({min(bucket, self.max_length) for bucket in self.PADDING_BUCKETS}):
+            input_ids = np.full((1, length), self.tokenizer.pad_token_id, dtype=np.int32)
+            serve(tf.constant(input_ids), tf.constant(np.ones_like(input_ids)))
+        return time.perf_counter() - started
+
+    def _bucket_length(self, longest):
+        for bucket in self.PADDING_BUCKETS:
+            if longest <= bucket <= self.max_length:
+                return bucket
+        return self.max_length
+
+    def _serving(self):
+        """tf.function с фиксированной сигнатурой: граф трассируется один раз на модель"""
+        if self._serving_fn is None:
+            model = self.model
+
+            @tf.function(input_signature=[
+                tf.TensorSpec([None, None], tf.int32, name='input_ids'),
+                tf.TensorSpec([None, None], tf.int32, name='attention_mask')
+            ])
+            def serve(input_ids, attention_mask):
+                logits = model(input_ids=input_ids, attention_mask=attention_mask, training=False).logits
+                return tf.nn.softmax(logits, axis=-1)
+
+            self._serving_fn = serve
+        return self._serving_fn
     
     def save_model(self, path):
         """Сохранение модели и конфигурации"""
         self.model.save_pretrained(path)
         self.tokenizer.save_pretrained(path)
         self.save_model_config(path)
+        # Категории в порядке выходов обученной головы
+        with open(os.path.join(path, 'categories.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.label_to_id, f, ensure_ascii=False, indent=4)
     
     def load_model(self, path):
         """Загрузка модели и конфигурации"""
         self.model = TFDistilBertForSequenceClassification.from_pretrained(path)
+        self._serving_fn = None
         self.load_model_config(path)
+        labels_dict = read_json('categories.json', path, fallback=False)
+        if labels_dict is not None:
+            self.labels_dict = labels_dict
+            self.set_labels(labels_dict)
     
     def get_model_architecture(self):
         """Получение архитектуры модели"""
@@ -145,3 +234,16 @@ class ResumeClassifier:
             with open(config_path, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
             self.max_length = self.config['architecture']['max_length']
+
+
+def read_json(name, model_path=None, fallback=True):
+    """JSON из каталога модели, а при его отсутствии - из model/scripts; пути не зависят от cwd"""
+    directories = [model_path] if model_path else []
+    if fallback:
+        directories.append(SCRIPTS_DIRECTORY)
+    for directory in directories:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    return None
@@ -10,16 +10,56 @@ import numpy as np
 import re
 import logging
 from model.scripts.use_trained_model import ResumeMatcherPredictor
+from model.scripts.skills import SkillExtractor
+from model.scripts import criteria_scoring
 import spacy
 
+
+def mean_pool(hidden: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+    """Нормированное среднее скрытых состояний по токенам без паддинга; его же выгружает onnx_export"""
+    mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+    pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+    return torch.nn.functional.normalize(pooled, p=2, dim=1)
+
+
 class ResumeMatchingSystem:
-    def __init__(self):
-        self.bert_matcher = BertModel.from_pretrained('bert-base-multilingual-cased')
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-multilingual-cased')
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        self.bert_matcher.to(self.device)
+    MODEL_NAME = 'bert-base-multilingual-cased'
+    # Имя ONNX-графа и квантованных весов энкодера
+    ARTIFACT_NAME = 'encoder'
+    # Увеличивается при любом изменении, после которого старые эмбеддинги несовместимы
+    EMBEDDING_VERSION = 1
+    BERT_WEIGHT = 0.7
+    SKILLS_WEIGHT = 0.3
+    MAX_LENGTH = 512
+    BATCH_SIZE = 16
+
+    def __init__(self, backend: str = 'torch', variant: str = 'fp32'):
+        self.backend = backend
+        self.variant = variant
+        self.tokenizer = BertTokenizer.from_pretrained(self.MODEL_NAME)
+        # Динамически квантованные int8-модели работают только на CPU
+        self.device = torch.device('cuda' if torch.cuda.is_available() and variant == 'fp32' else 'cpu')
+        if backend == 'onnx':
+            # Граф с mean pooling и нормировкой внутри, torch-модель не загружается
+            from model.scripts.onnx_runtime import OnnxModel
+            self.bert_matcher = None
+            self.encoder = OnnxModel(self.ARTIFACT_NAME, variant=variant)
+            self.hidden_size = self.encoder.manifest['hidden_size']
+        elif backend == 'torch':
+            if variant == 'int8':
+                from model.scripts.quantization import load_quantized
+                self.bert_matcher = load_quantized(BertModel, self.MODEL_NAME, self.ARTIFACT_NAME)
+            else:
+                self.bert_matcher = BertModel.from_pretrained(self.MODEL_NAME)
+            self.bert_matcher.to(self.device)
+            # Экземпляр общий для всех запросов воркера, поэтому только режим инференса
+            self.bert_matcher.eval()
+            self.hidden_size = self.bert_matcher.config.hidden_size
+        else:
+            raise ValueError(f"Неизвестный бэкенд {backend}")
         self.nlp = spacy.load('ru_core_news_sm')
         self.tfidf = TfidfVectorizer()
+        self.skills = SkillExtractor()
 
     def get_ml_scores(self, vacancy_text: str, resume_text: str):
         try:
@@ -36,7 +76,7 @@ class ResumeMatchingSystem:
             )
             
             # Вычисляем общий скор как в analyze_resume
-            total_score = (bert_similarity * 0.7) + (skills_match * 0.3)
+            total_score = (bert_similarity * self.BERT_WEIGHT) + (skills_match * self.SKILLS_WEIGHT)
             
             return {
                 'total_score': float(total_score),
@@ -51,67 +91,84 @@ class ResumeMatchingSystem:
                 'skills_match': 0.0
             }
 
+    def score_many(self, vacancy_text: str, resume_texts: list, batch_size: int = None) -> list:
+        """Оценка одной вакансии против списка резюме за один проход энкодера"""
+        if not resume_texts:
+            return []
+
+        vacancy_embedding = self.encode_texts([vacancy_text])[0]
+        resume_embeddings = self.encode_texts(resume_texts, batch_size=batch_size)
+        bert_similarities = resume_embeddings @ vacancy_embedding
+        # Навыки всех резюме - одно произведение разреженной матрицы на вектор вакансии
+        skills_matches = self.skills.overlap_many(vacancy_text, resume_texts)
+
+        results = []
+        for bert_similarity, skills_match in zip(bert_similarities, skills_matches):
+            total_score = (bert_similarity * self.BERT_WEIGHT) + (skills_match * self.SKILLS_WEIGHT)
+            results.append({
+                'total_score': float(total_score),
+                'bert_similarity': float(bert_similarity),
+                'skills_match': float(skills_match)
+            })
+
+        return results
+
+    def calculate_bert_similarity(self, vacancy_text: str, resume_text: str) -> float:
+        """Косинусная близость BERT-эмбеддингов вакансии и резюме"""
+        embeddings = self.encode_texts([vacancy_text, resume_text])
+        return float(embeddings[0] @ embeddings[1])
+
+    def encode_texts(self, texts: list, batch_size: int = None) -> np.ndarray:
+        """Нормированные mean-pooling эмбеддинги текстов, посчитанные микро-батчами"""
+        batch_size = batch_size or self.BATCH_SIZE
+        texts = [str(text or '') for text in texts]
+        embeddings = np.zeros((len(texts), self.hidden_size), dtype=np.float32)
+
+        # Сортируем по длине, чтобы в батч попадали тексты близкой длины и паддинга было меньше
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch_idx = order[start:start + batch_size]
+                embeddings[batch_idx] = self._encode_batch([texts[i] for i in batch_idx])
+
+        return embeddings
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        if self.backend == 'onnx':
+            inputs = self.tokenizer(texts, padding='longest', truncation=True,
+                                    max_length=self.MAX_LENGTH, return_tensors='np')
+            return self.encoder.run(inputs)
+
+        inputs = self.tokenizer(texts, padding='longest', truncation=True,
+                                max_length=self.MAX_LENGTH, return_tensors='pt')
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        return mean_pool(self.bert_matcher(**inputs).last_hidden_state, inputs['attention_mask']).cpu().numpy()
+
+    def analyze_technical_skills(self, vacancy_text: str, resume_text: str) -> float:
+        """Доля навыков вакансии из словаря, найденных в резюме"""
+        return self.skills.overlap(vacancy_text, resume_text)
+
     def match_experience(self, resume_exp: str, vacancy_exp: str) -> float:
         """Сопоставление опыта работы"""
-        exp_levels = {
-            'no_experience': 0,
-            '1-3': 1,
-            '3-5': 2,
-            '5+': 3
-        }
-        
-        resume_level = exp_levels.get(resume_exp, 0)
-        vacancy_level = exp_levels.get(vacancy_exp, 0)
-                        
-        if resume_level >= vacancy_level:
-            return 1.0
-        elif resume_level + 1 == vacancy_level:
-            return 0.7
-        return 0.3
+        return criteria_scoring.match_experience(resume_exp, vacancy_exp)
 
     def match_education(self, resume_edu: str, vacancy_edu: str) -> float:
         """Сопоставление образования"""
-        edu_levels = {
-            'secondary': 0,
-            'higher': 1,
-            'bachelor': 1,
-            'master': 2,
-            'phd': 3
-        }
-        
-        resume_level = edu_levels.get(resume_edu, 0)
-        vacancy_level = edu_levels.get(vacancy_edu, 0)
-        
-        if resume_level >= vacancy_level:
-            return 1.0
-        return 0.5
+        return criteria_scoring.match_education(resume_edu, vacancy_edu)
 
     def match_work_format(self, resume_format: str, vacancy_format: str) -> float:
         """Сопоставление формата работы"""
-        if resume_format == vacancy_format:
-            return 1.0
-        elif vacancy_format == 'hybrid':
-            return 0.8
-        elif resume_format == 'office' and vacancy_format == 'remote':
-            return 0.7
-        return 0.5
+        return criteria_scoring.match_work_format(resume_format, vacancy_format)
 
     def match_location(self, resume_area: str, vacancy_area: str, relocation: bool) -> float:
         """Сопоставление местоположения"""
-        if resume_area == vacancy_area:
-            return 1.0
-        elif relocation:
-            return 0.8
-        return 0.3
+        return criteria_scoring.match_location(resume_area, vacancy_area, relocation)
 
     def match_salary(self, resume_from: int, resume_to: int, 
                     vacancy_from: int, vacancy_to: int) -> float:
         """Сопоставление зарплатных ожиданий"""
-        if resume_from <= vacancy_to and resume_to >= vacancy_from:
-            return 1.0
-        elif abs(resume_from - vacancy_to) <= 50000 or abs(resume_to - vacancy_from) <= 50000:
-            return 0.7
-        return 0.3
+        return criteria_scoring.match_salary(resume_from, resume_to, vacancy_from, vacancy_to)
 
     def match_age(self, resume_from: str, resume_to: str, vacancy_from: str, vacancy_to: str) -> float:
         """Сопоставление возрастных требований"""
@@ -1,106 +1,182 @@
 import json
 import os
 import re
+import time
 from typing import Dict, List
 import pdfplumber
+try:
+    from model.scripts.field_extraction import FieldExtractor
+    from model.scripts import field_normalization as normalization
+except ImportError:
+    # Скрипты из model/scripts запускаются без пакета model
+    from field_extraction import FieldExtractor
+    import field_normalization as normalization
 
 class ResumeParser:
-    def __init__(self):
+    # Меняется при любом изменении правил извлечения: по ней инвалидируется кэш парсинга
+    PARSER_VERSION = 2
+
+    # Бюджет извлечения: больше этого резюме не читается
+    MAX_PAGES = 10
+    MAX_CHARS = 40000
+
+    def __init__(self, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS, stop_early: bool = True):
         self.required_fields = ['experience', 'education', 'workFormat', 'area']
+        # Поля, после нахождения которых остальные страницы не читаются;
+        # раздел навыков нужен для векторов навыков, он обычно в конце резюме
+        self.early_stop_fields = ['experience', 'education', 'area', 'skills']
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.stop_early = stop_early
+        self.extractor = FieldExtractor()
     
+    @property
+    def cache_version(self) -> str:
+        """Версия для ключа кэша: бюджет извлечения тоже влияет на результат"""
+        return f"v{self.PARSER_VERSION}-p{self.max_pages}-c{self.max_chars}-{'e' if self.stop_early else 'f'}"
+
     def parse_pdf_to_json(self, pdf_path: str) -> dict:
         """Преобразование PDF резюме в JSON формат"""
         try:
-            # Используем pdfplumber для извлечения текста
-            with pdfplumber.open(pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text()
-            
-            # Извлекаем данные из текста
-            return {
-                "position": self.extract_position(text),
-                "experience": self.extract_experience(text),
-                "education": self.extract_education(text),
-                "area": self.extract_area(text)
-            }
+            return self.parse_pdf_with_stats(pdf_path)[0]
         except Exception as e:
             print(f"Ошибка при парсинге PDF: {e}")
             return {}
 
+    def parse_pdf_with_stats(self, pdf_path: str):
+        """Поля резюме и статистика извлечения текста"""
+        text, stats = self.extract_text_with_stats(pdf_path)
+        return self.parse_text(text), stats
+
+    def extract_text(self, pdf_path: str) -> str:
+        """Извлечение текста из PDF"""
+        return self.extract_text_with_stats(pdf_path)[0]
+
+    def extract_text_with_stats(self, pdf_path: str):
+        """Постраничное извлечение текста в пределах бюджета страниц и символов
+
+        Чтение прекращается, как только на прочитанных страницах найдены
+        все early_stop_fields; каждая страница разбирается один раз. Поля,
+        которые ищутся по первому вхождению в порядке списка (город), могут
+        отличаться от разбора всего файла.
+        """
+        started = time.perf_counter()
+        parts = []
+        chars = 0
+        page_seconds = []
+        stop_reason = None
+        found = set()
+        required = set(self.early_stop_fields)
+
+        # Используем pdfplumber для извлечения текста
+        with pdfplumber.open(pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+
+            for page_number, page in enumerate(pdf.pages):
+                if page_number >= self.max_pages:
+                    stop_reason = "page_budget"
+                    break
+
+                page_started = time.perf_counter()
+                # extract_text возвращает None для страниц без текстового слоя
+                page_text = page.extract_text() or ""
+                # Освобождаем кэш объектов страницы, иначе pdfplumber держит их до закрытия файла
+                page.flush_cache()
+                page_seconds.append(round(time.perf_counter() - page_started, 4))
+
+                if chars + len(page_text) > self.max_chars:
+                    parts.append(page_text[:self.max_chars - chars])
+                    chars = self.max_chars
+                    stop_reason = "char_budget"
+                    break
+
+                # Поля ищутся только в новой странице вместе с последней строкой
+                # предыдущей: заголовок раздела может стоять в конце страницы
+                tail = parts[-1].rsplit("\n", 1)[-1] if parts else None
+                parts.append(page_text)
+                chars += len(page_text)
+
+                if self.stop_early and page_number + 1 < total_pages:
+                    found |= self.found_fields(page_text if tail is None else f"{tail}\n{page_text}")
+                    if found >= required:
+                        stop_reason = "fields_found"
+                        break
+
+        text = "\n".join(parts)
+        stats = {
+            "pages_total": total_pages,
+            "pages_parsed": len(page_seconds),
+            "chars": len(text),
+            "stop_reason": stop_reason,
+            "seconds": round(time.perf_counter() - started, 4),
+            "seconds_per_page": page_seconds
+        }
+        return text, stats
+
+    def has_required_fields(self, text: str) -> bool:
+        """Найдены ли в тексте все early_stop_fields"""
+        return self.found_fields(text) >= set(self.early_stop_fields)
+
+    def found_fields(self, text: str) -> set:
+        """early_stop_fields, найденные в тексте"""
+        fields = self.extractor.extract(text, defaults=False)
+        return {field for field in self.early_stop_fields if fields[field] is not None}
+
+    def parse_text(self, text: str) -> dict:
+        """Извлечение полей из текста резюме"""
+        fields = self.extract_fields(text)
+        return {
+            "position": fields["position"],
+            "experience": fields["experience"],
+            "education": fields["education"],
+            "area": fields["area"]
+        }
+
+    def parse_structured(self, text: str) -> dict:
+        """Нормализованные поля для индексированных колонок Resume; ненайденные - None"""
+        fields = self.extractor.extract(text, defaults=False)
+        salary_from, salary_to = fields["salary"] or (None, None)
+        return {
+            "experience_months": normalization.experience_months(fields["experience_total"]),
+            "education_level": normalization.education_level(fields["education"]),
+            "salary_from": normalization.salary(salary_from),
+            "salary_to": normalization.salary(salary_to),
+            "work_format": normalization.work_format(fields["work_format"]),
+            "area_id": normalization.area_id(fields["area"])
+        }
+
+    def extract_fields(self, text: str) -> dict:
+        """Все поля таблицы FIELD_RULES за один проход по тексту"""
+        return self.extractor.extract(text)
+
     def extract_position(self, text: str) -> str:
         """Извлечение должности"""
-        first_line = text.split('\n')[0].strip()
-        return first_line if first_line else "Неизвестная позиция"
+        return self.extract_fields(text)["position"]
 
     def extract_experience(self, text: str) -> str:
         """Извлечение опыта работы из текста резюме"""
-        if "опыт работы" in text.lower():
-            lines = text.lower().split('\n')
-            for i, line in enumerate(lines):
-                if "опыт работы" in line and i + 1 < len(lines):
-                    return lines[i + 1].strip()
-        return "Без опыта"
+        return self.extract_fields(text)["experience"]
 
     def extract_salary(self, text: str) -> tuple:
         """Извлечение зарплатных ожиданий"""
-        text = text.lower()
-        
-        # Поиск диапазона зарплаты
-        salary_range = re.search(r'зарплата:?\s*(\d+)\s*-\s*(\d+)|salary:?\s*(\d+)\s*-\s*(\d+)', text)
-        if salary_range:
-            groups = salary_range.groups()
-            if groups[0] and groups[1]:
-                return int(groups[0]), int(groups[1])
-            elif groups[2] and groups[3]:
-                return int(groups[2]), int(groups[3])
-        
-        # Поиск минимальной зарплаты
-        salary_from = re.search(r'от\s*(\d+)|from\s*(\d+)', text)
-        if salary_from:
-            min_salary = int(salary_from.group(1) or salary_from.group(2))
-            return min_salary, min_salary * 2
-        
-        # Значения по умолчанию
-        return 150000, 300000
+        return self.extract_fields(text)["salary"]
 
     def extract_currency(self, text: str) -> str:
         """Извлечение валюты"""
-        if re.search(r'тенге|kzt|тг', text.lower()):
-            return "KZT"
-        return "KZT"  # значение по умолчанию
+        return self.extract_fields(text)["currency"]
 
     def extract_work_format(self, text: str) -> str:
         """Извлечение формата работы"""
-        text = text.lower()
-        
-        if re.search(r'удаленн|remote|дистанционн', text):
-            return "remote"
-        elif re.search(r'гибрид|hybrid|смешанн', text):
-            return "hybrid"
-        elif re.search(r'офис|office', text):
-            return "office"
-            
-        # По умолчанию office, если не указано иное
-        return "office"
+        return self.extract_fields(text)["work_format"]
 
     def extract_education(self, text: str) -> str:
         """Извлечение уровня образования"""
-        if "образование" in text.lower():
-            lines = text.lower().split('\n')
-            for i, line in enumerate(lines):
-                if "образование" in line and i + 1 < len(lines):
-                    return lines[i + 1].strip()
-        return "Не указано"
+        return self.extract_fields(text)["education"]
 
     def extract_relocation(self, text: str) -> bool:
         """Готовность к релокации"""
-        return bool(re.search(r'готов к переезду|релокация|переезд', text.lower()))
+        return self.extract_fields(text)["relocation"]
 
     def extract_area(self, text: str) -> str:
         """Извлечение города"""
-        cities = ["Алматы", "Астана", "Караганда", "Шымкент"]
-        for city in cities:
-            if city.lower() in text.lower():
-                return city
-        return "Не указано"
\ No newline at end of file
+        return self.extract_fields(text)["area"]
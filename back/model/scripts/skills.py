@@ -0,0 +1,108 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+from scipy import sparse
+
+SKILLS_PATH = os.path.join(os.path.dirname(__file__), "skills.json")
+
+# Слова и отдельные знаки "./-:" - так "ci/cd", "asp.net" и "python-разработчик"
+# разбиваются одинаково в словаре и в тексте
+TOKEN_PATTERN = re.compile(r"[\w#+]+|[./\-:]")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillExtractor:
+    """Поиск навыков из словаря skills.json по префиксному дереву токенов
+
+    Каждый синоним - путь в дереве; в тексте на каждой позиции берётся
+    самое длинное совпадение, поэтому "react native" не считается как "react".
+    """
+
+    # Меняется при изменении токенизации: вместе со словарём входит в version
+    TOKENIZER_VERSION = 1
+
+    def __init__(self, skills_path: str = SKILLS_PATH):
+        with open(skills_path, "r", encoding="utf-8") as f:
+            dictionary = json.load(f)
+
+        self.skills = list(dictionary)
+        self.version = hashlib.sha1(
+            json.dumps([self.TOKENIZER_VERSION, dictionary], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:12]
+
+        # Узел дерева - dict токен -> узел; ключ None хранит индекс навыка
+        self._trie = {}
+        for index, (skill, synonyms) in enumerate(dictionary.items()):
+            for synonym in [skill] + synonyms:
+                node = self._trie
+                for token in tokenize(synonym):
+                    node = node.setdefault(token, {})
+                node[None] = index
+
+    def __len__(self):
+        return len(self.skills)
+
+    def indices(self, text: str) -> list:
+        """Индексы найденных навыков в порядке первого упоминания"""
+        tokens = tokenize(text or "")
+        found = {}
+        position = 0
+
+        while position < len(tokens):
+            node = self._trie
+            match, match_end = None, position
+            for end in range(position, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    match, match_end = node[None], end + 1
+
+            if match is None:
+                position += 1
+            else:
+                found.setdefault(match, None)
+                position = match_end
+
+        return list(found)
+
+    def extract(self, text: str) -> list:
+        """Названия навыков из словаря, найденные в тексте"""
+        return [self.skills[index] for index in self.indices(text)]
+
+    def vectorize(self, texts: list) -> sparse.csr_matrix:
+        """Бинарная CSR-матрица навыков: строка на текст, столбец на навык"""
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            indices = self.indices(text)
+            rows.extend([row] * len(indices))
+            cols.extend(indices)
+
+        data = np.ones(len(cols), dtype=np.float32)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(texts), len(self.skills)), dtype=np.float32)
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """Вектор навыков вакансии, делённый на их число
+
+        Произведение бинарной матрицы резюме на этот вектор - доля навыков
+        вакансии, которые есть в резюме.
+        """
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        indices = self.indices(text)
+        if indices:
+            vector[indices] = 1.0 / len(indices)
+        return vector
+
+    def overlap_many(self, vacancy_text: str, resume_texts: list) -> np.ndarray:
+        """Доля навыков вакансии, найденных в каждом резюме"""
+        if not resume_texts:
+            return np.zeros(0, dtype=np.float32)
+        return self.vectorize(resume_texts) @ self.query_vector(vacancy_text)
+
+    def overlap(self, vacancy_text: str, resume_text: str) -> float:
+        return float(self.overlap_many(vacancy_text, [resume_text])[0])
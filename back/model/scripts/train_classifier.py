@@ -1,8 +1,9 @@
 import pandas as pd
-from resume_classifier import ResumeClassifier
+from resume_classifier import ResumeClassifier, CLASSIFIER_DIRECTORY
 from sklearn.model_selection import train_test_split
 import tensorflow as tf
 import os
+import time
 
 def prepare_dataset(csv_path='D:\\Datathon\\datathon\\freedom_solution\\UpdatedResumeDataSet.csv'):
     # Загружаем датасет
@@ -39,10 +40,8 @@ def main():
     print(f"\nРазмер тренировочной выборки: {len(train_texts)}")
     print(f"Размер тестовой выборки: {len(test_texts)}")
     
-    # Создаем директорию для сохранения модели
-    model_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'trained_models')
-    if not os.path.exists(model_dir):
-        os.makedirs(model_dir)
+    # Создаем директорию для сохранения модели: оттуда же её загружает сервис
+    os.makedirs(CLASSIFIER_DIRECTORY, exist_ok=True)
     
     # Обучаем модель
     print("\nНачинаем обучение модели...")
@@ -54,22 +53,22 @@ def main():
     )
     
     # Сохраняем обученную модель
-    model_path = os.path.join(model_dir, 'resume_classifier')
+    model_path = CLASSIFIER_DIRECTORY
     print(f"\nСохраняем модель в: {model_path}")
     classifier.save_model(model_path)
     
     # Оцениваем модель на тестовой выборке
     print("\nОцениваем модель на тестовой выборке...")
-    correct = 0
     total = len(test_texts)
-    
-    for text, true_label in zip(test_texts, test_labels):
-        predicted = classifier.predict_category(text)
-        if predicted == true_label:
-            correct += 1
+
+    started = time.perf_counter()
+    predicted, _ = classifier.predict_categories(list(test_texts))
+    elapsed = time.perf_counter() - started
+    correct = sum(int(label == true_label) for label, true_label in zip(predicted, test_labels))
     
     accuracy = correct / total
     print(f"\nТочность на тестовой выборке: {accuracy:.2%}")
+    print(f"Скорость: {total / elapsed:.1f} резюме/с ({elapsed:.2f} с на {total} резюме)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
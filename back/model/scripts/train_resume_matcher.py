@@ -1,5 +1,12 @@
-from resume_bert_matcher import ResumeMatcher
+try:
+    from model.scripts.resume_bert_matcher import ResumeMatcher, ResumeVacancyDataset
+    from model.scripts.batching import LengthBucketSampler, PadCollator
+except ImportError:
+    # Скрипты из model/scripts запускаются без пакета model
+    from resume_bert_matcher import ResumeMatcher, ResumeVacancyDataset
+    from batching import LengthBucketSampler, PadCollator
 import torch
+from torch.utils.data import DataLoader
 from sklearn.metrics import classification_report
 import numpy as np
 from tqdm import tqdm
@@ -11,8 +18,13 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ResumeMatcherTrainer:
-    def __init__(self):
-        self.resume_dataset_path = r'D:\Datathon\datathon\freedom_solution\UpdatedResumeDataSet.csv'
+    def __init__(self, resume_dataset_path: str = None, seed: int = None):
+        # Путь можно переопределить аргументом или RESUME_DATASET_PATH
+        self.resume_dataset_path = resume_dataset_path or os.environ.get(
+            'RESUME_DATASET_PATH', r'D:\Datathon\datathon\freedom_solution\UpdatedResumeDataSet.csv'
+        )
+        # С фиксированным seed prepare_data каждый раз строит одно и то же разбиение
+        self.seed = seed
         
         if not os.path.exists(self.resume_dataset_path):
             raise FileNotFoundError(f"Resume dataset not found at {self.resume_dataset_path}")
@@ -25,6 +37,8 @@ class ResumeMatcherTrainer:
         self.TRAIN_BATCH_SIZE = 16
         self.VALID_BATCH_SIZE = 8
         self.LEARNING_RATE = 2e-5
+        # Верхняя граница длины пары; фактический паддинг - до самой длинной пары в батче
+        self.MAX_LEN = 256
         
         self.base_path = r'D:\Datathon\datathon\freedom_solution\model'
         
@@ -45,6 +59,7 @@ class ResumeMatcherTrainer:
         
         pairs = []
         categories = df['Category'].unique()
+        rng = np.random.RandomState(self.seed)
         
         logger.info("Creating training pairs...")
         for idx, row in tqdm(df.iterrows(), total=len(df)):
@@ -59,14 +74,14 @@ class ResumeMatcherTrainer:
             })
             
             # Отрицательный пример
-            other_category = np.random.choice([c for c in categories if c != row['Category']])
+            other_category = rng.choice([c for c in categories if c != row['Category']])
             pairs.append({
                 'resume_text': resume_text,
                 'vacancy_text': f"{other_category} position",
                 'label': 0
             })
             
-        np.random.shuffle(pairs)
+        rng.shuffle(pairs)
         
         split_idx = int(len(pairs) * 0.8)
         train_pairs = pairs[:split_idx]
@@ -87,6 +102,7 @@ class ResumeMatcherTrainer:
             self.matcher.model.parameters(),
             lr=self.LEARNING_RATE
         )
+        train_loader = self.make_loader(train_pairs, self.TRAIN_BATCH_SIZE, shuffle=True)
         
         for epoch in range(self.EPOCHS):
             logger.info(f"\nEpoch {epoch+1}/{self.EPOCHS}")
@@ -94,23 +110,9 @@ class ResumeMatcherTrainer:
             self.matcher.model.train()
             total_loss = 0
             
-            for i in tqdm(range(0, len(train_pairs), self.TRAIN_BATCH_SIZE), desc="Training"):
-                batch = train_pairs[i:i + self.TRAIN_BATCH_SIZE]
-                
-                # Обновленные параметры токенизации
-                inputs = self.matcher.tokenizer(
-                    [pair['resume_text'] for pair in batch],
-                    [pair['vacancy_text'] for pair in batch],
-                    padding='max_length',
-                    truncation=True,
-                    max_length=256,  # Уменьшаем максимальную длину
-                    return_tensors="pt",
-                    return_overflowing_tokens=False,  # Отключаем предупреждения
-                    stride=0  # Отключаем перекрытие
-                )
-                
-                labels = torch.tensor([pair['label'] for pair in batch]).to(self.device)
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            for batch in tqdm(train_loader, desc="Training"):
+                labels = batch.pop('labels').to(self.device)
+                inputs = {k: v.to(self.device) for k, v in batch.items()}
                 
                 optimizer.zero_grad()
                 outputs = self.matcher.model(**inputs, labels=labels)
@@ -121,7 +123,7 @@ class ResumeMatcherTrainer:
                 
                 total_loss += loss.item()
             
-            avg_loss = total_loss / (len(train_pairs) / self.TRAIN_BATCH_SIZE)
+            avg_loss = total_loss / len(train_loader)
             logger.info(f"Average training loss: {avg_loss:.4f}")
             
             if epoch % 2 == 0:
@@ -139,32 +141,34 @@ class ResumeMatcherTrainer:
         predictions = []
         true_labels = []
         
+        # Без перемешивания: батчи идут по возрастанию длины, метки берутся из тех же батчей
         with torch.no_grad():
-            for i in tqdm(range(0, len(test_pairs), self.VALID_BATCH_SIZE), desc="Evaluating"):
-                batch = test_pairs[i:i + self.VALID_BATCH_SIZE]
-                
-                # Те же параметры токенизации
-                inputs = self.matcher.tokenizer(
-                    [pair['resume_text'] for pair in batch],
-                    [pair['vacancy_text'] for pair in batch],
-                    padding='max_length',
-                    truncation=True,
-                    max_length=256,
-                    return_tensors="pt",
-                    return_overflowing_tokens=False,
-                    stride=0
-                )
-                
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            for batch in tqdm(self.make_loader(test_pairs, self.VALID_BATCH_SIZE, shuffle=False), desc="Evaluating"):
+                true_labels.extend(batch.pop('labels').tolist())
+                inputs = {k: v.to(self.device) for k, v in batch.items()}
                 outputs = self.matcher.model(**inputs)
                 preds = torch.argmax(outputs.logits, dim=1).cpu().numpy()
                 
                 predictions.extend(preds)
-                true_labels.extend([pair['label'] for pair in batch])
         
         logger.info("\nEvaluation metrics:")
         logger.info(classification_report(true_labels, predictions))
 
+    def make_loader(self, pairs, batch_size, shuffle):
+        """DataLoader с батчами из пар близкой длины и паддингом до самой длинной пары батча"""
+        dataset = ResumeVacancyDataset(
+            [pair['resume_text'] for pair in pairs],
+            [pair['vacancy_text'] for pair in pairs],
+            [pair['label'] for pair in pairs],
+            self.matcher.tokenizer,
+            self.MAX_LEN
+        )
+        return DataLoader(
+            dataset,
+            batch_sampler=LengthBucketSampler(dataset.lengths, batch_size, shuffle=shuffle, seed=self.seed),
+            collate_fn=PadCollator(self.matcher.tokenizer)
+        )
+
     def save_model(self):
         """Сохранение обученной модели"""
         try:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from database import Base
 
 class Resume(Base):
@@ -11,4 +11,20 @@ class Resume(Base):
     education = Column(String)
     file_name = Column(String)
     hh_url = Column(String)
-    hh_id = Column(String)
\ No newline at end of file
+    hh_id = Column(String)
+    content_hash = Column(String, index=True)
+    category = Column(String)
+
+    # Нормализованные поля для жёстких фильтров в SQL (services/normalization.py)
+    experience_months = Column(Integer)
+    education_level = Column(Integer)
+    salary_from = Column(Integer)
+    salary_to = Column(Integer)
+    work_format = Column(String)
+    area_id = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_resumes_area_format_experience", "area_id", "work_format", "experience_months"),
+        Index("ix_resumes_experience_education", "experience_months", "education_level"),
+        Index("ix_resumes_salary", "salary_from", "salary_to"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String
 from database import Base
 
 class Vacancy(Base):
@@ -16,5 +16,14 @@ class Vacancy(Base):
     age_to = Column(String)
     relocation = Column(Boolean)
     area = Column(String)
-    
 
+    # Нормализованные значения строковых полей (services/normalization.py)
+    experience_months = Column(Integer)
+    education_level = Column(Integer)
+    area_id = Column(Integer)
+    age_min = Column(Integer)
+    age_max = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_vacacies_area_experience", "area_id", "experience_months"),
+    )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException, Query, Depends
 from fastapi.responses import StreamingResponse
 from services import resume as ResumeService
+from services.hh_client import get_response_cache
 from dto.resume import DownloadResumeRequest
 from dto.resume_db import ResumeDbResponse, ResumeDbList, ResumeDbListResponse
 from sqlalchemy.orm import Session
@@ -25,7 +26,7 @@ async def get_resumes(
     education_level: str = None,
     currency: str = None
 ):
-    return ResumeService.get_resumes(
+    return await ResumeService.get_resumes(
         text,
         page,
         experience,
@@ -39,15 +40,19 @@ async def get_resumes(
         currency
     )
 
+@router.get('/cache/stats', tags=["resume"])
+async def get_cache_stats():
+    return get_response_cache().stats()
+
 @router.get('/{resume_id}', tags = ["resume"])
 async def get_resume_full(
     resume_id: str
 ):
-    return ResumeService.get_resume_by_id(resume_id)
+    return await ResumeService.get_resume_by_id(resume_id)
 
 @router.post('/download', tags=["resume"])
 async def download_resume(request: DownloadResumeRequest):
-    pdf_content = ResumeService.download_resume_pdf(request.resume_url)
+    pdf_content = await ResumeService.download_resume_pdf(request.resume_url)
 
     if pdf_content:
         return StreamingResponse(io.BytesIO(pdf_content), media_type="application/pdf", headers={
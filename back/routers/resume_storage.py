@@ -1,7 +1,14 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Query, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, File, UploadFile, HTTPException, Query, Depends, Body
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from services import resume_storage
 from services import resume as ResumeService
+from services import model_registry
+from services import resume_index
+from services import file_storage
+from services import ingestion
+from services import normalization
 from dto.resume import DownloadResumeRequest
 from dto.resume_db import ResumeDbResponse, ResumeDbList, ResumeDbListResponse
 from sqlalchemy.orm import Session
@@ -9,40 +16,63 @@ from database import get_db
 from models.resume_db import Resume
 from models.vacancy import Vacancy
 
+from typing import List
+
 import os
 import logging
-os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
-from model.scripts.resume_matching_system import ResumeMatchingSystem
-from model.scripts.resume_parser import ResumeParser
 
 
 router = APIRouter()
 
-UPLOAD_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "resumes")
-
 @router.post('/', tags = ["resume_storage"])
 async def add_resumes_to_storage(list: ResumeDbList, db: Session = Depends(get_db)):
-    if not os.path.exists(UPLOAD_DIRECTORY):
-        os.makedirs(UPLOAD_DIRECTORY)
-        
+    # Повтор hh_id в одном запросе обрабатывается один раз
+    items, seen = [], set()
     for resume in list.items:
-        pdf_content = ResumeService.download_resume_pdf(resume.hh_url)
-        if pdf_content:
-            filename = f"{resume.hh_id}.pdf"
-            file_path = os.path.join(UPLOAD_DIRECTORY, filename)
-            
-            with open(file_path, "wb") as f:
-                f.write(pdf_content)
-                
-            resume.file_name = filename
-        else:
-            print(f"Не удалось скачать PDF для резюме {resume.hh_id}")
-        
-    return ResumeService.add_resumes_to_storage(list, db)
+        if resume.hh_id:
+            if resume.hh_id in seen:
+                continue
+            seen.add(resume.hh_id)
+        items.append(resume)
+
+    hh_ids = [resume.hh_id for resume in items if resume.hh_id]
+    present = {
+        resume.hh_id: resume
+        for resume in db.query(Resume).filter(Resume.hh_id.in_(hh_ids)).all()
+    } if hh_ids else {}
+
+    results = await ResumeService.download_resumes_to_storage(items, present)
+
+    new_items, updated = [], []
+    for resume, result in zip(items, results):
+        stored = present.get(resume.hh_id)
+        if stored is not None:
+            # Резюме уже в БД: второй строки нет, скачанный заново PDF записывается в неё
+            if result["status"] == "ok":
+                stored.file_name = result["file_name"]
+                stored.content_hash = result["content_hash"]
+                updated.append(stored)
+            continue
+        if result["status"] == "ok":
+            resume.file_name = result["file_name"]
+            resume.content_hash = result["content_hash"]
+        new_items.append(resume)
+
+    # Все новые резюме пишутся в БД одной транзакцией, включая те, чей PDF не скачался
+    created = ResumeService.add_resumes_to_storage(ResumeDbList(items=new_items), db)
+    if updated:
+        db.commit()
+    # Эмбеддинги, навыки и TF-IDF считаются в пуле потоков, а не в event loop
+    await run_in_threadpool(resume_index.index_resumes, created + updated)
+    return {"items": results}
 
 logger = logging.getLogger('uvicorn.error')
 logger.setLevel(logging.DEBUG)
 
+@router.get('/models/stats', tags=["resume_storage"])
+async def get_models_stats():
+    return model_registry.registry.stats()
+
 @router.get('/', response_model=ResumeDbListResponse, tags=["resume_storage"])
 async def get_resumes_list(db: Session = Depends(get_db)):
     resumes = ResumeService.get_resumes_from_local_storage(db)
@@ -52,27 +82,31 @@ async def get_resumes_list(db: Session = Depends(get_db)):
 
 @router.put('/{upload}', tags = ["resume_storage"])
 async def upload_resume(file: UploadFile):
-    if not os.path.exists(UPLOAD_DIRECTORY):
-        os.makedirs(UPLOAD_DIRECTORY)
+    content = await file.read()
+    content_hash, file_name = file_storage.store_bytes(content)
 
-    file_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
+    return {"filename": file_name, "content_hash": content_hash}
 
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)      
+@router.get('/download', tags=["resume_storage"])
+async def download_resume(filename: str = None, resume_id: int = None, db: Session = Depends(get_db)):
+    if resume_id is not None:
+        resume = db.query(Resume).filter(Resume.id == resume_id).first()
+        filename = resume.file_name if resume else None
 
-    return {"filename": file.filename}
+    if not filename:
+        raise HTTPException(status_code=404, detail="Файл не найден")
 
-@router.get('/download', tags=["resume_storage"])
-async def download_resume(filename: str):
-    file_path = os.path.join(UPLOAD_DIRECTORY, filename)
+    try:
+        file_path = file_storage.absolute_path(filename)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Файл не найден")
     
-    if not os.path.exists(file_path):
+    if not os.path.isfile(file_path):
         raise HTTPException(status_code=404, detail="Файл не найден")
     
     file_stream = open(file_path, "rb")
     response = StreamingResponse(file_stream, media_type="application/octet-stream")
-    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    response.headers["Content-Disposition"] = f"attachment; filename={os.path.basename(filename)}"
     
     return response
 
@@ -85,8 +119,10 @@ async def analyze_resume(resume_id: int, vacancy_id: str, db: Session = Depends(
         if not resume or not vacancy:
             raise HTTPException(status_code=404, detail="Resume or vacancy not found")
             
-        matching_system = ResumeMatchingSystem()
-        scores = matching_system.get_ml_scores(
+        # BERT-эмбеддинги пары считаются в пуле потоков, а не в event loop
+        matching_system = await run_in_threadpool(model_registry.get_matching_system)
+        scores = await run_in_threadpool(
+            matching_system.get_ml_scores,
             vacancy_text=vacancy.title,
             resume_text=resume.title
         )
@@ -99,6 +135,37 @@ async def analyze_resume(resume_id: int, vacancy_id: str, db: Session = Depends(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze/rerank")
+async def rerank_resumes(
+    vacancy_id: str,
+    resume_ids: List[int] = Body(None, description="Кандидаты; без них - первые candidate_limit гибридного поиска"),
+    top_k: int = Query(20, ge=1, le=1000),
+    candidate_limit: int = Query(100, ge=1, le=1000),
+    filters: str = Query(None, description="Жёсткие фильтры для гибридного поиска кандидатов"),
+    db: Session = Depends(get_db)
+):
+    try:
+        filter_names = normalization.parse_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    vacancy = db.query(Vacancy).filter(Vacancy.id == vacancy_id).first()
+    if not vacancy:
+        raise HTTPException(status_code=404, detail="Вакансия не найдена")
+
+    try:
+        conditions = normalization.resume_conditions(vacancy, filter_names)
+        # До 1000 пар через кросс-энкодер - в пуле потоков, а не в event loop
+        return await run_in_threadpool(
+            resume_storage.rerank_resumes,
+            vacancy, db, resume_ids=resume_ids, top_k=top_k, candidate_limit=candidate_limit, conditions=conditions
+        )
+    except model_registry.ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Ошибка при пересортировке резюме: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete('/{id}', tags=["resume_storage"])
 async def delete_resume(id: int, db: Session = Depends(get_db)):
     try:
@@ -107,15 +174,15 @@ async def delete_resume(id: int, db: Session = Depends(get_db)):
         if not resume:
             raise HTTPException(status_code=404, detail="Резюме не найдено")
             
-        # Удаляем файл PDF, если он существует
-        if resume.file_name:
-            file_path = os.path.join(UPLOAD_DIRECTORY, resume.file_name)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        
+        file_name = resume.file_name
+
         # Удаляем запись из БД
         db.delete(resume)
         db.commit()
+        await run_in_threadpool(resume_index.unindex_resumes, [id])
+
+        # Удаляем файл PDF, если на него не ссылаются другие резюме и задачи загрузки
+        ingestion.get_ingestion_queue().delete_if_unreferenced(db, file_name)
         
         return {"message": "Резюме успешно удалено"}
         
@@ -124,14 +191,56 @@ async def delete_resume(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get('/matching/{vacancy_id}')
-async def get_matching_resumes(vacancy_id: str, db: Session = Depends(get_db)):
+async def get_matching_resumes(
+    vacancy_id: str,
+    mode: str = Query("title", pattern="^(title|vector|hybrid|skills|tfidf|criteria)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    k: int = Query(20, ge=1, le=1000),
+    ef: int = Query(None, ge=1, le=4096),
+    lexical_limit: int = Query(200, ge=1, le=5000),
+    semantic_limit: int = Query(50, ge=0, le=5000),
+    filters: str = Query(None, description="Жёсткие фильтры через запятую: area, experience, education, salary, work_format"),
+    db: Session = Depends(get_db)
+):
+    try:
+        filter_names = normalization.parse_filters(filters)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     try:
         vacancy = db.query(Vacancy).filter(Vacancy.id == vacancy_id).first()
         if not vacancy:
             raise HTTPException(status_code=404, detail="Вакансия не найдена")
         
-        logger.debug(f"Поиск резюме для вакансии: {vacancy.title}")
-        results = resume_storage.search_resumes("", vacancy.title, db)
+        logger.debug(f"Поиск резюме для вакансии: {vacancy.title} (режим {mode}, фильтры {filter_names})")
+        # Фильтры выполняются в SQL по индексированным колонкам до оценки моделями
+        conditions = normalization.resume_conditions(vacancy, filter_names)
+        # Режимы с моделями (кодирование BERT, индексация недостающих резюме, загрузка
+        # индексов из реестра) выполняются в пуле потоков, а не в event loop
+        if mode == "vector":
+            results = await run_in_threadpool(
+                resume_storage.search_resumes_vector, vacancy.title, db, k=k, ef=ef, conditions=conditions
+            )
+        elif mode == "criteria":
+            results = await run_in_threadpool(
+                resume_storage.search_resumes_criteria, vacancy, db, k=k, conditions=conditions
+            )
+        elif mode == "tfidf":
+            results = await run_in_threadpool(
+                resume_storage.search_resumes_titles, vacancy.title, db, k=k, conditions=conditions
+            )
+        elif mode == "skills":
+            results = await run_in_threadpool(
+                resume_storage.search_resumes_skills, vacancy.title, db, k=k, conditions=conditions
+            )
+        elif mode == "hybrid":
+            results = await run_in_threadpool(
+                resume_storage.search_resumes_hybrid,
+                vacancy.title, db, k=k, lexical_limit=lexical_limit, semantic_limit=semantic_limit, ef=ef,
+                conditions=conditions
+            )
+        else:
+            results = resume_storage.search_resumes("", vacancy.title, db, limit=limit, conditions=conditions)
         logger.debug(f"Найдено {len(results['items'])} подходящих резюме")
         
         return results
@@ -140,43 +249,39 @@ async def get_matching_resumes(vacancy_id: str, db: Session = Depends(get_db)):
         logger.error(f"Ошибка при поиске подходящих резюме: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post('/upload', tags=["resume_storage"])
+@router.post('/upload', tags=["resume_storage"], status_code=202)
 async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    content = await file.read()
+
+    # Дубликат определяется по хэшу до парсинга и работы моделей
+    content_hash = file_storage.sha256_bytes(content)
+    existing = file_storage.find_by_hash(db, content_hash)
+    if existing:
+        logger.debug(f"Резюме {file.filename} уже загружено (id {existing.id})")
+        return JSONResponse(status_code=200, content=jsonable_encoder(ResumeDbResponse.from_orm(existing)))
+
+    # Парсинг, классификация и эмбеддинг выполняются в очереди загрузки;
+    # файл с тем же хэшем, уже стоящий в очереди, получает ту же задачу
     try:
-        # Сохраняем файл временно для анализа
-        temp_file_path = os.path.join(UPLOAD_DIRECTORY, file.filename)
-        content = await file.read()
-        
-        with open(temp_file_path, "wb") as f:
-            f.write(content)
-        
-        # Анализируем резюме
-        matching_system = ResumeMatchingSystem()
-        parser = ResumeParser()
-        
-        resume_data = parser.parse_pdf_to_json(temp_file_path)
-        resume_text = f"{resume_data.get('experience', '')} {resume_data.get('education', '')}"
-        
-        # Сохраняем в базу данных
-        resume = Resume(
-            title=resume_data.get("title", "Не указано"),
-            area=resume_data.get("area", "Не указано"),
-            experience=resume_data.get("experience", "Без опыта"),
-            education=resume_data.get("education", "Не указано"),
-            file_name=file.filename,
-            hh_url="",
-            hh_id=""
-        )
-        
-        db.add(resume)
-        db.commit()
-        db.refresh(resume)
-        
-        return ResumeDbResponse.from_orm(resume)
-        
-    except Exception as e:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-        db.rollback()
-        logger.error(f"Ошибка при загрузке резюме: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        job = ingestion.get_ingestion_queue().submit(content, content_hash, file.filename)
+    except ingestion.QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return job.to_dict()
+
+@router.get('/jobs/{job_id}', tags=["resume_storage"])
+async def get_upload_job(job_id: str, db: Session = Depends(get_db)):
+    job = ingestion.get_ingestion_queue().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+
+    result = job.to_dict()
+    if job.resume_id is not None:
+        resume = db.query(Resume).filter(Resume.id == job.resume_id).first()
+        if resume:
+            result["resume"] = ResumeDbResponse.from_orm(resume)
+    return result
+
+@router.get('/jobs', tags=["resume_storage"])
+async def get_upload_queue_stats():
+    return ingestion.get_ingestion_queue().stats()
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from services import vacancy as VacancyService
 from dto import vacancy as VacancyDTO
 from sqlalchemy.orm import Session
@@ -11,7 +12,8 @@ async def create_vacancy(
     data: VacancyDTO.Vacancy = None,
     db: Session = Depends(get_db)
 ):
-    return VacancyService.create_vacancy(data, db)
+    # Название дообучает TF-IDF индекс названий - в пуле потоков, а не в event loop
+    return await run_in_threadpool(VacancyService.create_vacancy, data, db)
 
 @router.get('/{id}', response_model = VacancyDTO.VacancyResponse, tags=["vacancy"])
 async def get_vacancy(
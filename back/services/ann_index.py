@@ -0,0 +1,166 @@
+import os
+import json
+import threading
+import logging
+import numpy as np
+import hnswlib
+from services.store_lock import acquire_writer_lock
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class ResumeAnnIndex:
+    """HNSW-индекс по эмбеддингам резюме для приближённого top-k поиска, метка - Resume.id"""
+
+    SPACE = 'ip'
+    M = 16
+    EF_CONSTRUCTION = 200
+    DEFAULT_EF = 64
+    INITIAL_CAPACITY = 1024
+    # Индекс сохраняется на диск после стольких изменений (и при остановке сервиса)
+    SAVE_EVERY = 100
+
+    def __init__(self, directory: str, name: str = "resumes"):
+        self.index_path = os.path.join(directory, f"{name}.hnsw")
+        self.meta_path = os.path.join(directory, f"{name}.hnsw.json")
+
+        self._lock = threading.RLock()
+        self._index = None
+        self._dim = None
+        self._ids = set()
+        self._unsaved = 0
+
+        # Индекс в памяти периодически перезаписывает файл: писатель в каталоге один
+        acquire_writer_lock(directory)
+        self._load()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, resume_ids: list, vectors: np.ndarray):
+        """Добавление или обновление векторов резюме"""
+        if len(resume_ids) == 0:
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        labels = np.asarray(resume_ids, dtype=np.int64)
+
+        with self._lock:
+            if self._index is None:
+                self._create(vectors.shape[1])
+
+            required = self._index.get_current_count() + len(labels)
+            if required > self._index.get_max_elements():
+                self._index.resize_index(max(required, self._index.get_max_elements() * 2))
+
+            # Обновляемые id сначала удаляются: replace_deleted переиспользует слоты удалённых
+            # резюме, и без этого старый вектор остался бы в графе
+            for label in labels:
+                if int(label) in self._ids:
+                    self._index.mark_deleted(int(label))
+                    self._ids.discard(int(label))
+
+            self._index.add_items(vectors, labels, replace_deleted=True)
+            self._ids.update(int(label) for label in labels)
+            self._touch(len(labels))
+
+    def delete(self, resume_ids: list):
+        """Удаление резюме из выдачи"""
+        with self._lock:
+            for resume_id in resume_ids:
+                if int(resume_id) in self._ids:
+                    self._index.mark_deleted(int(resume_id))
+                    self._ids.discard(int(resume_id))
+            self._touch(len(resume_ids))
+
+    def query(self, vector: np.ndarray, k: int = 20, ef: int = None, allowed: set = None) -> list:
+        """Top-k ближайших резюме; ef управляет балансом полноты и задержки
+
+        allowed - id резюме, прошедших SQL-фильтры: остальные отсекаются
+        при обходе графа, а не после него, поэтому k результатов не теряются.
+        """
+        with self._lock:
+            if self._index is None or not self._ids or k <= 0:
+                return []
+
+            candidates = self._ids if allowed is None else self._ids & set(allowed)
+            k = min(k, len(candidates))
+            if k == 0:
+                return []
+            # ef не может быть меньше k, иначе hnswlib вернёт неполный результат
+            self._index.set_ef(max(ef or self.DEFAULT_EF, k))
+            labels, distances = self._index.knn_query(
+                np.asarray(vector, dtype=np.float32).reshape(1, -1), k=k,
+                filter=None if allowed is None else candidates.__contains__
+            )
+
+        # Для пространства ip расстояние равно 1 - скалярное произведение
+        return [(int(label), float(1.0 - distance)) for label, distance in zip(labels[0], distances[0])]
+
+    def sync(self, store):
+        """Приведение индекса в соответствие с хранилищем эмбеддингов"""
+        with self._lock:
+            stored = set(store.ids())
+            stale = self._ids - stored
+            missing = list(stored - self._ids)
+
+            if stale:
+                self.delete(list(stale))
+            for start in range(0, len(missing), 4096):
+                batch = missing[start:start + 4096]
+                self.add(batch, store.get(batch))
+
+            if stale or missing:
+                logger.info(f"ANN-индекс синхронизирован: +{len(missing)} / -{len(stale)}")
+                self.save()
+
+    def save(self):
+        """Атомарное сохранение индекса и списка живых меток"""
+        with self._lock:
+            if self._index is None:
+                return
+
+            tmp_index = self.index_path + ".tmp"
+            self._index.save_index(tmp_index)
+            os.replace(tmp_index, self.index_path)
+
+            tmp_meta = self.meta_path + ".tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump({"dim": self._dim, "space": self.SPACE, "ids": sorted(self._ids)}, f)
+            os.replace(tmp_meta, self.meta_path)
+
+            self._unsaved = 0
+
+    def _create(self, dim: int):
+        self._dim = dim
+        self._index = hnswlib.Index(space=self.SPACE, dim=dim)
+        self._index.init_index(
+            max_elements=self.INITIAL_CAPACITY,
+            ef_construction=self.EF_CONSTRUCTION,
+            M=self.M,
+            allow_replace_deleted=True
+        )
+
+    def _touch(self, changes: int):
+        self._unsaved += changes
+        if self._unsaved >= self.SAVE_EVERY:
+            self.save()
+
+    def _load(self):
+        if not (os.path.exists(self.index_path) and os.path.exists(self.meta_path)):
+            return
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+            self._dim = meta["dim"]
+            self._index = hnswlib.Index(space=meta.get("space", self.SPACE), dim=self._dim)
+            self._index.load_index(self.index_path, allow_replace_deleted=True)
+            self._ids = set(meta["ids"])
+        except Exception as e:
+            # Индекс восстанавливается из хранилища эмбеддингов в sync
+            logger.error(f"Не удалось загрузить ANN-индекс, он будет перестроен: {str(e)}")
+            self._index = None
+            self._dim = None
+            self._ids = set()
@@ -0,0 +1,94 @@
+import threading
+import logging
+import numpy as np
+from sqlalchemy.orm import Session
+from models.resume_db import Resume
+from model.scripts.criteria_scoring import CriteriaTable, CriteriaScorer
+
+logger = logging.getLogger('uvicorn.error')
+
+# Колонки Resume, из которых собирается строка CriteriaTable
+CRITERIA_COLUMNS = (Resume.id, Resume.experience_months, Resume.education_level, Resume.area_id,
+                    Resume.area, Resume.work_format, Resume.salary_from, Resume.salary_to)
+
+
+def resume_criteria_record(resume) -> dict:
+    """Нормализованные поля резюме для CriteriaTable"""
+    return {
+        "id": resume.id,
+        "experience_months": resume.experience_months,
+        "education_level": resume.education_level,
+        "area_id": resume.area_id,
+        "area": resume.area,
+        "work_format": resume.work_format,
+        "salary_from": resume.salary_from,
+        "salary_to": resume.salary_to
+    }
+
+
+def vacancy_criteria_record(vacancy) -> dict:
+    return {
+        "experience_months": vacancy.experience_months,
+        "education_level": vacancy.education_level,
+        "work_format": vacancy.work_format,
+        "area_id": vacancy.area_id,
+        "area": vacancy.area,
+        "salary_from": vacancy.salary_from,
+        "salary_to": vacancy.salary_to
+    }
+
+
+class CriteriaIndex:
+    """Таблица критериев всех резюме в памяти воркера
+
+    Собирается из БД один раз и обновляется при загрузке и удалении резюме.
+    Изменения строят новую таблицу и подменяют ссылку, поэтому запросы
+    оценивают свою таблицу без блокировки.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = CriteriaTable([])
+
+    def __len__(self):
+        return self._table.size
+
+    def sync(self, db: Session):
+        """Полная пересборка таблицы по БД"""
+        with self._lock:
+            self._table = CriteriaTable([resume_criteria_record(row) for row in db.query(*CRITERIA_COLUMNS).all()])
+        logger.info(f"Таблица критериев собрана: {len(self)} резюме")
+
+    def add_resumes(self, resumes: list):
+        """Добавление (или замена) строк резюме"""
+        if not resumes:
+            return
+        with self._lock:
+            self._table = self._table.drop([resume.id for resume in resumes]).extend(
+                [resume_criteria_record(resume) for resume in resumes])
+
+    def delete(self, resume_ids: list):
+        with self._lock:
+            self._table = self._table.drop(resume_ids)
+
+    def top(self, vacancy, k: int = 20, weights: dict = None, allowed: set = None) -> list:
+        """Top-k (id, total, оценки по критериям) среди резюме из allowed; None - среди всех"""
+        table = self._table
+        scores = CriteriaScorer(weights).score(table, vacancy_criteria_record(vacancy))
+        total = scores["total"]
+
+        candidates = np.arange(table.size)
+        if allowed is not None:
+            candidates = np.flatnonzero(np.isin(table.ids, np.fromiter(allowed, dtype=np.int64, count=len(allowed))))
+
+        k = min(k, len(candidates))
+        if not k:
+            return []
+        top = candidates[np.argpartition(-total[candidates], k - 1)[:k]]
+        top = top[np.argsort(-total[top], kind="stable")]
+
+        return [
+            (int(table.ids[i]), float(total[i]),
+             {name: float(values[i]) for name, values in scores.items() if name != "total"})
+            for i in top
+        ]
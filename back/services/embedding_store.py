@@ -0,0 +1,216 @@
+import os
+import json
+import threading
+import logging
+import numpy as np
+from services.store_lock import acquire_writer_lock
+
+logger = logging.getLogger('uvicorn.error')
+
+EMBEDDINGS_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "embeddings")
+
+
+class EmbeddingStore:
+    """Эмбеддинги резюме в float16-матрице на диске, ключ - Resume.id
+
+    vectors.f16 - строки матрицы подряд, ids.npy - id резюме для каждой строки
+    (-1 у удалённых строк), manifest.json - модель, версия и размерность.
+    """
+
+    DTYPE = np.float16
+    # Доля удалённых строк, после которой файл перезаписывается без них
+    COMPACT_RATIO = 0.3
+
+    def __init__(self, directory: str, model_name: str, model_version: int):
+        self.directory = directory
+        self.model_name = model_name
+        self.model_version = model_version
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.ids_path = os.path.join(directory, "ids.npy")
+        self.manifest_path = os.path.join(directory, "manifest.json")
+
+        self._lock = threading.RLock()
+        self._dim = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._positions = {}
+        self._vectors = None
+
+        # Строки дописываются по смещениям из памяти: писатель в каталоге один
+        acquire_writer_lock(directory)
+        self._load()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, resume_id):
+        return int(resume_id) in self._positions
+
+    @property
+    def dim(self):
+        return self._dim
+
+    def ids(self) -> list:
+        """Id всех резюме, у которых есть эмбеддинг"""
+        with self._lock:
+            return list(self._positions)
+
+    def add(self, resume_ids: list, vectors: np.ndarray):
+        """Добавление (или замена) эмбеддингов резюме"""
+        if len(resume_ids) == 0:
+            return
+
+        vectors = np.asarray(vectors, dtype=self.DTYPE)
+        if vectors.ndim != 2 or vectors.shape[0] != len(resume_ids):
+            raise ValueError("Количество векторов не совпадает с количеством id")
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Ожидалась размерность {self._dim}, получено {vectors.shape[1]}")
+
+            # Старые версии заменяемых векторов помечаются удалёнными
+            self._tombstone(resume_ids)
+
+            start = len(self._ids)
+            self._vectors = None
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+
+            self._ids = np.concatenate([self._ids, np.asarray(resume_ids, dtype=np.int64)])
+            for offset, resume_id in enumerate(resume_ids):
+                self._positions[int(resume_id)] = start + offset
+
+            self._flush()
+
+    def delete(self, resume_ids: list):
+        """Удаление эмбеддингов резюме"""
+        with self._lock:
+            if not self._tombstone(resume_ids):
+                return
+
+            deleted = len(self._ids) - len(self._positions)
+            if deleted > len(self._ids) * self.COMPACT_RATIO:
+                self._compact()
+            else:
+                self._flush()
+
+    def get(self, resume_ids: list) -> np.ndarray:
+        """Эмбеддинги резюме в порядке resume_ids; отсутствующие id пропускаются"""
+        with self._lock:
+            positions = [self._positions[int(i)] for i in resume_ids if int(i) in self._positions]
+            if not positions:
+                return np.zeros((0, self._dim or 0), dtype=np.float32)
+            return np.asarray(self._matrix()[positions], dtype=np.float32)
+
+    def matrix(self):
+        """Живые строки матрицы и их id"""
+        with self._lock:
+            if not self._positions:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, self._dim or 0), dtype=self.DTYPE)
+            mask = self._ids >= 0
+            return self._ids[mask], self._matrix()[mask]
+
+    def search(self, query: np.ndarray, top_k: int = 20) -> list:
+        """Точный поиск ближайших резюме: произведение матрицы на вектор запроса"""
+        ids, vectors = self.matrix()
+        if len(ids) == 0:
+            return []
+
+        scores = vectors @ np.asarray(query, dtype=self.DTYPE)
+        scores = scores.astype(np.float32)
+        top_k = min(top_k, len(ids))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def _matrix(self):
+        if self._vectors is None and len(self._ids):
+            self._vectors = np.memmap(self.vectors_path, dtype=self.DTYPE, mode="r",
+                                      shape=(len(self._ids), self._dim))
+        return self._vectors
+
+    def _tombstone(self, resume_ids) -> bool:
+        changed = False
+        for resume_id in resume_ids:
+            position = self._positions.pop(int(resume_id), None)
+            if position is not None:
+                self._ids[position] = -1
+                changed = True
+        return changed
+
+    def _compact(self):
+        """Перезапись файла векторов без удалённых строк"""
+        mask = self._ids >= 0
+        live = np.array(self._matrix()[mask]) if len(self._ids) else np.zeros((0, self._dim or 0), dtype=self.DTYPE)
+        self._vectors = None
+
+        tmp_path = self.vectors_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(np.ascontiguousarray(live).tobytes())
+        os.replace(tmp_path, self.vectors_path)
+
+        self._ids = self._ids[mask]
+        self._positions = {int(resume_id): position for position, resume_id in enumerate(self._ids)}
+        self._flush()
+        logger.info(f"Хранилище эмбеддингов сжато до {len(self._ids)} строк")
+
+    def _flush(self):
+        """Атомарная запись ids и манифеста"""
+        tmp_ids = self.ids_path + ".tmp.npy"
+        np.save(tmp_ids, self._ids)
+        os.replace(tmp_ids, self.ids_path)
+
+        manifest = {
+            "model_name": self.model_name,
+            "model_version": self.model_version,
+            "dim": self._dim,
+            "dtype": np.dtype(self.DTYPE).name,
+            "rows": int(len(self._ids)),
+            "count": len(self._positions)
+        }
+        tmp_manifest = self.manifest_path + ".tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_manifest, self.manifest_path)
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            self._reset()
+            return
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("model_name") != self.model_name or manifest.get("model_version") != self.model_version:
+            logger.warning(
+                f"Эмбеддинги посчитаны моделью {manifest.get('model_name')} v{manifest.get('model_version')}, "
+                f"текущая {self.model_name} v{self.model_version}: хранилище пересоздаётся"
+            )
+            self._reset()
+            return
+
+        self._dim = manifest.get("dim")
+        self._ids = np.load(self.ids_path) if os.path.exists(self.ids_path) else np.zeros(0, dtype=np.int64)
+
+        # Файл векторов мог не дописаться при аварийной остановке: доверяем только целым строкам
+        row_bytes = (self._dim or 0) * np.dtype(self.DTYPE).itemsize
+        rows_on_disk = os.path.getsize(self.vectors_path) // row_bytes if row_bytes and os.path.exists(self.vectors_path) else 0
+        if rows_on_disk < len(self._ids):
+            logger.warning("Файл эмбеддингов короче списка id, лишние id отброшены")
+            self._ids = self._ids[:rows_on_disk]
+        elif rows_on_disk > len(self._ids):
+            logger.warning("В файле эмбеддингов есть строки без id, они отброшены")
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(len(self._ids) * row_bytes)
+
+        self._positions = {int(resume_id): position for position, resume_id in enumerate(self._ids) if resume_id >= 0}
+
+    def _reset(self):
+        self._dim = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._positions = {}
+        self._vectors = None
+        open(self.vectors_path, "wb").close()
+        self._flush()
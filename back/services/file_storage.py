@@ -0,0 +1,104 @@
+import os
+import uuid
+import hashlib
+import logging
+from sqlalchemy.orm import Session
+from models.resume_db import Resume
+
+logger = logging.getLogger('uvicorn.error')
+
+STORAGE_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "resumes"))
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def relative_path(content_hash: str) -> str:
+    """Путь файла в хранилище: ab/cd/abcd....pdf"""
+    return os.path.join(content_hash[:2], content_hash[2:4], f"{content_hash}.pdf")
+
+
+def absolute_path(file_name: str) -> str:
+    """Абсолютный путь файла хранилища; старые файлы лежат в корне по имени"""
+    path = os.path.abspath(os.path.join(STORAGE_DIRECTORY, file_name))
+    if os.path.commonpath([path, STORAGE_DIRECTORY]) != STORAGE_DIRECTORY:
+        raise ValueError(f"Путь {file_name} вне хранилища резюме")
+    return path
+
+
+def store_bytes(content: bytes, content_hash: str = None):
+    """Сохранение содержимого по его sha256: (content_hash, file_name)"""
+    content_hash = content_hash or sha256_bytes(content)
+    file_name = relative_path(content_hash)
+    path = absolute_path(file_name)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    return content_hash, file_name
+
+
+def store_file(tmp_path: str):
+    """Перенос скачанного файла в хранилище по его sha256: (content_hash, file_name)"""
+    content_hash = sha256_file(tmp_path)
+    file_name = relative_path(content_hash)
+    path = absolute_path(file_name)
+
+    if os.path.exists(path):
+        # Такой файл уже есть, копия не нужна
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    return content_hash, file_name
+
+
+def find_by_hash(db: Session, content_hash: str):
+    return db.query(Resume).filter(Resume.content_hash == content_hash).first()
+
+
+def delete_if_unreferenced(db: Session, file_name: str):
+    """Удаление файла, если на него больше не ссылается ни одно резюме"""
+    if not file_name:
+        return
+
+    if db.query(Resume.id).filter(Resume.file_name == file_name).first():
+        return
+
+    path = absolute_path(file_name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def backfill_hashes(db: Session) -> int:
+    """Хэши для резюме, сохранённых до появления content_hash"""
+    updated = 0
+    for resume in db.query(Resume).filter(Resume.content_hash.is_(None), Resume.file_name.isnot(None)).all():
+        try:
+            path = absolute_path(resume.file_name)
+        except ValueError:
+            continue
+        if os.path.isfile(path):
+            resume.content_hash = sha256_file(path)
+            updated += 1
+
+    if updated:
+        db.commit()
+        logger.info(f"Посчитаны хэши для {updated} резюме")
+    return updated
@@ -0,0 +1,119 @@
+import re
+import json
+import logging
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger('uvicorn.error')
+
+FTS_TABLE = "resumes_fts"
+
+# Веса колонок для bm25 в порядке объявления: title, experience, education
+BM25_WEIGHTS = (3.0, 1.0, 0.5)
+
+# Окончания, которые отбрасываются перед префиксным поиском, чтобы
+# "разработчика" находило "разработчик", а "developers" - "developer"
+RU_ENDINGS = sorted([
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ией",
+    "ия", "ие", "ий", "ый", "ой", "ая", "яя", "ое", "ее", "ых", "их", "ом", "ем",
+    "ам", "ям", "ах", "ях", "ов", "ев", "ей", "ую", "юю", "а", "я", "ы", "и",
+    "е", "у", "ю", "о"
+], key=len, reverse=True)
+EN_ENDINGS = ["ings", "ing", "ers", "er", "ies", "es", "ed", "s"]
+MIN_STEM_LENGTH = 4
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+CYRILLIC_RE = re.compile(r"[а-яё]")
+
+
+def init_fulltext(engine):
+    """Создание FTS5-таблицы по резюме и триггеров синхронизации с таблицей resumes"""
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+
+        conn.execute(text(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                title, experience, education,
+                content='resumes', content_rowid='id',
+                tokenize="unicode61 remove_diacritics 2",
+                prefix='2 3 4'
+            )
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN
+                INSERT INTO {FTS_TABLE}(rowid, title, experience, education)
+                VALUES (new.id, new.title, new.experience, new.education);
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, experience, education)
+                VALUES ('delete', old.id, old.title, old.experience, old.education);
+            END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE ON resumes BEGIN
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, experience, education)
+                VALUES ('delete', old.id, old.title, old.experience, old.education);
+                INSERT INTO {FTS_TABLE}(rowid, title, experience, education)
+                VALUES (new.id, new.title, new.experience, new.education);
+            END
+        """))
+
+        # Резюме, добавленные до появления индекса, индексируются один раз
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            logger.info("Полнотекстовый индекс резюме построен")
+
+
+def stem(token: str) -> str:
+    """Грубое отсечение окончаний русских и английских слов"""
+    endings = RU_ENDINGS if CYRILLIC_RE.search(token) else EN_ENDINGS
+    for ending in endings:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+def build_match_query(query: str) -> str:
+    """FTS5-запрос: каждое слово как префикс основы, слова объединяются через OR"""
+    terms = []
+    for token in TOKEN_RE.findall(query.lower()):
+        term = f'"{stem(token)}"*'
+        if term not in terms:
+            terms.append(term)
+    return " OR ".join(terms)
+
+
+def search(db: Session, query: str, limit: int = 100, resume_ids=None) -> list:
+    """BM25-ранжированный поиск по title, experience и education: [(id, score)]
+
+    resume_ids ограничивает поиск резюме, прошедшими SQL-фильтры.
+    """
+    match = build_match_query(query)
+    if not match or (resume_ids is not None and not resume_ids):
+        return []
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    params = {"match": match, "limit": limit}
+    restriction = ""
+    if resume_ids is not None:
+        restriction = "AND rowid IN (SELECT value FROM json_each(:resume_ids))"
+        params["resume_ids"] = json.dumps(sorted(int(resume_id) for resume_id in resume_ids))
+
+    rows = db.execute(
+        text(f"""
+            SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH :match {restriction}
+            ORDER BY rank
+            LIMIT :limit
+        """),
+        params
+    ).fetchall()
+
+    # bm25 в SQLite отрицательный: чем меньше, тем релевантнее
+    return [(int(row[0]), float(-row[1])) for row in rows]
@@ -0,0 +1,211 @@
+import os
+import uuid
+import asyncio
+import random
+import logging
+import httpx
+from services.response_cache import ResponseCache
+
+logger = logging.getLogger('uvicorn.error')
+
+HH_API_URL = os.environ.get("HH_API_URL", "https://api.hh.ru")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Retry-After больше этого значения не ждём целиком, чтобы не держать запрос клиента
+MAX_RETRY_DELAY = 30.0
+
+
+class HHConfigurationError(Exception):
+    """Клиент hh.ru не настроен: нет токена доступа"""
+    pass
+
+
+def auth_headers() -> dict:
+    """Заголовок авторизации из HH_ACCESS_TOKEN; без токена запросы к hh.ru не выполняются"""
+    access_token = os.environ.get("HH_ACCESS_TOKEN")
+    if not access_token:
+        raise HHConfigurationError("Переменная окружения HH_ACCESS_TOKEN не задана: укажите токен приложения hh.ru")
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def _http2_available() -> bool:
+    # HTTP/2 в httpx требует пакет h2
+    try:
+        import h2
+        return True
+    except ImportError:
+        return False
+
+
+class HHClient:
+    """Асинхронный клиент hh.ru с общим пулом соединений, ретраями и ограничением параллелизма"""
+
+    def __init__(
+        self,
+        base_url: str = HH_API_URL,
+        headers: dict = None,
+        timeout: float = float(os.environ.get("HH_TIMEOUT", "10")),
+        connect_timeout: float = float(os.environ.get("HH_CONNECT_TIMEOUT", "5")),
+        max_connections: int = int(os.environ.get("HH_MAX_CONNECTIONS", "20")),
+        max_keepalive: int = int(os.environ.get("HH_MAX_KEEPALIVE", "10")),
+        max_retries: int = int(os.environ.get("HH_MAX_RETRIES", "3")),
+        backoff: float = float(os.environ.get("HH_BACKOFF", "0.5")),
+        concurrency: int = int(os.environ.get("HH_CONCURRENCY", "10")),
+        http2: bool = None,
+        cache: ResponseCache = None,
+        transport: httpx.AsyncBaseTransport = None
+    ):
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive
+            ),
+            http2=_http2_available() if http2 is None else http2,
+            follow_redirects=True,
+            transport=transport
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Запрос с ретраями на 429/5xx и сетевых ошибках, с экспоненциальной задержкой"""
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self._client.request(method, url, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._delay(attempt)
+                logger.warning(f"hh.ru: {method} {url} - {e!r}, повтор через {delay:.2f} с")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"hh.ru: {method} {url} - {response.status_code}, повтор через {delay:.2f} с")
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def get_json(self, url: str, params: dict = None, cache_key: str = None):
+        """GET с JSON-ответом через кэш: (status_code, data, text)
+
+        Свежая запись отдаётся без запроса, устаревшая перепроверяется
+        через If-None-Match / If-Modified-Since.
+        """
+        entry = self.cache.get(cache_key) if self.cache is not None and cache_key else None
+        if entry is not None and entry.fresh:
+            return 200, entry.data, None
+
+        conditional = {}
+        if entry is not None and entry.etag:
+            conditional["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            conditional["If-Modified-Since"] = entry.last_modified
+
+        response = await self.get(url, params=params, headers=conditional)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(cache_key, entry)
+            return 200, entry.data, None
+
+        if response.status_code != 200:
+            return response.status_code, None, response.text
+
+        data = response.json()
+        if self.cache is not None and cache_key:
+            self.cache.put(
+                cache_key,
+                data,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        return 200, data, None
+
+    async def download_to_file(self, url: str, path: str, chunk_size: int = 64 * 1024) -> int:
+        """Потоковая загрузка файла во временный файл рядом с path и атомарное переименование"""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        attempt = 0
+        try:
+            while True:
+                try:
+                    async with self._semaphore:
+                        async with self._client.stream("GET", url) as response:
+                            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                                delay = self._delay(attempt, response.headers.get("Retry-After"))
+                            else:
+                                response.raise_for_status()
+                                size = 0
+                                # Чанки небольшие, запись на диск не задерживает event loop заметно
+                                with open(tmp_path, "wb") as f:
+                                    async for chunk in response.aiter_bytes(chunk_size):
+                                        f.write(chunk)
+                                        size += len(chunk)
+                                os.replace(tmp_path, path)
+                                return size
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._delay(attempt)
+                    logger.warning(f"hh.ru: загрузка {url} - {e!r}, повтор через {delay:.2f} с")
+
+                attempt += 1
+                await asyncio.sleep(delay)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def _delay(self, attempt: int, retry_after: str = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+        # Экспоненциальная задержка с джиттером, чтобы воркеры не повторяли запросы синхронно
+        return self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+
+
+_client = None
+_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Кэш ответов hh.ru; HH_CACHE_DIR включает дисковый уровень, HH_CACHE_DISK_SIZE и
+    HH_CACHE_DISK_MAX_AGE (секунды) ограничивают его"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(
+            max_entries=int(os.environ.get("HH_CACHE_SIZE", "512")),
+            ttl=float(os.environ.get("HH_CACHE_TTL", "300")),
+            disk_directory=os.environ.get("HH_CACHE_DIR") or None,
+            max_disk_entries=int(os.environ.get("HH_CACHE_DISK_SIZE", "10000")),
+            max_disk_age=float(os.environ.get("HH_CACHE_DISK_MAX_AGE", str(7 * 24 * 3600)))
+        )
+    return _cache
+
+
+def get_hh_client() -> HHClient:
+    """Общий для процесса клиент hh.ru; HHConfigurationError, если HH_ACCESS_TOKEN не задан"""
+    global _client
+    if _client is None:
+        _client = HHClient(headers=auth_headers(), cache=get_response_cache())
+    return _client
+
+
+async def close_hh_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,242 @@
+import os
+import time
+import uuid
+import queue
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from database import SessionLocal
+from models.resume_db import Resume
+from services import model_registry, resume_index, file_storage, normalization
+from model.scripts.parse_cache import get_parse_cache
+
+logger = logging.getLogger('uvicorn.error')
+
+class QueueFullError(Exception):
+    pass
+
+
+class IngestionJob:
+    def __init__(self, file_name: str, content_hash: str, original_name: str):
+        self.id = uuid.uuid4().hex
+        self.file_name = file_name
+        self.content_hash = content_hash
+        self.original_name = original_name
+        self.status = "queued"
+        self.stages = {}
+        self.resume_id = None
+        self.category = None
+        self.extraction = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "file_name": self.original_name,
+            "content_hash": self.content_hash,
+            "stages": self.stages,
+            "resume_id": self.resume_id,
+            "category": self.category,
+            "extraction": self.extraction,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class IngestionQueue:
+    """Очередь загрузки резюме: парсинг, классификация и эмбеддинг в пуле воркеров"""
+
+    # Сколько завершённых задач хранится для эндпоинта статуса
+    MAX_FINISHED_JOBS = 1000
+
+    def __init__(self, workers: int = 2, max_queue: int = 32):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()
+        # content_hash -> задача, ещё не завершённая: одинаковые файлы не обрабатываются дважды
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"ingestion-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, content: bytes, content_hash: str, original_name: str) -> IngestionJob:
+        """Сохранение файла и постановка в очередь; QueueFullError, если очередь заполнена
+
+        Для файла, который уже ждёт в очереди или обрабатывается, возвращается
+        существующая задача. Файл пишется под той же блокировкой, под которой
+        его удаляет упавшая задача, поэтому удаление не успевает между записью
+        и постановкой в очередь.
+        """
+        with self._lock:
+            pending = self._pending.get(content_hash)
+            if pending is not None:
+                return pending
+
+            content_hash, file_name = file_storage.store_bytes(content, content_hash)
+            job = IngestionJob(file_name, content_hash, original_name)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                with SessionLocal() as db:
+                    file_storage.delete_if_unreferenced(db, file_name)
+                raise QueueFullError("Очередь загрузки резюме заполнена")
+
+            self._pending[content_hash] = job
+            self._jobs[job.id] = job
+            self._trim()
+
+        return job
+
+    def delete_if_unreferenced(self, db, file_name: str):
+        """Удаление файла, если на него не ссылаются ни резюме, ни незавершённые задачи"""
+        with self._lock:
+            if any(job.file_name == file_name for job in self._pending.values()):
+                return
+            file_storage.delete_if_unreferenced(db, file_name)
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "jobs": statuses
+        }
+
+    def shutdown(self):
+        # Воркеры - daemon-потоки: если очередь заполнена, они завершатся вместе с процессом
+        for _ in self._workers:
+            try:
+                self._queue.put(None, timeout=1)
+            except queue.Full:
+                break
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            failed = False
+            try:
+                self._process(job)
+            except Exception as e:
+                failed = True
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"Ошибка при обработке резюме {job.original_name}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.pop(job.content_hash, None)
+                    # Файл больше никому не нужен, если резюме так и не попало в БД
+                    if failed:
+                        try:
+                            with SessionLocal() as db:
+                                file_storage.delete_if_unreferenced(db, job.file_name)
+                        except Exception as e:
+                            logger.error(f"Не удалось удалить файл {job.file_name}: {str(e)}")
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _process(self, job: IngestionJob):
+        with SessionLocal() as db:
+            # Такой же файл мог быть загружен, пока задача ждала в очереди
+            existing = file_storage.find_by_hash(db, job.content_hash)
+            if existing:
+                job.resume_id = existing.id
+                job.status = "duplicate"
+                return
+
+            with self._stage(job, "parsing"):
+                parsed = get_parse_cache().get_or_parse(
+                    model_registry.get_resume_parser(),
+                    file_storage.absolute_path(job.file_name),
+                    job.content_hash
+                )
+                text, resume_data, job.extraction = parsed["text"], parsed["fields"], parsed["stats"]
+                structured = model_registry.get_resume_parser().parse_structured(text)
+
+            # Классификация не обязательна: без неё резюме всё равно сохраняется
+            try:
+                with self._stage(job, "classifying"):
+                    job.category = model_registry.get_resume_classifier().predict_category(text)
+            except Exception as e:
+                logger.warning(f"Не удалось классифицировать резюме {job.original_name}: {str(e)}")
+
+            with self._stage(job, "embedding"):
+                resume = Resume(
+                    title=resume_data.get("position", "Не указано"),
+                    area=resume_data.get("area", "Не указано"),
+                    experience=resume_data.get("experience", "Без опыта"),
+                    education=resume_data.get("education", "Не указано"),
+                    file_name=job.file_name,
+                    hh_url="",
+                    hh_id="",
+                    content_hash=job.content_hash,
+                    category=job.category
+                )
+                normalization.normalize_resume(resume, structured)
+                db.add(resume)
+                db.commit()
+                db.refresh(resume)
+                job.resume_id = resume.id
+
+                resume_index.index_resumes([resume])
+
+            job.status = "done"
+
+    @contextmanager
+    def _stage(self, job: IngestionJob, name: str):
+        job.status = name
+        job.stages[name] = {"status": "running"}
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            job.stages[name] = {"status": "failed", "seconds": round(time.perf_counter() - started, 3)}
+            raise
+        job.stages[name] = {"status": "done", "seconds": round(time.perf_counter() - started, 3)}
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(len(finished) - self.MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Общая для процесса очередь; INGEST_WORKERS и INGEST_QUEUE_SIZE задают её размер"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = IngestionQueue(
+                workers=int(os.environ.get("INGEST_WORKERS", "2")),
+                max_queue=int(os.environ.get("INGEST_QUEUE_SIZE", "32"))
+            )
+    return _queue
+
+
+def shutdown_ingestion_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.shutdown()
+            _queue = None
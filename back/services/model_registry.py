@@ -0,0 +1,302 @@
+import os
+os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
+
+import sys
+import time
+import threading
+import logging
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class ModelUnavailableError(Exception):
+    """Артефакты модели не найдены: сервис не может отвечать осмысленно"""
+    pass
+
+
+class ModelRegistry:
+    """Процессный реестр моделей: каждая модель загружается один раз на воркер"""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._optional = set()
+
+    def register(self, name: str, factory, optional: bool = False):
+        """Регистрация фабрики модели под именем name
+
+        optional - модель требует обученных артефактов, без которых сервис
+        работает, только соответствующие эндпоинты отвечают 503.
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._load_locks.setdefault(name, threading.Lock())
+            if optional:
+                self._optional.add(name)
+
+    def get(self, name: str):
+        """Возвращает общий экземпляр модели, загружая его при первом обращении"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._factories:
+            raise KeyError(f"Модель {name} не зарегистрирована")
+
+        # Блокировка на каждую модель: параллельные запросы ждут одну загрузку
+        with self._load_locks[name]:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+
+            logger.info(f"Загрузка модели {name}...")
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            instance = self._factories[name]()
+            load_seconds = time.perf_counter() - started
+
+            self._stats[name] = {
+                "load_seconds": round(load_seconds, 3),
+                "loaded_at": time.time(),
+                "parameters_bytes": _parameters_bytes(instance),
+                "rss_delta_bytes": max(_rss_bytes() - rss_before, 0),
+            }
+            self._instances[name] = instance
+            logger.info(f"Модель {name} загружена за {load_seconds:.2f} с")
+
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def preload(self, names=None):
+        """Загрузка моделей при старте воркера; недоступная необязательная модель только логируется"""
+        for name in names or list(self._factories):
+            try:
+                self.get(name)
+            except ModelUnavailableError as e:
+                if name not in self._optional:
+                    raise
+                logger.warning(f"Модель {name} не загружена: {str(e)}")
+
+    def stats(self) -> dict:
+        """Время загрузки и потребление памяти по каждой модели"""
+        return {
+            "pid": os.getpid(),
+            "rss_bytes": _rss_bytes(),
+            "models": {
+                name: {
+                    "loaded": name in self._instances,
+                    "optional": name in self._optional,
+                    **self._stats.get(name, {})
+                }
+                for name in self._factories
+            }
+        }
+
+
+def _parameters_bytes(instance) -> int:
+    """Суммарный размер весов torch-моделей, на которые ссылается экземпляр"""
+    try:
+        import torch
+    except ImportError:
+        return 0
+
+    modules = [instance] + list(vars(instance).values()) if hasattr(instance, '__dict__') else [instance]
+    seen = set()
+    total = 0
+    for module in modules:
+        if not isinstance(module, torch.nn.Module):
+            continue
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def _rss_bytes() -> int:
+    """Текущий resident set size процесса"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    # Без /proc остаётся только пиковое значение; на macOS оно в байтах, иначе в килобайтах
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _create_matching_system():
+    from model.scripts.resume_matching_system import ResumeMatchingSystem
+    # MATCHING_BACKEND=onnx - энкодер из графа onnx_export через ONNX Runtime,
+    # MATCHING_VARIANT=int8 - квантованные веса из quantize_models
+    return ResumeMatchingSystem(backend=_matching_backend(), variant=_matching_variant())
+
+
+def _matching_backend() -> str:
+    backend = os.environ.get("MATCHING_BACKEND", "torch").lower()
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Неизвестный MATCHING_BACKEND {backend}, допустимы: torch, onnx")
+    return backend
+
+
+def _matching_variant() -> str:
+    variant = os.environ.get("MATCHING_VARIANT", "fp32").lower()
+    if variant not in ("fp32", "int8"):
+        raise ValueError(f"Неизвестный MATCHING_VARIANT {variant}, допустимы: fp32, int8")
+    return variant
+
+
+def _create_resume_matcher():
+    from model.scripts.resume_bert_matcher import ResumeMatcher
+    backend, variant = _matching_backend(), _matching_variant()
+    # onnx и int8 выгружены уже из обученных весов, torch fp32 догружает state_dict;
+    # без обученной головы вероятности случайны, поэтому модель считается недоступной
+    weights = None
+    if backend == "torch" and variant == "fp32":
+        weights = os.environ.get("RESUME_MATCHER_WEIGHTS", os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "model", "trained_models", "best_resume_matcher.pt"
+        ))
+        if not os.path.exists(weights):
+            raise ModelUnavailableError(f"Веса кросс-энкодера {weights} не найдены, сначала train_resume_matcher")
+
+    try:
+        matcher = ResumeMatcher(backend=backend, variant=variant)
+    except FileNotFoundError as e:
+        raise ModelUnavailableError(f"Артефакты кросс-энкодера ({backend}, {variant}) не найдены: {str(e)}")
+    if weights:
+        matcher.load_model(weights)
+    return matcher
+
+
+def _create_resume_parser():
+    from model.scripts.resume_parser import ResumeParser
+    return ResumeParser()
+
+
+def _create_resume_classifier():
+    from model.scripts.resume_classifier import ResumeClassifier
+    # Сразу обученные веса из RESUME_CLASSIFIER_DIR, без загрузки базового DistilBERT
+    try:
+        classifier = ResumeClassifier.load()
+    except FileNotFoundError as e:
+        raise ModelUnavailableError(str(e))
+    # Трассировка serving-функции до первого запроса, а не в нём
+    logger.info(f"Прогрев классификатора: {classifier.warm_up():.2f} с")
+    return classifier
+
+
+def _create_embedding_store():
+    from model.scripts.resume_matching_system import ResumeMatchingSystem
+    from services.embedding_store import EmbeddingStore, EMBEDDINGS_DIRECTORY
+    # Эмбеддинги int8-энкодера не смешиваются с fp32: при смене варианта хранилище пересоздаётся
+    variant = _matching_variant()
+    return EmbeddingStore(
+        EMBEDDINGS_DIRECTORY,
+        model_name=ResumeMatchingSystem.MODEL_NAME if variant == "fp32" else f"{ResumeMatchingSystem.MODEL_NAME}-{variant}",
+        model_version=ResumeMatchingSystem.EMBEDDING_VERSION
+    )
+
+
+def _create_ann_index():
+    from services.ann_index import ResumeAnnIndex
+    from services.embedding_store import EMBEDDINGS_DIRECTORY
+    index = ResumeAnnIndex(EMBEDDINGS_DIRECTORY)
+    index.sync(get_embedding_store())
+    return index
+
+
+def _create_skill_extractor():
+    from model.scripts.skills import SkillExtractor
+    return SkillExtractor()
+
+
+def _create_skills_store():
+    from services.sparse_store import SparseStore
+    from services.embedding_store import EMBEDDINGS_DIRECTORY
+    extractor = get_skill_extractor()
+    return SparseStore(EMBEDDINGS_DIRECTORY, "skills", extractor.version, n_features=len(extractor))
+
+
+def _create_title_index():
+    from database import SessionLocal
+    from services.title_index import TitleIndex
+    from services.embedding_store import EMBEDDINGS_DIRECTORY
+    index = TitleIndex(EMBEDDINGS_DIRECTORY)
+    with SessionLocal() as db:
+        index.sync(db)
+    return index
+
+
+def _create_criteria_index():
+    from database import SessionLocal
+    from services.criteria_index import CriteriaIndex
+    index = CriteriaIndex()
+    with SessionLocal() as db:
+        index.sync(db)
+    return index
+
+
+registry = ModelRegistry()
+registry.register("matching_system", _create_matching_system)
+registry.register("resume_matcher", _create_resume_matcher, optional=True)
+registry.register("resume_parser", _create_resume_parser)
+registry.register("resume_classifier", _create_resume_classifier, optional=True)
+registry.register("embedding_store", _create_embedding_store)
+registry.register("ann_index", _create_ann_index)
+registry.register("skill_extractor", _create_skill_extractor)
+registry.register("skills_store", _create_skills_store)
+registry.register("title_index", _create_title_index)
+registry.register("criteria_index", _create_criteria_index)
+
+
+def get_matching_system():
+    return registry.get("matching_system")
+
+
+def get_resume_matcher():
+    return registry.get("resume_matcher")
+
+
+def get_resume_parser():
+    return registry.get("resume_parser")
+
+
+def get_resume_classifier():
+    return registry.get("resume_classifier")
+
+
+def get_embedding_store():
+    return registry.get("embedding_store")
+
+
+def get_ann_index():
+    return registry.get("ann_index")
+
+
+def get_skill_extractor():
+    return registry.get("skill_extractor")
+
+
+def get_skills_store():
+    return registry.get("skills_store")
+
+
+def get_title_index():
+    return registry.get("title_index")
+
+
+def get_criteria_index():
+    return registry.get("criteria_index")
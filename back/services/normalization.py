@@ -0,0 +1,115 @@
+import logging
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from models.resume_db import Resume
+from models.vacancy import Vacancy
+from model.scripts import field_normalization
+
+logger = logging.getLogger('uvicorn.error')
+
+# Жёсткие фильтры, которые эндпоинты подбора выполняют в SQL до оценки моделями
+FILTERS = ("area", "experience", "education", "salary", "work_format")
+
+# Форматы работы резюме, подходящие формату вакансии; для hybrid подходит любой
+COMPATIBLE_WORK_FORMATS = {
+    "office": ["office", "hybrid"],
+    "remote": ["remote", "hybrid"],
+}
+
+RESUME_FIELDS = ("experience_months", "education_level", "salary_from", "salary_to", "work_format", "area_id")
+
+
+def normalize_resume(resume: Resume, structured: dict = None) -> Resume:
+    """Заполнение нормализованных колонок резюме
+
+    structured - результат ResumeParser.parse_structured; чего в нём нет,
+    берётся из строковых полей резюме ("5 лет 3 мес.", "Бакалавр", "Астана").
+    Уже заполненные значения не перезаписываются.
+    """
+    values = {
+        "experience_months": field_normalization.experience_months(resume.experience),
+        "education_level": field_normalization.education_level(resume.education),
+        "area_id": field_normalization.area_id(resume.area),
+    }
+    for field, value in (structured or {}).items():
+        if value is not None:
+            values[field] = value
+
+    for field in RESUME_FIELDS:
+        if getattr(resume, field) is None and values.get(field) is not None:
+            setattr(resume, field, values[field])
+    return resume
+
+
+def normalize_vacancy(vacancy: Vacancy) -> Vacancy:
+    vacancy.experience_months = field_normalization.experience_months(vacancy.experience)
+    vacancy.education_level = field_normalization.education_level(vacancy.education)
+    vacancy.area_id = field_normalization.area_id(vacancy.area)
+    vacancy.age_min = field_normalization.age(vacancy.age_from)
+    vacancy.age_max = field_normalization.age(vacancy.age_to)
+    return vacancy
+
+
+def backfill_normalized(db: Session) -> int:
+    """Нормализованные колонки для записей, сохранённых до их появления"""
+    updated = 0
+    resumes = db.query(Resume).filter(
+        Resume.experience_months.is_(None), Resume.education_level.is_(None), Resume.area_id.is_(None)
+    ).all()
+    for resume in resumes:
+        normalize_resume(resume)
+        if resume.experience_months is not None or resume.education_level is not None or resume.area_id is not None:
+            updated += 1
+
+    vacancies = db.query(Vacancy).filter(
+        Vacancy.experience_months.is_(None), Vacancy.education_level.is_(None), Vacancy.area_id.is_(None)
+    ).all()
+    for vacancy in vacancies:
+        normalize_vacancy(vacancy)
+        if vacancy.experience_months is not None or vacancy.education_level is not None or vacancy.area_id is not None:
+            updated += 1
+
+    if updated:
+        db.commit()
+        logger.info(f"Нормализованы поля {updated} резюме и вакансий")
+    return updated
+
+
+def parse_filters(value: str) -> list:
+    """Список фильтров из параметра запроса "area,experience"; неизвестные имена - ValueError"""
+    filters = [name.strip() for name in (value or "").split(",") if name.strip()]
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Неизвестные фильтры: {', '.join(sorted(unknown))}")
+    return filters
+
+
+def resume_conditions(vacancy: Vacancy, filters: list) -> list:
+    """Условия SQLAlchemy на Resume по нормализованным полям вакансии
+
+    Резюме с неизвестным значением (NULL) фильтр проходят: отсутствие поля
+    в PDF не повод отбрасывать кандидата. Фильтр, для которого у вакансии
+    нет значения, пропускается.
+    """
+    conditions = []
+    if "area" in filters and vacancy.area_id is not None:
+        conditions.append(or_(Resume.area_id.is_(None), Resume.area_id == vacancy.area_id))
+    if "experience" in filters and vacancy.experience_months:
+        conditions.append(or_(Resume.experience_months.is_(None), Resume.experience_months >= vacancy.experience_months))
+    if "education" in filters and vacancy.education_level:
+        conditions.append(or_(Resume.education_level.is_(None), Resume.education_level >= vacancy.education_level))
+    if "salary" in filters and vacancy.salary_to:
+        # Ожидания кандидата не выше верхней границы вилки
+        conditions.append(or_(Resume.salary_from.is_(None), Resume.salary_from <= vacancy.salary_to))
+    if "work_format" in filters and vacancy.work_format in COMPATIBLE_WORK_FORMATS:
+        conditions.append(or_(
+            Resume.work_format.is_(None), Resume.work_format.in_(COMPATIBLE_WORK_FORMATS[vacancy.work_format])
+        ))
+    return conditions
+
+
+def allowed_resume_ids(db: Session, conditions: list):
+    """Id резюме, прошедших фильтры; None, если фильтров нет и подходят все"""
+    if not conditions:
+        return None
+    return {resume_id for (resume_id,) in db.query(Resume.id).filter(*conditions).all()}
@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class CacheEntry:
+    def __init__(self, data, etag: str = None, last_modified: str = None, expires_at: float = 0.0):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def to_dict(self) -> dict:
+        return {
+            "data": self.data,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "expires_at": self.expires_at
+        }
+
+
+class ResponseCache:
+    """LRU-кэш ответов с TTL и необязательным дисковым уровнем, который переживает перезапуск
+
+    Устаревшие записи не удаляются сразу: по их ETag/Last-Modified можно сделать
+    условный запрос и продлить запись при ответе 304. Дисковый уровень
+    ограничен отдельно: sweep_disk удаляет файлы, не обновлявшиеся дольше
+    max_disk_age, и самые давние сверх max_disk_entries.
+    """
+
+    # Дисковый уровень подчищается после стольких записей на диск
+    SWEEP_EVERY = 100
+
+    def __init__(self, max_entries: int = 512, ttl: float = 300.0, disk_directory: str = None,
+                 max_disk_entries: int = 10000, max_disk_age: float = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_directory = disk_directory
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_age = max_disk_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "disk_hits": 0, "evictions": 0,
+                          "disk_evictions": 0}
+
+        if disk_directory:
+            if not os.path.exists(disk_directory):
+                os.makedirs(disk_directory)
+            self.sweep_disk()
+
+    @staticmethod
+    def make_key(namespace: str, params=None) -> str:
+        """Ключ по пространству имён и нормализованным параметрам (без None, порядок не важен)"""
+        if isinstance(params, dict):
+            params = {str(k): str(v) for k, v in params.items() if v is not None}
+        payload = json.dumps([namespace, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Запись по ключу, в том числе устаревшая; None, если записи нет"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self._count("disk_hits")
+                self._store(key, entry)
+
+        if entry is None:
+            self._count("misses")
+        elif entry.fresh:
+            self._count("hits")
+        else:
+            self._count("stale")
+        return entry
+
+    def put(self, key: str, data, etag: str = None, last_modified: str = None) -> CacheEntry:
+        entry = CacheEntry(data, etag, last_modified, time.time() + self.ttl)
+        self._store(key, entry)
+        self._save_to_disk(key, entry)
+        return entry
+
+    def refresh(self, key: str, entry: CacheEntry):
+        """Продление записи после ответа 304 Not Modified"""
+        entry.expires_at = time.time() + self.ttl
+        self._count("revalidated")
+        self._store(key, entry)
+        self._save_to_disk(key, entry)
+
+    def sweep_disk(self) -> int:
+        """Удаление дисковых записей старше max_disk_age и самых давних сверх max_disk_entries"""
+        if not self.disk_directory:
+            return 0
+
+        now = time.time()
+        files, expired = [], []
+        for name in os.listdir(self.disk_directory):
+            if not name.endswith((".json", ".tmp")):
+                continue
+            path = os.path.join(self.disk_directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > self.max_disk_age:
+                expired.append(path)
+            elif name.endswith(".json"):
+                files.append((mtime, path))
+
+        # Время изменения - время записи или последнего чтения с диска: самые свежие первыми
+        files.sort(reverse=True)
+        expired += [path for _, path in files[self.max_disk_entries:]]
+
+        removed = 0
+        for path in expired:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+
+        if removed:
+            with self._lock:
+                self._counters["disk_evictions"] += removed
+            logger.info(f"Из дискового кэша удалено {removed} записей")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "disk": bool(self.disk_directory)
+            }
+
+    def _store(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_directory, f"{key}.json")
+
+    def _load_from_disk(self, key: str):
+        if not self.disk_directory:
+            return None
+
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = CacheEntry(**json.load(f))
+            # Прочитанная запись не должна уйти при подчистке первой
+            os.utime(path)
+            return entry
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Повреждённая запись кэша {path}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, entry: CacheEntry):
+        if not self.disk_directory:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Не удалось записать кэш на диск: {e}")
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            sweep = self._disk_writes % self.SWEEP_EVERY == 0
+        if sweep:
+            self.sweep_disk()
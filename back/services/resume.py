@@ -1,17 +1,16 @@
-import requests
+import os
+import uuid
+import asyncio
 from dto import resume, resume_db
 from models import resume_db as ResumeModel
+from services.hh_client import get_hh_client
+from services.response_cache import ResponseCache
+from services import file_storage, normalization
 
 
-access_token = "USERP5E3SRULNMM1IE8UPSMA9U6A7698JE2FL7EVP47BK5VEL0DA351VJ745JR0J"
+search_url = "/resumes"
 
-headers = {
-    "Authorization": f"Bearer {access_token}"
-}
-
-search_url = "https://api.hh.ru/resumes"
-
-def get_resumes(
+async def get_resumes(
         text: str,
         page: int,
         experience: str = None,
@@ -52,11 +51,11 @@ def get_resumes(
     if currency is not None:
         params["currency"] = currency    
 
-    response = requests.get(search_url, headers=headers, params=params)
+    status_code, data, error = await get_hh_client().get_json(
+        search_url, params=params, cache_key=ResponseCache.make_key("search", params)
+    )
 
-    if response.status_code == 200:
-        data = response.json()
-        
+    if status_code == 200:
         resume_response = resume.ResumeResponse(
             found=data.get("found", 0),
             items=data.get("items", []),
@@ -66,22 +65,24 @@ def get_resumes(
         )
         return resume_response
     else:
-        print("Ошибка при получении списка резюме:", response.text)
+        print("Ошибка при получении списка резюме:", error)
         return None
     
 
-def get_resume_by_id(id: str):
-    response = requests.get(f"{search_url}/{id}", headers=headers)
+async def get_resume_by_id(id: str):
+    status_code, data, error = await get_hh_client().get_json(
+        f"{search_url}/{id}", cache_key=ResponseCache.make_key("resume", id)
+    )
     
-    if response.status_code == 200:
-        return response.json()
+    if status_code == 200:
+        return data
     else:
-        err = {"error": f"Резюме с ID {id} не найдено", "status_code": response.status_code}
+        err = {"error": f"Резюме с ID {id} не найдено", "status_code": status_code}
         print(err)
         return err
     
-def download_resume_pdf(download_url: str) -> bytes:
-    response = requests.get(download_url, headers=headers)
+async def download_resume_pdf(download_url: str) -> bytes:
+    response = await get_hh_client().get(download_url)
     
     if response.status_code == 200:
         return response.content
@@ -89,7 +90,38 @@ def download_resume_pdf(download_url: str) -> bytes:
         print(f"Error downloading resume PDF: {response.status_code} - {response.text}")
         return None
     
+async def download_resumes_to_storage(items: list, present: dict = None, concurrency: int = 8) -> list:
+    """Параллельная загрузка PDF резюме с hh.ru в хранилище, результат по каждому резюме
+
+    present - уже сохранённые резюме по hh_id, их PDF повторно не скачивается.
+    """
+    present = present or {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def download(item):
+        stored = present.get(item.hh_id)
+        if stored is not None and stored.file_name and os.path.isfile(file_storage.absolute_path(stored.file_name)):
+            return {"hh_id": item.hh_id, "status": "skipped", "file_name": stored.file_name,
+                    "content_hash": stored.content_hash}
+
+        tmp_path = os.path.join(file_storage.STORAGE_DIRECTORY, f"{item.hh_id}.{uuid.uuid4().hex}.download")
+        async with semaphore:
+            try:
+                size = await get_hh_client().download_to_file(item.hh_url, tmp_path)
+                content_hash, file_name = file_storage.store_file(tmp_path)
+                return {"hh_id": item.hh_id, "status": "ok", "file_name": file_name,
+                        "content_hash": content_hash, "size": size}
+            except Exception as e:
+                print(f"Не удалось скачать PDF для резюме {item.hh_id}: {e}")
+                return {"hh_id": item.hh_id, "status": "failed", "error": str(e)}
+
+    if not os.path.exists(file_storage.STORAGE_DIRECTORY):
+        os.makedirs(file_storage.STORAGE_DIRECTORY)
+
+    return await asyncio.gather(*(download(item) for item in items))
+
 def add_resumes_to_storage(list: resume_db.ResumeDbList, db):
+    created = []
     for resume_data in list.items:
         resume = ResumeModel.Resume(
             title=resume_data.title,
@@ -98,14 +130,24 @@ def add_resumes_to_storage(list: resume_db.ResumeDbList, db):
             education=resume_data.education,
             file_name=resume_data.file_name,
             hh_url=resume_data.hh_url,
-            hh_id=resume_data.hh_id
+            hh_id=resume_data.hh_id,
+            content_hash=resume_data.content_hash,
+            experience_months=resume_data.experience_months,
+            education_level=resume_data.education_level,
+            salary_from=resume_data.salary_from,
+            salary_to=resume_data.salary_to,
+            work_format=resume_data.work_format,
+            area_id=resume_data.area_id
         )
+        # Что клиент не передал, нормализуется из строк hh.ru ("5 лет 3 мес.", "Бакалавр")
+        normalization.normalize_resume(resume)
         
         db.add(resume)
+        created.append(resume)
     
     db.commit()
 
-    return
+    return created
 
 def get_resumes_from_local_storage(db):
     return db.query(ResumeModel.Resume).all()  
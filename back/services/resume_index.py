@@ -0,0 +1,116 @@
+import os
+import logging
+from sqlalchemy.orm import Session
+from models.resume_db import Resume
+from services import model_registry, file_storage
+from model.scripts.parse_cache import get_parse_cache
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def resume_embedding_text(resume) -> str:
+    """Текст резюме, по которому считается эмбеддинг"""
+    parts = [resume.title, resume.experience, resume.education]
+    return " ".join(part for part in parts if part)
+
+
+def resume_full_text(resume) -> str:
+    """Полный текст резюме из кэша парсинга; без PDF - текст полей"""
+    if resume.file_name:
+        try:
+            path = file_storage.absolute_path(resume.file_name)
+            if os.path.isfile(path):
+                parsed = get_parse_cache().get_or_parse(model_registry.get_resume_parser(), path, resume.content_hash)
+                return parsed["text"]
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать текст резюме {resume.id}: {str(e)}")
+    return resume_embedding_text(resume)
+
+
+def index_resumes(resumes: list):
+    """Расчёт и сохранение эмбеддингов и векторов навыков для новых резюме"""
+    resumes = [resume for resume in resumes if resume.id is not None]
+    if not resumes:
+        return
+
+    index_criteria(resumes)
+    index_skills(resumes)
+    index_titles(resumes)
+
+    try:
+        matching_system = model_registry.get_matching_system()
+        store = model_registry.get_embedding_store()
+
+        resume_ids = [resume.id for resume in resumes]
+        vectors = matching_system.encode_texts([resume_embedding_text(resume) for resume in resumes])
+        store.add(resume_ids, vectors)
+        model_registry.get_ann_index().add(resume_ids, vectors)
+    except Exception as e:
+        # Резюме уже сохранено в БД; эмбеддинг досчитается в backfill_embeddings
+        logger.error(f"Ошибка при индексации резюме: {str(e)}")
+
+
+def index_criteria(resumes: list):
+    """Строки таблицы критериев; нормализованные колонки уже заполнены при сохранении"""
+    try:
+        model_registry.get_criteria_index().add_resumes(resumes)
+    except Exception as e:
+        logger.error(f"Ошибка при добавлении резюме в таблицу критериев: {str(e)}")
+
+
+def index_skills(resumes: list):
+    """Векторы навыков по полному тексту резюме; не зависят от BERT"""
+    try:
+        vectors = model_registry.get_skill_extractor().vectorize([resume_full_text(resume) for resume in resumes])
+        model_registry.get_skills_store().add([resume.id for resume in resumes], vectors)
+    except Exception as e:
+        logger.error(f"Ошибка при расчёте навыков резюме: {str(e)}")
+
+
+def index_titles(resumes: list):
+    """TF-IDF векторы названий; словарь дообучается на новых названиях"""
+    try:
+        model_registry.get_title_index().add_resumes([resume.id for resume in resumes],
+                                                     [resume.title or "" for resume in resumes])
+    except Exception as e:
+        logger.error(f"Ошибка при индексации названий резюме: {str(e)}")
+
+
+def unindex_resumes(resume_ids: list):
+    """Удаление резюме из всех индексов; сбой одного индекса не мешает удалению из остальных"""
+    stores = [
+        ("таблицы критериев", model_registry.get_criteria_index),
+        ("хранилища навыков", model_registry.get_skills_store),
+        ("индекса названий", model_registry.get_title_index),
+        ("хранилища эмбеддингов", model_registry.get_embedding_store),
+        ("ANN-индекса", model_registry.get_ann_index),
+    ]
+    for name, get_store in stores:
+        try:
+            get_store().delete(resume_ids)
+        except Exception as e:
+            logger.error(f"Ошибка при удалении резюме {resume_ids} из {name}: {str(e)}")
+
+
+def backfill_embeddings(db: Session, batch_size: int = 256) -> int:
+    """Досчитывает эмбеддинги резюме, которых ещё нет в хранилище"""
+    store = model_registry.get_embedding_store()
+    indexed = set(store.ids())
+    missing = [resume for resume in db.query(Resume).all() if resume.id not in indexed]
+
+    for start in range(0, len(missing), batch_size):
+        index_resumes(missing[start:start + batch_size])
+
+    return len(missing)
+
+
+def backfill_skills(db: Session, batch_size: int = 256) -> int:
+    """Досчитывает векторы навыков резюме, которых ещё нет в хранилище"""
+    store = model_registry.get_skills_store()
+    indexed = set(store.ids())
+    missing = [resume for resume in db.query(Resume).all() if resume.id not in indexed]
+
+    for start in range(0, len(missing), batch_size):
+        index_skills(missing[start:start + batch_size])
+
+    return len(missing)
@@ -4,41 +4,42 @@ from sqlalchemy import or_, create_engine
 from sqlalchemy.orm import Session
 from models.resume_db import Resume
 from models.vacancy import Vacancy
-from sklearn.feature_extraction.text import TfidfVectorizer
 
 # Импорты в конце
 import os
 os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
 import torch
 from model.scripts.resume_matching_system import ResumeMatchingSystem
+from model.scripts import criteria_scoring
+from services import model_registry, fulltext, resume_index, normalization
 
 from concurrent.futures import ProcessPoolExecutor
 from multiprocessing import cpu_count
 import logging
+import time
+import numpy as np
+import json
 
 logger = logging.getLogger('uvicorn.error')
 
-def search_resumes(query: str, position: str, db: Session):
+# Константа сглаживания reciprocal-rank fusion
+RRF_K = 60
+
+# Веса критериев в JSON, например {"salary": 0.3, "work_format": 0}; не указанные берутся из DEFAULT_WEIGHTS
+CRITERIA_WEIGHTS = json.loads(os.environ.get("CRITERIA_WEIGHTS", "{}"))
+
+def search_resumes(query: str, position: str, db: Session, limit: int = 100, conditions: list = None):
     try:
-        base_query = db.query(Resume)
-        
-        # Ищем резюме, где title содержит название вакансии
-        resumes = base_query.filter(
-            Resume.title.ilike(f"%{position}%")
-        ).all()
-        
-        results = []
-        for resume in resumes:
-            results.append({
-                "id": resume.id,
-                "title": resume.title,
-                "area": resume.area,
-                "experience": resume.experience,
-                "education": resume.education,
-                "file_name": resume.file_name,
-                "hh_url": resume.hh_url,
-                "hh_id": resume.hh_id
-            })
+        # BM25-поиск по FTS5-индексу: название вакансии и дополнительный запрос
+        allowed = normalization.allowed_resume_ids(db, conditions)
+        ranked = fulltext.search(db, f"{position} {query}", limit=limit, resume_ids=allowed)
+        resumes = fetch_resumes(db, [resume_id for resume_id, _ in ranked])
+
+        results = [
+            {**resume_to_item(resumes[resume_id]), "score": score}
+            for resume_id, score in ranked
+            if resume_id in resumes
+        ]
         
         return {
             "items": results,
@@ -49,40 +50,272 @@ def search_resumes(query: str, position: str, db: Session):
         logger.error(f"Ошибка в search_resumes: {str(e)}")
         raise e
 
+def search_resumes_vector(position: str, db: Session, k: int = 20, ef: int = None, conditions: list = None):
+    """Top-k резюме, ближайших к названию вакансии, через ANN-индекс эмбеддингов"""
+    try:
+        allowed = normalization.allowed_resume_ids(db, conditions)
+        matching_system = model_registry.get_matching_system()
+        vacancy_vector = matching_system.encode_texts([position])[0]
+        neighbours = model_registry.get_ann_index().query(vacancy_vector, k=k, ef=ef, allowed=allowed)
+
+        resumes = fetch_resumes(db, [resume_id for resume_id, _ in neighbours])
+
+        results = []
+        for resume_id, score in neighbours:
+            # Индекс может отставать от БД, удалённые строки пропускаем
+            if resume_id in resumes:
+                results.append({**resume_to_item(resumes[resume_id]), "score": score})
+
+        return {
+            "items": results,
+            "total": len(results)
+        }
+
+    except Exception as e:
+        logger.error(f"Ошибка в search_resumes_vector: {str(e)}")
+        raise e
+
+def search_resumes_skills(position: str, db: Session, k: int = 20, conditions: list = None):
+    """Top-k резюме по доле навыков вакансии: одно произведение матрицы навыков на вектор вакансии"""
+    try:
+        allowed = normalization.allowed_resume_ids(db, conditions)
+        extractor = model_registry.get_skill_extractor()
+        vacancy_skills = extractor.extract(position)
+        top = model_registry.get_skills_store().top(extractor.query_vector(position), top_k=k, allowed=allowed)
+
+        resumes = fetch_resumes(db, [resume_id for resume_id, _ in top])
+        results = [
+            {**resume_to_item(resumes[resume_id]), "score": score}
+            for resume_id, score in top
+            if resume_id in resumes
+        ]
+
+        return {
+            "items": results,
+            "total": len(results),
+            "skills": vacancy_skills
+        }
+
+    except Exception as e:
+        logger.error(f"Ошибка в search_resumes_skills: {str(e)}")
+        raise e
+
+def search_resumes_titles(position: str, db: Session, k: int = 20, conditions: list = None):
+    """Top-k резюме по TF-IDF близости названий: одно произведение матрицы названий на вектор вакансии"""
+    try:
+        allowed = normalization.allowed_resume_ids(db, conditions)
+        top = model_registry.get_title_index().top(position, top_k=k, allowed=allowed)
+
+        resumes = fetch_resumes(db, [resume_id for resume_id, _ in top])
+        results = [
+            {**resume_to_item(resumes[resume_id]), "score": score}
+            for resume_id, score in top
+            if resume_id in resumes
+        ]
+
+        return {
+            "items": results,
+            "total": len(results)
+        }
+
+    except Exception as e:
+        logger.error(f"Ошибка в search_resumes_titles: {str(e)}")
+        raise e
+
+def search_resumes_criteria(vacancy: Vacancy, db: Session, k: int = 20, weights: dict = None,
+                            conditions: list = None):
+    """Top-k резюме по структурированным критериям: таблица всех резюме держится в реестре моделей
+    и оценивается за один проход NumPy, фильтры только отбрасывают её строки"""
+    try:
+        allowed = normalization.allowed_resume_ids(db, conditions)
+        ranked = model_registry.get_criteria_index().top(
+            vacancy, k=k, weights=weights if weights is not None else CRITERIA_WEIGHTS, allowed=allowed
+        )
+        resumes = fetch_resumes(db, [resume_id for resume_id, _, _ in ranked])
+
+        results = [
+            {
+                **resume_to_item(resumes[resume_id]),
+                "score": score,
+                "criteria": criteria
+            }
+            for resume_id, score, criteria in ranked
+            if resume_id in resumes
+        ]
+
+        return {
+            "items": results,
+            "total": len(results)
+        }
+
+    except Exception as e:
+        logger.error(f"Ошибка в search_resumes_criteria: {str(e)}")
+        raise e
+
+def search_resumes_hybrid(position: str, db: Session, k: int = 20, lexical_limit: int = 200,
+                          semantic_limit: int = 50, ef: int = None, conditions: list = None):
+    """Гибридный поиск: BM25-кандидаты и ANN-кандидаты, пересчёт BERT-близости и слияние через RRF"""
+    try:
+        timings = {}
+
+        # Этап 0: жёсткие фильтры в SQL по индексированным нормализованным колонкам
+        started = time.perf_counter()
+        allowed = normalization.allowed_resume_ids(db, conditions)
+        timings["prefilter_ms"] = (time.perf_counter() - started) * 1000
+
+        # Этап 1: дешёвые лексические кандидаты из FTS5
+        started = time.perf_counter()
+        lexical = fulltext.search(db, position, limit=lexical_limit, resume_ids=allowed)
+        timings["lexical_ms"] = (time.perf_counter() - started) * 1000
+
+        # Этап 2: BERT-близость только для кандидатов; ANN добавляет то, что лексика не нашла
+        # ("Python Developer" для вакансии "Python разработчик")
+        started = time.perf_counter()
+        matching_system = model_registry.get_matching_system()
+        vacancy_vector = matching_system.encode_texts([position])[0]
+        semantic_candidates = model_registry.get_ann_index().query(vacancy_vector, k=semantic_limit, ef=ef,
+                                                                  allowed=allowed)
+
+        candidate_ids = list(dict.fromkeys(
+            [resume_id for resume_id, _ in lexical] + [resume_id for resume_id, _ in semantic_candidates]
+        ))
+        resumes = fetch_resumes(db, candidate_ids)
+        candidate_ids = [resume_id for resume_id in candidate_ids if resume_id in resumes]
+
+        store = model_registry.get_embedding_store()
+        missing = [resumes[resume_id] for resume_id in candidate_ids if resume_id not in store]
+        if missing:
+            resume_index.index_resumes(missing)
+
+        embedded_ids = [resume_id for resume_id in candidate_ids if resume_id in store]
+        similarities = store.get(embedded_ids) @ vacancy_vector if embedded_ids else np.zeros(0)
+        semantic = sorted(zip(embedded_ids, similarities.tolist()), key=lambda pair: pair[1], reverse=True)
+        timings["semantic_ms"] = (time.perf_counter() - started) * 1000
+
+        # Слияние рангов
+        started = time.perf_counter()
+        lexical_scores = {resume_id: score for resume_id, score in lexical}
+        semantic_scores = dict(semantic)
+        fused = {}
+        for ranking in ([resume_id for resume_id, _ in lexical if resume_id in resumes],
+                        [resume_id for resume_id, _ in semantic]):
+            for rank, resume_id in enumerate(ranking, start=1):
+                fused[resume_id] = fused.get(resume_id, 0.0) + 1.0 / (RRF_K + rank)
+
+        top = sorted(fused.items(), key=lambda pair: pair[1], reverse=True)[:k]
+
+        # Доля навыков вакансии и близость названий - только для резюме, попавших в ответ
+        top_ids = [resume_id for resume_id, _ in top]
+        extractor = model_registry.get_skill_extractor()
+        skills_scores = model_registry.get_skills_store().score_ids(extractor.query_vector(position), top_ids)
+        title_scores = model_registry.get_title_index().score_ids(position, top_ids)
+
+        results = [
+            {
+                **resume_to_item(resumes[resume_id]),
+                "score": score,
+                "lexical_score": lexical_scores.get(resume_id),
+                "semantic_score": semantic_scores.get(resume_id),
+                "skills_score": skills_scores.get(resume_id),
+                "title_score": title_scores.get(resume_id)
+            }
+            for resume_id, score in top
+        ]
+        timings["fusion_ms"] = (time.perf_counter() - started) * 1000
+
+        return {
+            "items": results,
+            "total": len(results),
+            "candidates": {
+                "lexical": len(lexical),
+                "semantic": len(semantic_candidates),
+                "rescored": len(semantic),
+                "lexical_limit": lexical_limit,
+                "semantic_limit": semantic_limit,
+                "prefiltered": None if allowed is None else len(allowed)
+            },
+            "timings": {stage: round(ms, 2) for stage, ms in timings.items()}
+        }
+
+    except Exception as e:
+        logger.error(f"Ошибка в search_resumes_hybrid: {str(e)}")
+        raise e
+
+def rerank_resumes(vacancy: Vacancy, db: Session, resume_ids: list = None, top_k: int = 20,
+                   candidate_limit: int = 100, conditions: list = None):
+    """Пересортировка кандидатов кросс-энкодером: пары вакансия/резюме оцениваются батчами
+
+    Без resume_ids кандидатами становятся первые candidate_limit резюме гибридного поиска.
+    Кросс-энкодер обучен на полных описаниях, поэтому текст берётся из кэша парсинга PDF.
+    """
+    try:
+        timings = {}
+
+        started = time.perf_counter()
+        if resume_ids is None:
+            hybrid = search_resumes_hybrid(vacancy.title, db, k=candidate_limit, conditions=conditions)
+            resume_ids = [item["id"] for item in hybrid["items"]]
+        resumes = fetch_resumes(db, resume_ids)
+        candidates = [resumes[resume_id] for resume_id in dict.fromkeys(resume_ids) if resume_id in resumes]
+        timings["candidates_ms"] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        ranked = model_registry.get_resume_matcher().rerank(
+            vacancy.title, [resume_index.resume_full_text(resume) for resume in candidates], top_k=top_k
+        )
+        timings["rerank_ms"] = (time.perf_counter() - started) * 1000
+
+        results = [
+            {**resume_to_item(candidates[index]), "match_probability": probability}
+            for index, probability in ranked
+        ]
+        return {
+            "items": results,
+            "total": len(results),
+            "candidates": len(candidates),
+            "timings": {stage: round(ms, 2) for stage, ms in timings.items()}
+        }
+
+    except Exception as e:
+        logger.error(f"Ошибка в rerank_resumes: {str(e)}")
+        raise e
+
+def fetch_resumes(db: Session, resume_ids: list) -> dict:
+    """Резюме по списку id одним запросом"""
+    if not resume_ids:
+        return {}
+    rows = db.query(Resume).filter(Resume.id.in_(resume_ids)).all()
+    return {resume.id: resume for resume in rows}
+
+def resume_to_item(resume) -> dict:
+    return {
+        "id": resume.id,
+        "title": resume.title,
+        "area": resume.area,
+        "experience": resume.experience,
+        "education": resume.education,
+        "file_name": resume.file_name,
+        "hh_url": resume.hh_url,
+        "hh_id": resume.hh_id,
+        "experience_months": resume.experience_months,
+        "education_level": resume.education_level,
+        "salary_from": resume.salary_from,
+        "salary_to": resume.salary_to,
+        "work_format": resume.work_format,
+        "area_id": resume.area_id
+    }
+
 def calculate_title_similarity(resume_title: str, vacancy_title: str) -> float:
     """Вычисляет схожесть названий должностей"""
     if not resume_title or not vacancy_title:
         return 0.0
-        
-    vectorizer = TfidfVectorizer()
-    try:
-        tfidf_matrix = vectorizer.fit_transform([resume_title, vacancy_title])
-        return float(torch.cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0])
-    except:
-        return 0.0
+
+    # TF-IDF обучен на всех названиях резюме и вакансий, а не на одной паре
+    return model_registry.get_title_index().similarity(resume_title, vacancy_title)
 
 def calculate_experience_match(resume_exp: str, vacancy_exp: str) -> float:
     """Вычисляет соответствие опыта работы"""
-    if not resume_exp or not vacancy_exp:
-        return 0.0
-
-    # Маппинг опыта в месяцы
-    experience_mapping = {
-        'no_experience': 0,
-        'employment': 0,
-        'between1And3': 24,
-        'between3And6': 54,
-        'moreThan6': 72
-    }
-
-    resume_months = experience_mapping.get(resume_exp, 0)
-    required_months = experience_mapping.get(vacancy_exp, 0)
-
-    if required_months == 0:
-        return 1.0  # Если опыт не требуется, любой опыт подходит
-    if resume_months >= required_months:
-        return 1.0
-    return resume_months / required_months
+    return criteria_scoring.match_experience_months(resume_exp, vacancy_exp)
 
 def calculate_education_match(resume_edu: str, vacancy_edu: str) -> float:
     """Вычисляет соответствие образования"""
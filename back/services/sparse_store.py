@@ -0,0 +1,348 @@
+import os
+import json
+import threading
+import logging
+import numpy as np
+from scipy import sparse
+from services.store_lock import acquire_writer_lock
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class SparseStore:
+    """Разреженные векторы резюме (навыки, TF-IDF названий) в CSR-матрице, ключ - Resume.id
+
+    <name>.npz - основная матрица, <name>.ids.npy - id резюме по её строкам,
+    <name>.json - версия словаря и число признаков. Добавления и удаления
+    дописываются в журнал <name>.delta.jsonl и при загрузке накладываются на
+    основную матрицу; старые версии строк помечаются удалёнными (id -1), как
+    в EmbeddingStore. Основная матрица перезаписывается только при сжатии,
+    когда журнал и удалённые строки вырастают больше COMPACT_RATIO.
+    """
+
+    # Доля строк журнала и удалённых строк, после которой матрица перезаписывается
+    COMPACT_RATIO = 0.3
+    # Маленькие хранилища не сжимаются на каждую запись
+    COMPACT_MIN_ROWS = 1000
+
+    def __init__(self, directory: str, name: str, version: str, n_features: int = 0):
+        self.directory = directory
+        self.name = name
+        self.version = version
+        self.matrix_path = os.path.join(directory, f"{name}.npz")
+        self.ids_path = os.path.join(directory, f"{name}.ids.npy")
+        self.manifest_path = os.path.join(directory, f"{name}.json")
+        self.delta_path = os.path.join(directory, f"{name}.delta.jsonl")
+
+        self._lock = threading.RLock()
+        self._n_features = n_features
+        # id строк основной матрицы и строк журнала; -1 у удалённых
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        self._delta_ids = []
+        self._delta_rows = []
+        self._delta_matrix = None
+        self._positions = {}
+
+        # Журнал дописывается по смещениям из памяти: писатель в каталоге один
+        acquire_writer_lock(directory)
+        self._load()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, resume_id):
+        return int(resume_id) in self._positions
+
+    @property
+    def n_features(self) -> int:
+        return self._n_features
+
+    def ids(self) -> list:
+        with self._lock:
+            return list(self._positions)
+
+    def add(self, resume_ids: list, vectors):
+        """Добавление (или замена) строк резюме: строки дописываются в журнал"""
+        if len(resume_ids) == 0:
+            return
+
+        vectors = sparse.csr_matrix(vectors, dtype=np.float32)
+        if vectors.shape[0] != len(resume_ids):
+            raise ValueError("Количество векторов не совпадает с количеством id")
+
+        with self._lock:
+            records = []
+            for row, resume_id in enumerate(resume_ids):
+                vector = vectors[row]
+                self._append_row(int(resume_id), vector)
+                records.append({"add": int(resume_id), "n": int(vector.shape[1]),
+                                "indices": vector.indices.tolist(), "data": vector.data.tolist()})
+            self._write_delta(records)
+            self._compact_if_needed()
+
+    def delete(self, resume_ids: list):
+        with self._lock:
+            resume_ids = [int(resume_id) for resume_id in resume_ids if int(resume_id) in self._positions]
+            if not resume_ids:
+                return
+            self._tombstone(resume_ids)
+            self._write_delta([{"delete": resume_ids}])
+            self._compact_if_needed()
+
+    def reset(self, version: str, n_features: int = 0):
+        """Очистка хранилища под новую версию словаря"""
+        with self._lock:
+            self.version = version
+            self._n_features = n_features
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._matrix = sparse.csr_matrix((0, n_features), dtype=np.float32)
+            self._delta_ids = []
+            self._delta_rows = []
+            self._delta_matrix = None
+            self._positions = {}
+            # Журнал старой версии не должен наложиться на новую матрицу
+            open(self.delta_path, "w").close()
+            self._flush()
+
+    def matrix(self):
+        """Id живых резюме и CSR-матрица их векторов"""
+        with self._lock:
+            ids = self._all_ids()
+            mask = ids >= 0
+            return ids[mask], self._combined()[mask]
+
+    def get(self, resume_ids: list) -> sparse.csr_matrix:
+        """Строки резюме в порядке resume_ids; отсутствующие id пропускаются"""
+        with self._lock:
+            positions = np.array([self._positions[int(i)] for i in resume_ids if int(i) in self._positions],
+                                 dtype=np.int64)
+            base_rows = self._matrix.shape[0]
+            in_base = positions < base_rows
+            rows = sparse.vstack([
+                self._resize(self._matrix[positions[in_base]], self._n_features),
+                self._resize(self._delta()[positions[~in_base] - base_rows], self._n_features)
+            ], format="csr")
+            # vstack склеил строки основной матрицы и журнала, возвращаем порядок resume_ids
+            order = np.argsort(np.concatenate([np.flatnonzero(in_base), np.flatnonzero(~in_base)]), kind="stable")
+            return rows[order]
+
+    def score(self, query, allowed=None) -> tuple:
+        """Оценка всех резюме: произведение основной матрицы и журнала на запрос, (ids, scores)
+
+        allowed - id резюме, прошедших SQL-фильтры; строки остальных не умножаются.
+        """
+        with self._lock:
+            ids, base, delta = self._all_ids(), self._matrix, self._delta()
+
+        mask = ids >= 0
+        if allowed is not None:
+            mask &= np.isin(ids, np.fromiter(allowed, dtype=np.int64, count=len(allowed)))
+        if not mask.any():
+            return ids[mask], np.zeros(0, dtype=np.float32)
+
+        if sparse.issparse(query):
+            query = query.toarray().ravel()
+        query = np.asarray(query, dtype=np.float32)
+
+        base_rows = base.shape[0]
+        scores = np.concatenate([
+            self._product(base, query, mask[:base_rows]),
+            self._product(delta, query, mask[base_rows:])
+        ])
+        return ids[mask], scores
+
+    def score_ids(self, query, resume_ids: list) -> dict:
+        """Оценки только для строк resume_ids: {id: score}; отсутствующие id пропускаются"""
+        with self._lock:
+            present = [int(i) for i in resume_ids if int(i) in self._positions]
+            rows = self.get(present)
+        if not present:
+            return {}
+
+        if sparse.issparse(query):
+            query = query.toarray().ravel()
+        query = np.asarray(query, dtype=np.float32)
+        scores = self._product(rows, query, np.ones(rows.shape[0], dtype=bool))
+        return dict(zip(present, scores.tolist()))
+
+    def top(self, query, top_k: int = 20, allowed=None) -> list:
+        """Top-k резюме по score, резюме с нулевой оценкой не возвращаются"""
+        ids, scores = self.score(query, allowed)
+        nonzero = np.flatnonzero(scores > 0)
+        if len(nonzero) == 0 or top_k <= 0:
+            return []
+
+        top_k = min(top_k, len(nonzero))
+        top = nonzero[np.argpartition(-scores[nonzero], top_k - 1)[:top_k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    @staticmethod
+    def _product(matrix: sparse.csr_matrix, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        # Копия строк нужна, только если часть из них отфильтрована
+        if not rows.all():
+            matrix = matrix[rows]
+        if matrix.shape[0] == 0:
+            return np.zeros(0, dtype=np.float32)
+        # Признаки, которых нет ни в одной строке, на результат не влияют
+        if query.shape[0] < matrix.shape[1]:
+            query = np.pad(query, (0, matrix.shape[1] - query.shape[0]))
+        return np.asarray(matrix @ query[:matrix.shape[1]], dtype=np.float32).ravel()
+
+    def _append_row(self, resume_id: int, vector: sparse.csr_matrix):
+        # Словарь может расти (новые слова в названиях): ширина - максимум по строкам
+        self._tombstone([resume_id])
+        self._n_features = max(self._n_features, vector.shape[1])
+        self._positions[resume_id] = len(self._ids) + len(self._delta_ids)
+        self._delta_ids.append(resume_id)
+        self._delta_rows.append(vector)
+        self._delta_matrix = None
+
+    def _tombstone(self, resume_ids) -> bool:
+        changed = False
+        for resume_id in resume_ids:
+            position = self._positions.pop(int(resume_id), None)
+            if position is None:
+                continue
+            if position < len(self._ids):
+                self._ids[position] = -1
+            else:
+                self._delta_ids[position - len(self._ids)] = -1
+            changed = True
+        return changed
+
+    def _all_ids(self) -> np.ndarray:
+        return np.concatenate([self._ids, np.asarray(self._delta_ids, dtype=np.int64)])
+
+    def _delta(self) -> sparse.csr_matrix:
+        """Строки журнала одной матрицей; пересобирается только после добавлений"""
+        if self._delta_matrix is None:
+            if self._delta_rows:
+                width = max(row.shape[1] for row in self._delta_rows)
+                self._delta_matrix = sparse.vstack([self._resize(row, width) for row in self._delta_rows],
+                                                   format="csr")
+            else:
+                self._delta_matrix = sparse.csr_matrix((0, self._n_features), dtype=np.float32)
+        return self._delta_matrix
+
+    def _combined(self) -> sparse.csr_matrix:
+        return sparse.vstack([self._resize(self._matrix, self._n_features),
+                              self._resize(self._delta(), self._n_features)], format="csr")
+
+    @staticmethod
+    def _resize(matrix: sparse.csr_matrix, n_features: int) -> sparse.csr_matrix:
+        if matrix.shape[1] == n_features:
+            return matrix
+        matrix = matrix.copy()
+        matrix.resize((matrix.shape[0], n_features))
+        return matrix
+
+    def _write_delta(self, records: list):
+        with open(self.delta_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def _compact_if_needed(self):
+        rows = len(self._ids) + len(self._delta_ids)
+        changed = len(self._delta_ids) + (rows - len(self._positions))
+        if changed > max(len(self._positions), self.COMPACT_MIN_ROWS) * self.COMPACT_RATIO:
+            self._compact()
+
+    def _compact(self):
+        """Перезапись основной матрицы без удалённых строк и очистка журнала"""
+        ids = self._all_ids()
+        mask = ids >= 0
+        self._matrix = self._combined()[mask]
+        self._ids = ids[mask]
+        self._delta_ids = []
+        self._delta_rows = []
+        self._delta_matrix = None
+        self._positions = {int(resume_id): position for position, resume_id in enumerate(self._ids)}
+        # Сначала новая матрица, потом пустой журнал: повторное наложение журнала ничего не меняет
+        self._flush()
+        open(self.delta_path, "w").close()
+        logger.info(f"Векторы {self.name} сжаты до {len(self._ids)} строк")
+
+    def _flush(self):
+        """Атомарная запись основной матрицы, id и манифеста"""
+        tmp_matrix = self.matrix_path + ".tmp"
+        with open(tmp_matrix, "wb") as f:
+            sparse.save_npz(f, self._matrix)
+        os.replace(tmp_matrix, self.matrix_path)
+
+        tmp_ids = self.ids_path + ".tmp"
+        with open(tmp_ids, "wb") as f:
+            np.save(f, self._ids)
+        os.replace(tmp_ids, self.ids_path)
+
+        manifest = {
+            "name": self.name,
+            "version": self.version,
+            "n_features": self._n_features,
+            "rows": int(len(self._ids))
+        }
+        tmp_manifest = self.manifest_path + ".tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_manifest, self.manifest_path)
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            # Манифест фиксирует версию, к которой относится журнал
+            self.reset(self.version, self._n_features)
+            return
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != self.version:
+            logger.warning(
+                f"Векторы {self.name} посчитаны для версии {manifest.get('version')}, "
+                f"текущая {self.version}: хранилище пересоздаётся"
+            )
+            self.reset(self.version, self._n_features)
+            return
+
+        try:
+            matrix = sparse.load_npz(self.matrix_path).tocsr().astype(np.float32)
+            ids = np.load(self.ids_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать векторы {self.name}: {e}, хранилище пересоздаётся")
+            self.reset(self.version, self._n_features)
+            return
+
+        if matrix.shape[0] != len(ids):
+            logger.warning(f"Число строк {self.name} не совпадает с числом id, хранилище пересоздаётся")
+            self.reset(self.version, self._n_features)
+            return
+
+        self._n_features = max(matrix.shape[1], self._n_features)
+        self._matrix = matrix
+        self._ids = ids.astype(np.int64)
+        self._positions = {int(resume_id): position for position, resume_id in enumerate(self._ids) if resume_id >= 0}
+        self._replay_delta()
+        self._compact_if_needed()
+
+    def _replay_delta(self):
+        if not os.path.exists(self.delta_path):
+            return
+
+        with open(self.delta_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Запись могла не дописаться при аварийной остановке
+                    logger.warning(f"Недописанная запись журнала {self.name} пропущена")
+                    continue
+
+                if "delete" in record:
+                    self._tombstone(record["delete"])
+                else:
+                    vector = sparse.csr_matrix(
+                        (np.asarray(record["data"], dtype=np.float32),
+                         np.asarray(record["indices"], dtype=np.int32),
+                         np.array([0, len(record["indices"])])),
+                        shape=(1, record["n"]), dtype=np.float32
+                    )
+                    self._append_row(int(record["add"]), vector)
@@ -0,0 +1,63 @@
+import os
+import threading
+import logging
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировка первого байта файла через msvcrt
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger('uvicorn.error')
+
+WRITER_LOCK_NAME = ".writer.lock"
+
+
+class StoreLockedError(RuntimeError):
+    """Каталогом индексов уже владеет другой процесс"""
+    pass
+
+
+_held = {}
+_lock = threading.Lock()
+
+
+def acquire_writer_lock(directory: str):
+    """Эксклюзивная блокировка каталога индексов на всё время жизни процесса
+
+    EmbeddingStore, SparseStore, TitleIndex и ResumeAnnIndex держат смещения
+    строк и отображение id -> строка в памяти процесса и дописывают файлы без
+    перечитывания. Второй процесс с тем же каталогом дописывал бы по
+    устаревшим смещениям и портил отображение, поэтому писатель один:
+    второй воркер получает StoreLockedError. Повторный вызов в том же
+    процессе ничего не делает.
+    """
+    path = os.path.abspath(os.path.join(directory, WRITER_LOCK_NAME))
+    with _lock:
+        if path in _held:
+            return
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        f = open(path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.seek(0)
+            owner = f.read().strip() or "?"
+            f.close()
+            raise StoreLockedError(
+                f"Каталог индексов {directory} занят процессом {owner}: "
+                f"хранилища допускают одного писателя, запускайте один воркер"
+            )
+
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        _held[path] = f
+        logger.info(f"Процесс {os.getpid()} - писатель каталога индексов {directory}")
@@ -0,0 +1,227 @@
+import os
+import json
+import uuid
+import threading
+import logging
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from models.resume_db import Resume
+from models.vacancy import Vacancy
+from services.fulltext import TOKEN_RE, stem
+from services.sparse_store import SparseStore
+from services.store_lock import acquire_writer_lock
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class TitleTfidf:
+    """TF-IDF по названиям должностей: словарь только растёт, поэтому номера столбцов стабильны"""
+
+    def __init__(self, vocabulary: dict = None, df: list = None, n_docs: int = 0,
+                 fit_id: str = None, fitted_docs: int = 0, delta_seq: int = 0):
+        self.vocabulary = vocabulary or {}
+        self.df = list(df or [])
+        self.n_docs = n_docs
+        # fit_id меняется при полном пересчёте; векторы в хранилище привязаны к нему
+        self.fit_id = fit_id or uuid.uuid4().hex
+        self.fitted_docs = fitted_docs
+        # Номер последней записи журнала TitleIndex, учтённой в модели
+        self.delta_seq = delta_seq
+
+    @staticmethod
+    def analyze(title: str) -> list:
+        """Основы слов и пары соседних основ ("data scientist")"""
+        stems = [stem(token) for token in TOKEN_RE.findall((title or "").lower())]
+        return stems + [f"{a} {b}" for a, b in zip(stems, stems[1:])]
+
+    def partial_fit(self, titles: list):
+        """Учёт новых документов: новые термины дописываются в конец словаря"""
+        for title in titles:
+            for term in set(self.analyze(title)):
+                column = self.vocabulary.get(term)
+                if column is None:
+                    column = self.vocabulary[term] = len(self.df)
+                    self.df.append(0)
+                self.df[column] += 1
+            self.n_docs += 1
+
+    def idf(self) -> np.ndarray:
+        # Сглаженный idf, как в sklearn TfidfVectorizer(smooth_idf=True)
+        df = np.asarray(self.df, dtype=np.float32)
+        return np.log((1.0 + self.n_docs) / (1.0 + df)) + 1.0
+
+    def transform(self, titles: list) -> sparse.csr_matrix:
+        """L2-нормированные TF-IDF векторы; термины вне словаря пропускаются"""
+        rows, cols, data = [], [], []
+        for row, title in enumerate(titles):
+            counts = {}
+            for term in self.analyze(title):
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    counts[column] = counts.get(column, 0) + 1
+            rows.extend([row] * len(counts))
+            cols.extend(counts)
+            data.extend(counts.values())
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), (rows, cols)),
+            shape=(len(titles), len(self.df)), dtype=np.float32
+        )
+        matrix = matrix @ sparse.diags(self.idf(), format="csr") if len(self.df) else matrix
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+    def to_dict(self) -> dict:
+        return {
+            "vocabulary": self.vocabulary,
+            "df": self.df,
+            "n_docs": self.n_docs,
+            "fit_id": self.fit_id,
+            "fitted_docs": self.fitted_docs,
+            "delta_seq": self.delta_seq
+        }
+
+
+class TitleIndex:
+    """TF-IDF векторы названий всех резюме: вакансия оценивается против всех одним произведением
+
+    Модель обучается на названиях резюме и вакансий и сохраняется в
+    titles_tfidf.json. Новые названия дообучают её инкрементально и
+    дописываются в журнал titles_tfidf.delta.jsonl, который при загрузке
+    повторяется через partial_fit; titles_tfidf.json перезаписывается, когда
+    журнал вырастает больше COMPACT_RATIO. Когда корпус вырастает больше чем
+    на REFIT_RATIO с последнего полного обучения, idf и все векторы
+    пересчитываются.
+    """
+
+    REFIT_RATIO = 0.2
+    COMPACT_RATIO = 0.3
+    COMPACT_MIN_DOCS = 1000
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.model_path = os.path.join(directory, "titles_tfidf.json")
+        self.delta_path = os.path.join(directory, "titles_tfidf.delta.jsonl")
+        self._lock = threading.RLock()
+        self._delta_docs = 0
+        acquire_writer_lock(directory)
+        self.model = self._load_model()
+        self.store = SparseStore(directory, "titles", self.model.fit_id)
+
+    @property
+    def needs_refit(self) -> bool:
+        return self.model.n_docs > self.model.fitted_docs * (1 + self.REFIT_RATIO)
+
+    def fit(self, resumes: list, vacancy_titles: list):
+        """Полное обучение: resumes - пары (id, название)"""
+        with self._lock:
+            model = TitleTfidf()
+            model.partial_fit([title for _, title in resumes] + list(vacancy_titles))
+            model.fitted_docs = model.n_docs
+            self.model = model
+
+            self.store.reset(model.fit_id, len(model.df))
+            if resumes:
+                self.store.add([resume_id for resume_id, _ in resumes], model.transform([title for _, title in resumes]))
+            self._save_model()
+            logger.info(f"TF-IDF названий обучен на {model.n_docs} названиях, словарь {len(model.df)}")
+
+    def sync(self, db: Session):
+        """Переобучение, если модели нет или корпус сильно вырос; иначе дообучение на новых резюме"""
+        with self._lock:
+            resumes = [(resume_id, title or "") for resume_id, title in db.query(Resume.id, Resume.title).all()]
+            indexed = set(self.store.ids())
+            missing = [(resume_id, title) for resume_id, title in resumes if resume_id not in indexed]
+
+            if self.model.n_docs == 0 or self.needs_refit or len(missing) > len(resumes) * self.REFIT_RATIO:
+                vacancy_titles = [title or "" for (title,) in db.query(Vacancy.title).all()]
+                self.fit(resumes, vacancy_titles)
+            elif missing:
+                self.add_resumes([resume_id for resume_id, _ in missing], [title for _, title in missing])
+
+            stale = indexed - {resume_id for resume_id, _ in resumes}
+            if stale:
+                self.store.delete(list(stale))
+
+    def add_resumes(self, resume_ids: list, titles: list):
+        with self._lock:
+            self.model.partial_fit(titles)
+            self._append_titles(titles)
+            self.store.add(resume_ids, self.model.transform(titles))
+
+    def add_vacancy_titles(self, titles: list):
+        """Названия вакансий обновляют словарь и idf, векторы для них не хранятся"""
+        with self._lock:
+            self.model.partial_fit(titles)
+            self._append_titles(titles)
+
+    def delete(self, resume_ids: list):
+        self.store.delete(resume_ids)
+
+    def score(self, title: str, allowed=None):
+        """Косинусная близость названия ко всем резюме: (ids, scores)"""
+        with self._lock:
+            query = self.model.transform([title])
+        return self.store.score(query, allowed)
+
+    def score_ids(self, title: str, resume_ids: list) -> dict:
+        """Косинусная близость названия к резюме resume_ids: {id: score}"""
+        with self._lock:
+            query = self.model.transform([title])
+        return self.store.score_ids(query, resume_ids)
+
+    def top(self, title: str, top_k: int = 20, allowed=None) -> list:
+        with self._lock:
+            query = self.model.transform([title])
+        return self.store.top(query, top_k, allowed)
+
+    def similarity(self, first: str, second: str) -> float:
+        with self._lock:
+            matrix = self.model.transform([first, second])
+        return float(matrix[0].multiply(matrix[1]).sum())
+
+    def _load_model(self) -> TitleTfidf:
+        if not os.path.exists(self.model_path):
+            return TitleTfidf()
+        try:
+            with open(self.model_path, "r", encoding="utf-8") as f:
+                model = TitleTfidf(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Не удалось прочитать TF-IDF названий: {e}, модель будет обучена заново")
+            return TitleTfidf()
+
+        # Журнал повторяется в том же порядке, поэтому номера столбцов совпадают с векторами в хранилище
+        if os.path.exists(self.delta_path):
+            with open(self.delta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning("Недописанная запись журнала TF-IDF названий пропущена")
+                        continue
+                    # Записи, уже вошедшие в titles_tfidf.json, повторно не учитываются
+                    if record.get("fit_id") == model.fit_id and record.get("seq", 0) > model.delta_seq:
+                        model.partial_fit(record["titles"])
+                        model.delta_seq = record["seq"]
+                        self._delta_docs += len(record["titles"])
+        return model
+
+    def _append_titles(self, titles: list):
+        self.model.delta_seq += 1
+        record = {"fit_id": self.model.fit_id, "seq": self.model.delta_seq, "titles": list(titles)}
+        with open(self.delta_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._delta_docs += len(titles)
+        if self._delta_docs > max(self.model.n_docs, self.COMPACT_MIN_DOCS) * self.COMPACT_RATIO:
+            self._save_model()
+
+    def _save_model(self):
+        tmp_path = self.model_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.model.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, self.model_path)
+        # Журнал уже учтён в модели (delta_seq), его можно очистить
+        open(self.delta_path, "w").close()
+        self._delta_docs = 0
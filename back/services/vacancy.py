@@ -1,6 +1,10 @@
 from models.vacancy import Vacancy
 from sqlalchemy.orm import Session
 from dto import vacancy
+from services import model_registry, normalization
+import logging
+
+logger = logging.getLogger('uvicorn.error')
 
 def create_vacancy(data: vacancy.Vacancy, db):
     vacancy = Vacancy(
@@ -16,6 +20,7 @@ def create_vacancy(data: vacancy.Vacancy, db):
         relocation = data.relocation,
         area = data.area
     )
+    normalization.normalize_vacancy(vacancy)
 
     try:
         db.add(vacancy)
@@ -24,6 +29,12 @@ def create_vacancy(data: vacancy.Vacancy, db):
     except Exception as e:
         print(e)
 
+    # Название вакансии - тоже документ корпуса TF-IDF названий
+    try:
+        model_registry.get_title_index().add_vacancy_titles([vacancy.title or ""])
+    except Exception as e:
+        logger.error(f"Ошибка при обновлении TF-IDF названий: {str(e)}")
+
     return vacancy
 
 def get_vacancy(id: int, db):
@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, migrate
+from models import resume_db, vacancy  # noqa: F401 - таблицы для create_all
+from services import fulltext
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Отдельная SQLite-база с FTS5-индексом, как при старте main.py"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    fulltext.init_fulltext(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,117 @@
+import itertools
+import numpy as np
+import pytest
+from model.scripts import criteria_scoring, field_normalization
+from model.scripts.criteria_scoring import CriteriaTable, CriteriaScorer
+
+EXPERIENCES = [None, "", "no_experience", "noExperience", "between1And3", "between3And6", "moreThan6",
+               "1-3", "3-5", "5+", "2 года 6 месяцев", "8 мес.", "не указано"]
+EDUCATIONS = [None, "", "secondary", "higher", "bachelor", "master", "phd", "Магистр", "Неоконченное высшее", "другое"]
+WORK_FORMATS = [None, "office", "remote", "hybrid", "flexible"]
+AREAS = [None, "", "Алматы", "almaty", " Астана ", "Тараз", "тараз"]
+SALARIES = [None, 50000, 100000, 160000, 300000]
+
+
+def record(experience=None, education=None, work_format=None, area=None, salary_from=None, salary_to=None, id=0):
+    """Строка таблицы из исходных полей - так её заполняет normalize_resume"""
+    return {
+        "id": id,
+        "experience_months": field_normalization.experience_months(experience),
+        "education_level": field_normalization.education_level(education),
+        "work_format": work_format,
+        "area_id": field_normalization.area_id(area),
+        "area": area,
+        "salary_from": salary_from,
+        "salary_to": salary_to,
+    }
+
+
+def score_column(criterion, resume_values, vacancy):
+    table = CriteriaTable([record(id=i, **values) for i, values in enumerate(resume_values)])
+    return CriteriaScorer().score(table, vacancy)[criterion]
+
+
+@pytest.mark.parametrize("vacancy_exp", EXPERIENCES)
+def test_experience_matches_scalar(vacancy_exp):
+    vacancy = record(experience=vacancy_exp)
+    levels = score_column("experience", [{"experience": exp} for exp in EXPERIENCES], vacancy)
+    months = score_column("experience_months", [{"experience": exp} for exp in EXPERIENCES], vacancy)
+
+    assert levels.tolist() == [criteria_scoring.match_experience(exp, vacancy_exp) for exp in EXPERIENCES]
+    assert months.tolist() == [criteria_scoring.match_experience_months(exp, vacancy_exp) for exp in EXPERIENCES]
+
+
+@pytest.mark.parametrize("vacancy_edu", EDUCATIONS)
+def test_education_matches_scalar(vacancy_edu):
+    scores = score_column("education", [{"education": edu} for edu in EDUCATIONS], record(education=vacancy_edu))
+    assert scores.tolist() == [criteria_scoring.match_education(edu, vacancy_edu) for edu in EDUCATIONS]
+
+
+@pytest.mark.parametrize("vacancy_format", WORK_FORMATS)
+def test_work_format_matches_scalar(vacancy_format):
+    scores = score_column("work_format", [{"work_format": f} for f in WORK_FORMATS], record(work_format=vacancy_format))
+    assert scores.tolist() == [criteria_scoring.match_work_format(f, vacancy_format) for f in WORK_FORMATS]
+
+
+@pytest.mark.parametrize("vacancy_area", AREAS)
+def test_location_matches_scalar(vacancy_area):
+    scores = score_column("location", [{"area": area} for area in AREAS], record(area=vacancy_area))
+    assert scores.tolist() == [criteria_scoring.match_location(area, vacancy_area) for area in AREAS]
+
+
+def test_salary_matches_scalar():
+    ranges = list(itertools.product(SALARIES, SALARIES))
+    resumes = [{"salary_from": low, "salary_to": high} for low, high in ranges]
+    for vacancy_from, vacancy_to in ranges:
+        scores = score_column("salary", resumes, record(salary_from=vacancy_from, salary_to=vacancy_to))
+        expected = [criteria_scoring.match_salary(low, high, vacancy_from, vacancy_to) for low, high in ranges]
+        assert scores.tolist() == expected, (vacancy_from, vacancy_to)
+
+
+def test_total_is_weighted_mean_of_scalars():
+    resumes = [
+        {"experience": "between1And3", "education": "bachelor", "work_format": "office", "area": "Алматы",
+         "salary_from": 100000, "salary_to": 160000},
+        {"experience": "5 лет", "education": None, "work_format": None, "area": None},
+    ]
+    vacancy = {"experience": "between3And6", "education": "master", "work_format": "remote", "area": "almaty",
+               "salary_from": 150000, "salary_to": 300000}
+    weights = {"salary": 0.3, "experience_months": 0.1}
+    total = CriteriaScorer(weights).score(
+        CriteriaTable([record(id=i, **values) for i, values in enumerate(resumes)]), record(**vacancy))["total"]
+
+    merged = {**criteria_scoring.DEFAULT_WEIGHTS, **weights}
+    for resume, value in zip(resumes, total):
+        scalar = {
+            "experience": criteria_scoring.match_experience(resume.get("experience"), vacancy["experience"]),
+            "education": criteria_scoring.match_education(resume.get("education"), vacancy["education"]),
+            "work_format": criteria_scoring.match_work_format(resume.get("work_format"), vacancy["work_format"]),
+            "location": criteria_scoring.match_location(resume.get("area"), vacancy["area"]),
+            "salary": criteria_scoring.match_salary(resume.get("salary_from"), resume.get("salary_to"),
+                                                    vacancy["salary_from"], vacancy["salary_to"]),
+            "experience_months": criteria_scoring.match_experience_months(resume.get("experience"),
+                                                                          vacancy["experience"]),
+        }
+        expected = sum(merged[name] * scalar[name] for name in merged) / sum(merged.values())
+        assert value == pytest.approx(expected)
+
+
+def test_extend_and_drop_keep_scores():
+    records = [record(id=i, experience=exp, area=area) for i, (exp, area) in enumerate(zip(EXPERIENCES, AREAS * 2))]
+    vacancy = record(experience="between1And3", area="Алматы")
+    full = CriteriaScorer().score(CriteriaTable(records), vacancy)["total"]
+
+    table = CriteriaTable(records[:4]).extend(records[4:]).drop([1, 5])
+    kept = [i for i in range(len(records)) if i not in (1, 5)]
+    assert table.ids.tolist() == kept
+    assert np.array_equal(CriteriaScorer().score(table, vacancy)["total"], full[kept])
+
+
+def test_scalar_values():
+    assert criteria_scoring.match_experience("between1And3", "between3And6") == 0.7
+    assert criteria_scoring.match_experience_months("between1And3", "between3And6") == pytest.approx(12 / 36)
+    assert criteria_scoring.match_experience_months("5 лет", "between3And6") == 1.0
+    assert criteria_scoring.match_experience_months("", "between3And6") == 0.0
+    assert criteria_scoring.match_work_format(None, None) == 1.0
+    assert criteria_scoring.match_location("Алматы", "almaty") == 1.0
+    assert criteria_scoring.match_salary(None, None, 100000, 200000) == 0.3
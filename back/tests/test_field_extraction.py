@@ -0,0 +1,51 @@
+from model.scripts.field_extraction import FieldExtractor
+
+extractor = FieldExtractor()
+
+
+def test_rules_starting_at_same_position_all_match():
+    fields = extractor.extract("Python разработчик\nОпыт работы — 2 года 6 месяцев\nООО Ромашка, Алматы")
+
+    assert fields["experience_total"] == "2 года 6 месяцев"
+    assert fields["experience"] == "ооо ромашка, алматы"
+    assert fields["position"] == "Python разработчик"
+
+
+def test_keyword_priority_does_not_depend_on_position():
+    fields = extractor.extract("Офис или гибрид, можно удаленно\nАстана, Алматы")
+
+    assert fields["work_format"] == "remote"
+    assert fields["area"] == "Алматы"
+    assert fields["currency"] == "KZT"
+
+
+def test_overlapping_flag_and_salary_patterns():
+    fields = extractor.extract("Готов к переезду\nЗарплата: 200000 - 400000, от 100000")
+
+    assert fields["relocation"] is True
+    assert fields["salary"] == (200000, 400000)
+    assert extractor.extract("от 100000 тенге")["salary"] == (100000, 200000)
+
+
+def test_section_takes_line_after_first_header_with_value():
+    text = "Разработчик\nНавыки\nSQL, Python\nОбразование\nКазНУ\nSkills"
+
+    fields = extractor.extract(text)
+    assert fields["skills"] == "sql, python"
+    assert fields["education"] == "казну"
+
+
+def test_header_on_last_line_has_no_value():
+    assert extractor.extract("Разработчик\nОбразование")["education"] == "Не указано"
+    assert extractor.extract("Разработчик\nОбразование", defaults=False)["education"] is None
+    # Пустая строка после заголовка - найденное пустое значение
+    assert extractor.extract("Разработчик\nОбразование\n")["education"] == ""
+
+
+def test_defaults_for_empty_text():
+    fields = extractor.extract("", defaults=False)
+
+    assert fields["position"] == "Неизвестная позиция"
+    assert fields["relocation"] is False
+    assert all(fields[field] is None for field in ("area", "experience", "salary", "experience_total"))
+    assert extractor.extract("")["salary"] == (150000, 300000)
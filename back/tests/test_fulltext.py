@@ -0,0 +1,95 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.resume_db import Resume
+from services import fulltext
+
+
+def add(db, title, experience="", education=""):
+    resume = Resume(title=title, experience=experience, education=education)
+    db.add(resume)
+    db.commit()
+    return resume.id
+
+
+def ids(results):
+    return [resume_id for resume_id, _ in results]
+
+
+def test_build_match_query_stems_and_deduplicates():
+    assert fulltext.build_match_query("Разработчика разработчики Python") == '"разработчик"* OR "python"*'
+    assert fulltext.build_match_query("developers") == '"develop"*'
+    assert fulltext.build_match_query("  ,.  ") == ""
+
+
+def test_insert_trigger_indexes_new_resumes(session_factory):
+    with session_factory() as db:
+        developer = add(db, "Разработчик Python", "3 года в банке")
+        add(db, "Бухгалтер", "1С")
+
+        assert ids(fulltext.search(db, "python")) == [developer]
+        assert ids(fulltext.search(db, "банке")) == [developer]
+
+
+def test_update_trigger_replaces_indexed_text(session_factory):
+    with session_factory() as db:
+        resume_id = add(db, "Тестировщик")
+        db.get(Resume, resume_id).title = "Аналитик данных"
+        db.commit()
+
+        assert fulltext.search(db, "тестировщик") == []
+        assert ids(fulltext.search(db, "аналитик")) == [resume_id]
+
+
+def test_delete_trigger_removes_resume(session_factory):
+    with session_factory() as db:
+        resume_id = add(db, "Разработчик Java")
+        db.delete(db.get(Resume, resume_id))
+        db.commit()
+
+        assert fulltext.search(db, "java") == []
+
+
+def test_prefix_search_finds_other_word_forms(session_factory):
+    with session_factory() as db:
+        russian = add(db, "Разработчик Python")
+        english = add(db, "Senior Developer")
+
+        assert ids(fulltext.search(db, "разработчика")) == [russian]
+        assert ids(fulltext.search(db, "разработчиками")) == [russian]
+        assert ids(fulltext.search(db, "developers")) == [english]
+        assert ids(fulltext.search(db, "dev")) == [english]
+
+
+def test_title_outranks_experience(session_factory):
+    with session_factory() as db:
+        in_experience = add(db, "Менеджер", "работал с python")
+        in_title = add(db, "Python разработчик")
+
+        assert ids(fulltext.search(db, "python")) == [in_title, in_experience]
+
+
+def test_search_is_restricted_to_resume_ids(session_factory):
+    with session_factory() as db:
+        first = add(db, "Разработчик Python")
+        second = add(db, "Python инженер")
+
+        assert ids(fulltext.search(db, "python", resume_ids={second})) == [second]
+        assert ids(fulltext.search(db, "python", resume_ids=[first, 999])) == [first]
+        assert fulltext.search(db, "python", resume_ids=set()) == []
+
+
+def test_init_rebuilds_index_for_existing_resumes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        resume_id = add(db, "Разработчик Go")
+
+    fulltext.init_fulltext(engine)
+    # Повторный вызов при старте не дублирует строки индекса
+    fulltext.init_fulltext(engine)
+
+    with Session() as db:
+        assert ids(fulltext.search(db, "go")) == [resume_id]
+    engine.dispose()
@@ -0,0 +1,312 @@
+import os
+import time
+import asyncio
+import httpx
+import pytest
+from services import hh_client, response_cache
+from services.response_cache import ResponseCache
+from services.hh_client import HHClient, HHConfigurationError, MAX_RETRY_DELAY
+
+
+def make_client(handler, **kwargs) -> HHClient:
+    options = {"max_retries": 3, "backoff": 0.0, "http2": False}
+    options.update(kwargs)
+    return HHClient(base_url="https://hh.test", transport=httpx.MockTransport(handler), **options)
+
+
+def run(coroutine_factory):
+    """Запуск корутины в собственном цикле; клиент создаётся внутри него"""
+    return asyncio.run(coroutine_factory())
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Задержки между повторами записываются, а не выжидаются"""
+    delays = []
+    original_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await original_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def responses(*statuses, headers=None):
+    """Обработчик, отдающий статусы по очереди и считающий запросы"""
+    calls = []
+
+    def handler(request):
+        status = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(request)
+        return httpx.Response(status, headers=headers or {}, json={"status": status})
+
+    return handler, calls
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retries_until_success(status, sleeps):
+    handler, calls = responses(status, status, 200)
+
+    async def main():
+        client = make_client(handler)
+        try:
+            return await client.get("/resumes")
+        finally:
+            await client.aclose()
+
+    response = run(main)
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_gives_up_after_max_retries(sleeps):
+    handler, calls = responses(503)
+
+    async def main():
+        client = make_client(handler, max_retries=2)
+        try:
+            return await client.get("/resumes")
+        finally:
+            await client.aclose()
+
+    response = run(main)
+    assert response.status_code == 503
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried(sleeps):
+    handler, calls = responses(404)
+
+    async def main():
+        client = make_client(handler)
+        try:
+            return await client.get("/resumes/1")
+        finally:
+            await client.aclose()
+
+    assert run(main).status_code == 404
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_transport_errors_are_retried(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={})
+
+    async def main():
+        client = make_client(handler)
+        try:
+            return await client.get("/resumes")
+        finally:
+            await client.aclose()
+
+    assert run(main).status_code == 200
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("retry_after, expected", [("2", 2.0), ("120", MAX_RETRY_DELAY)])
+def test_retry_after_is_capped(retry_after, expected, sleeps):
+    handler, _ = responses(429, 200, headers={"Retry-After": retry_after})
+
+    async def main():
+        client = make_client(handler, backoff=10.0)
+        try:
+            return await client.get("/resumes")
+        finally:
+            await client.aclose()
+
+    assert run(main).status_code == 200
+    assert sleeps == [expected]
+
+
+def test_download_retries_and_writes_file(tmp_path, sleeps):
+    handler, calls = responses(503, 200)
+    path = tmp_path / "resume.pdf"
+
+    async def main():
+        client = make_client(handler)
+        try:
+            return await client.download_to_file("/resumes/1/download", str(path))
+        finally:
+            await client.aclose()
+
+    size = run(main)
+    assert len(calls) == 2
+    assert path.read_bytes() == b'{"status":200}'
+    assert size == len(path.read_bytes())
+    assert [p.name for p in tmp_path.iterdir()] == ["resume.pdf"]
+
+
+def test_concurrency_limit():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    async def main():
+        client = make_client(handler, concurrency=3)
+        try:
+            return await asyncio.gather(*(client.get(f"/resumes/{i}") for i in range(12)))
+        finally:
+            await client.aclose()
+
+    results = run(main)
+    assert all(response.status_code == 200 for response in results)
+    assert peak == 3
+
+
+def test_missing_token_fails_clearly(monkeypatch):
+    monkeypatch.delenv("HH_ACCESS_TOKEN", raising=False)
+    monkeypatch.setattr(hh_client, "_client", None)
+
+    with pytest.raises(HHConfigurationError, match="HH_ACCESS_TOKEN"):
+        hh_client.get_hh_client()
+
+
+def test_token_is_sent_as_bearer(monkeypatch):
+    monkeypatch.setenv("HH_ACCESS_TOKEN", "test-token")
+    assert hh_client.auth_headers() == {"Authorization": "Bearer test-token"}
+
+
+class Clock:
+    """Подменяемое время для TTL кэша"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def cached_responses(etag="v1"):
+    """Обработчик с ETag: на совпадающий If-None-Match отвечает 304"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, headers={"ETag": etag}, json={"version": etag, "call": len(calls)})
+
+    return handler, calls
+
+
+def get_json_twice(handler, cache, between=None):
+    async def main():
+        client = make_client(handler, cache=cache)
+        try:
+            first = await client.get_json("/resumes", cache_key="resumes")
+            if between:
+                between()
+            second = await client.get_json("/resumes", cache_key="resumes")
+            return first, second
+        finally:
+            await client.aclose()
+
+    return run(main)
+
+
+def test_fresh_entry_is_served_without_request(clock):
+    handler, calls = cached_responses()
+    cache = ResponseCache(ttl=60)
+
+    first, second = get_json_twice(handler, cache, between=lambda: setattr(clock, "now", clock.now + 59))
+
+    assert len(calls) == 1
+    assert first == second == (200, {"version": "v1", "call": 1}, None)
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_revalidated(clock):
+    handler, calls = cached_responses()
+    cache = ResponseCache(ttl=60)
+
+    first, second = get_json_twice(handler, cache, between=lambda: setattr(clock, "now", clock.now + 61))
+
+    assert len(calls) == 2
+    assert calls[1].headers["If-None-Match"] == "v1"
+    assert second == first
+    assert cache.stats()["revalidated"] == 1
+    # 304 продлевает запись на следующий TTL
+    assert cache.get("resumes").fresh
+
+
+def test_expired_entry_is_replaced_by_new_response(clock):
+    handler, calls = cached_responses()
+    cache = ResponseCache(ttl=60)
+
+    def expire_and_change():
+        clock.now += 61
+        cache.get("resumes").etag = "old"
+
+    _, second = get_json_twice(handler, cache, between=expire_and_change)
+
+    assert len(calls) == 2
+    assert second == (200, {"version": "v1", "call": 2}, None)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a").data == 1
+    assert cache.get("c").data == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    ResponseCache(disk_directory=str(tmp_path)).put("a", {"x": 1}, etag="v1")
+
+    entry = ResponseCache(disk_directory=str(tmp_path)).get("a")
+    assert entry.data == {"x": 1}
+    assert entry.etag == "v1"
+
+
+def test_disk_sweep_drops_old_and_excess_entries(tmp_path):
+    cache = ResponseCache(disk_directory=str(tmp_path), max_disk_entries=2, max_disk_age=3600)
+    now = time.time()
+    for age, key in [(10, "new"), (20, "middle"), (30, "oldest"), (7200, "expired")]:
+        cache.put(key, key)
+        path = tmp_path / f"{key}.json"
+        os.utime(path, (now - age, now - age))
+
+    assert cache.sweep_disk() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["middle.json", "new.json"]
+    assert cache.stats()["disk_evictions"] == 2
+
+
+def test_disk_sweep_runs_on_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(ResponseCache, "SWEEP_EVERY", 5)
+    cache = ResponseCache(disk_directory=str(tmp_path), max_disk_entries=3)
+    now = time.time()
+    for i in range(5):
+        cache.put(f"key{i}", i)
+        os.utime(tmp_path / f"key{i}.json", (now - 100 + i, now - 100 + i))
+
+    # Пятая запись запускает подчистку: остаются три самые свежие
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["key2.json", "key3.json", "key4.json"]
@@ -0,0 +1,179 @@
+import os
+import threading
+import pytest
+from models.resume_db import Resume
+from services import file_storage, ingestion
+
+
+class GatedQueue(ingestion.IngestionQueue):
+    """Очередь, в которой задача обрабатывается только после release; файлы broken* падают"""
+
+    def __init__(self, **kwargs):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        super().__init__(**kwargs)
+
+    def _process(self, job):
+        self.started.set()
+        assert self.release.wait(5)
+        if job.original_name.startswith("broken"):
+            raise ValueError("не удалось разобрать PDF")
+        job.status = "done"
+
+    def finish(self):
+        self.release.set()
+        self._queue.join()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch, session_factory):
+    monkeypatch.setattr(file_storage, "STORAGE_DIRECTORY", str(tmp_path / "resumes"))
+    monkeypatch.setattr(ingestion, "SessionLocal", session_factory)
+    return session_factory
+
+
+def stored(content: bytes) -> bool:
+    return os.path.exists(file_storage.absolute_path(file_storage.relative_path(file_storage.sha256_bytes(content))))
+
+
+def submit(queue, content: bytes, name: str = "resume.pdf"):
+    return queue.submit(content, file_storage.sha256_bytes(content), name)
+
+
+def test_same_file_returns_pending_job(storage):
+    queue = GatedQueue(workers=1, max_queue=4)
+    first = submit(queue, b"%PDF-1")
+    assert queue.started.wait(5)
+
+    assert submit(queue, b"%PDF-1", "copy.pdf") is first
+    assert submit(queue, b"%PDF-2") is not first
+    assert queue.stats()["jobs"] == {"queued": 2}
+
+    queue.finish()
+    assert first.status == "done" and first.finished_at is not None
+    # Завершённая задача больше не перехватывает тот же файл
+    assert submit(queue, b"%PDF-1") is not first
+    queue.finish()
+    queue.shutdown()
+
+
+def test_full_queue_raises_and_removes_file(storage):
+    queue = GatedQueue(workers=0, max_queue=1)
+    queued = submit(queue, b"%PDF-queued")
+
+    with pytest.raises(ingestion.QueueFullError):
+        submit(queue, b"%PDF-rejected")
+
+    assert stored(b"%PDF-queued")
+    assert not stored(b"%PDF-rejected")
+    assert queue.get(queued.id) is queued
+    assert queue.stats() == {"workers": 0, "queued": 1, "max_queue": 1, "jobs": {"queued": 1}}
+
+
+def test_job_status_dict(storage):
+    queue = GatedQueue(workers=0, max_queue=1)
+    job = submit(queue, b"%PDF-status", "cv.pdf")
+
+    status = job.to_dict()
+    assert status["job_id"] == job.id
+    assert status["status"] == "queued"
+    assert status["file_name"] == "cv.pdf"
+    assert status["content_hash"] == file_storage.sha256_bytes(b"%PDF-status")
+    assert status["resume_id"] is None and status["finished_at"] is None
+    assert queue.get("unknown") is None
+
+
+def test_failed_job_reports_error_and_removes_file(storage):
+    queue = GatedQueue(workers=1, max_queue=1)
+    job = submit(queue, b"%PDF-broken", "broken.pdf")
+    queue.finish()
+
+    assert job.status == "failed"
+    assert job.error == "не удалось разобрать PDF"
+    assert not stored(b"%PDF-broken")
+    queue.shutdown()
+
+
+def test_failed_job_keeps_file_referenced_by_resume(storage):
+    content = b"%PDF-shared"
+    content_hash, file_name = file_storage.store_bytes(content)
+    with storage() as db:
+        db.add(Resume(title="Разработчик", file_name=file_name, content_hash=content_hash))
+        db.commit()
+
+    queue = GatedQueue(workers=1, max_queue=1)
+    submit(queue, content, "broken.pdf")
+    queue.finish()
+
+    assert stored(content)
+    queue.shutdown()
+
+
+def test_delete_keeps_file_of_pending_job(storage):
+    queue = GatedQueue(workers=0, max_queue=1)
+    job = submit(queue, b"%PDF-pending")
+
+    with storage() as db:
+        queue.delete_if_unreferenced(db, job.file_name)
+        assert stored(b"%PDF-pending")
+
+        file_storage.delete_if_unreferenced(db, job.file_name)
+        assert not stored(b"%PDF-pending")
+
+
+@pytest.fixture
+def client(storage, monkeypatch):
+    # Роутер тянет модели (torch, transformers, spacy) через services.resume_storage
+    pytest.importorskip("python_multipart")
+    router = pytest.importorskip("routers.resume_storage")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from database import get_db
+
+    queue = GatedQueue(workers=0, max_queue=1)
+    monkeypatch.setattr(ingestion, "get_ingestion_queue", lambda: queue)
+
+    def get_test_db():
+        with storage() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router.router, prefix="/resume-storage")
+    app.dependency_overrides[get_db] = get_test_db
+    return TestClient(app)
+
+
+def upload(client, content: bytes):
+    return client.post("/resume-storage/upload", files={"file": ("cv.pdf", content, "application/pdf")})
+
+
+def test_upload_returns_202_job_and_503_when_full(client):
+    accepted = upload(client, b"%PDF-first")
+    assert accepted.status_code == 202
+    assert accepted.json()["status"] == "queued"
+
+    # Тот же файл, ещё стоящий в очереди, получает ту же задачу
+    assert upload(client, b"%PDF-first").json()["job_id"] == accepted.json()["job_id"]
+
+    rejected = upload(client, b"%PDF-second")
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "5"
+
+    status = client.get(f"/resume-storage/jobs/{accepted.json()['job_id']}")
+    assert status.status_code == 200 and status.json()["status"] == "queued"
+    assert client.get("/resume-storage/jobs/unknown").status_code == 404
+
+
+def test_upload_of_stored_file_returns_existing_resume(client, storage):
+    content = b"%PDF-stored"
+    content_hash, file_name = file_storage.store_bytes(content)
+    with storage() as db:
+        resume = Resume(title="Аналитик", area="Москва", experience="", education="",
+                        file_name=file_name, hh_url="", hh_id="", content_hash=content_hash)
+        db.add(resume)
+        db.commit()
+        resume_id = resume.id
+
+    response = upload(client, content)
+    assert response.status_code == 200
+    assert response.json()["id"] == resume_id
@@ -0,0 +1,37 @@
+import pytest
+from services.model_registry import ModelRegistry, ModelUnavailableError
+
+
+def unavailable():
+    raise ModelUnavailableError("нет обученных весов")
+
+
+def test_preload_skips_unavailable_optional_models():
+    registry = ModelRegistry()
+    registry.register("encoder", object)
+    registry.register("matcher", unavailable, optional=True)
+
+    registry.preload()
+
+    assert registry.is_loaded("encoder")
+    assert not registry.is_loaded("matcher")
+    assert registry.stats()["models"]["matcher"] == {"loaded": False, "optional": True}
+    with pytest.raises(ModelUnavailableError):
+        registry.get("matcher")
+
+
+def test_preload_fails_on_unavailable_required_model():
+    registry = ModelRegistry()
+    registry.register("encoder", unavailable)
+
+    with pytest.raises(ModelUnavailableError):
+        registry.preload()
+
+
+def test_get_loads_once():
+    registry = ModelRegistry()
+    calls = []
+    registry.register("encoder", lambda: calls.append(1) or object())
+
+    assert registry.get("encoder") is registry.get("encoder")
+    assert len(calls) == 1
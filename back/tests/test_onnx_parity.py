@@ -0,0 +1,36 @@
+import os
+import pytest
+
+# Сверка ONNX-графов с PyTorch: нужны onnxruntime, torch и графы из onnx_export
+for module in ("onnxruntime", "torch", "transformers", "pandas"):
+    pytest.importorskip(module)
+
+from model.scripts import onnx_parity
+from model.scripts.onnx_runtime import model_paths
+from model.scripts.resume_matching_system import ResumeMatchingSystem
+from model.scripts.resume_bert_matcher import ResumeMatcher
+
+SAMPLES = int(os.environ.get("ONNX_PARITY_SAMPLES", "24"))
+
+
+def require_graph(name: str):
+    path, _ = model_paths(name)
+    if not os.path.exists(path):
+        pytest.skip(f"Нет ONNX-графа {path}: выполните python -m model.scripts.onnx_export")
+
+
+@pytest.fixture(scope="module")
+def samples():
+    if not os.path.exists(onnx_parity.DATASET_PATH):
+        pytest.skip(f"Нет набора {onnx_parity.DATASET_PATH}")
+    return onnx_parity.load_samples(SAMPLES)
+
+
+def test_encoder_matches_torch(samples):
+    require_graph(ResumeMatchingSystem.ARTIFACT_NAME)
+    assert onnx_parity.check_encoder(samples['Resume'].tolist())
+
+
+def test_cross_encoder_matches_torch(samples):
+    require_graph(ResumeMatcher.ARTIFACT_NAME)
+    assert onnx_parity.check_cross_encoder(samples)
@@ -0,0 +1,30 @@
+from services import model_registry, resume_index
+
+
+class Store:
+    def __init__(self, name, calls, fail=False):
+        self.name, self.calls, self.fail = name, calls, fail
+
+    def delete(self, resume_ids):
+        self.calls.append((self.name, resume_ids))
+        if self.fail:
+            raise RuntimeError(f"{self.name} недоступен")
+
+
+def test_unindex_deletes_from_every_store_despite_failures(monkeypatch, caplog):
+    calls = []
+    monkeypatch.setattr(model_registry, "get_criteria_index", lambda: Store("criteria", calls))
+    monkeypatch.setattr(model_registry, "get_skills_store", lambda: Store("skills", calls, fail=True))
+
+    def title_index():
+        raise RuntimeError("индекс названий не загрузился")
+
+    monkeypatch.setattr(model_registry, "get_title_index", title_index)
+    monkeypatch.setattr(model_registry, "get_embedding_store", lambda: Store("embeddings", calls))
+    monkeypatch.setattr(model_registry, "get_ann_index", lambda: Store("ann", calls))
+
+    with caplog.at_level("ERROR", logger="uvicorn.error"):
+        resume_index.unindex_resumes([7])
+
+    assert calls == [("criteria", [7]), ("skills", [7]), ("embeddings", [7]), ("ann", [7])]
+    assert len(caplog.records) == 2
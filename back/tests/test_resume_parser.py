@@ -0,0 +1,83 @@
+from model.scripts import resume_parser
+from model.scripts.resume_parser import ResumeParser
+
+
+class Page:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+    def flush_cache(self):
+        pass
+
+
+class Pdf:
+    def __init__(self, texts):
+        self.pages = [Page(text) for text in texts]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def parse(monkeypatch, texts, **kwargs):
+    monkeypatch.setattr(resume_parser.pdfplumber, "open", lambda path: Pdf(texts))
+    parser = ResumeParser(**kwargs)
+    extracted = []
+    extract = parser.extractor.extract
+
+    def spy(text, defaults=True):
+        extracted.append(text)
+        return extract(text, defaults)
+
+    monkeypatch.setattr(parser.extractor, "extract", spy)
+    text, stats = parser.extract_text_with_stats("resume.pdf")
+    return text, stats, extracted
+
+
+PAGES = [
+    "Разработчик\nАлматы\nОпыт работы",
+    "ООО Ромашка\nОбразование\nКазНУ",
+    "Навыки\nPython, SQL",
+    "Рекомендации",
+]
+
+
+def test_stops_once_fields_found_across_pages(monkeypatch):
+    text, stats, extracted = parse(monkeypatch, PAGES)
+
+    assert stats["stop_reason"] == "fields_found"
+    assert stats["pages_parsed"] == 3
+    assert text == "\n".join(PAGES[:3])
+    # Каждая страница разбирается один раз, с последней строкой предыдущей
+    assert extracted == [PAGES[0], "Опыт работы\n" + PAGES[1], "КазНУ\n" + PAGES[2]]
+
+
+def test_section_header_at_page_end_takes_value_from_next_page(monkeypatch):
+    pages = ["Разработчик\nАлматы\nНавыки\nОбразование", "МГУ\nОпыт работы\nООО Ромашка", "Рекомендации"]
+    _, stats, _ = parse(monkeypatch, pages)
+
+    assert stats["stop_reason"] == "fields_found"
+    assert stats["pages_parsed"] == 2
+
+
+def test_reads_all_pages_when_fields_missing(monkeypatch):
+    pages = ["Разработчик\nОпыт работы\nООО Ромашка", "", "Образование\nКазНУ"]
+    text, stats, extracted = parse(monkeypatch, pages)
+
+    assert stats["stop_reason"] is None
+    assert stats["pages_parsed"] == 3
+    # Последняя страница не проверяется: дальше читать нечего
+    assert len(extracted) == 2
+    assert ResumeParser().parse_text(text)["education"] == "казну"
+
+
+def test_stop_early_disabled(monkeypatch):
+    _, stats, extracted = parse(monkeypatch, PAGES, stop_early=False)
+
+    assert stats["pages_parsed"] == 4
+    assert extracted == []
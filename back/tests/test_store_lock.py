@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import textwrap
+import numpy as np
+import pytest
+from services import store_lock
+from services.embedding_store import EmbeddingStore
+from services.sparse_store import SparseStore
+
+BACK_DIRECTORY = __file__.rsplit("tests", 1)[0]
+
+
+def lock_in_subprocess(directory) -> subprocess.CompletedProcess:
+    code = textwrap.dedent(f"""
+        from services import store_lock
+        try:
+            store_lock.acquire_writer_lock({str(directory)!r})
+        except store_lock.StoreLockedError as e:
+            print(e)
+            raise SystemExit(3)
+    """)
+    return subprocess.run([sys.executable, "-c", code], cwd=BACK_DIRECTORY, capture_output=True, text=True)
+
+
+def test_second_process_cannot_open_stores(tmp_path):
+    EmbeddingStore(str(tmp_path), "model", 1).add([1], np.ones((1, 4)))
+    # Остальные хранилища того же каталога в этом процессе открываются без ошибки
+    SparseStore(str(tmp_path), "skills", "v1", n_features=4)
+
+    result = lock_in_subprocess(tmp_path)
+    assert result.returncode == 3
+    assert str(os.getpid()) in result.stdout
+
+
+def test_lock_is_per_directory(tmp_path):
+    store_lock.acquire_writer_lock(str(tmp_path / "first"))
+    assert lock_in_subprocess(tmp_path / "second").returncode == 0